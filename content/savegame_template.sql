@@ -481,6 +481,27 @@ CREATE TABLE "building_collector" (
 	"creation_tick" INT NOT NULL
 );
 
+CREATE TABLE "collector_job_board" (
+	"idle_since" INT, -- tick since which the collector hasn't found a job
+	"waiting" BOOL NOT NULL -- whether it waits at the job board of its settlement
+);
+
+CREATE TABLE "collector_job_board_resource" (
+	"collector" INT NOT NULL,
+	"resource" INT NOT NULL
+);
+
+CREATE TABLE "collector_job_board_target" (
+	"collector" INT NOT NULL,
+	"building" INT NOT NULL
+);
+
+CREATE TABLE "job_board_post" (
+	"settlement" INT NOT NULL,
+	"building" INT NOT NULL,
+	"remaining_ticks" INT NOT NULL -- ticks until the waiting collectors are woken up
+);
+
 CREATE TABLE "building_collector_job_history" (
 	"collector" INT NOT NULL,
 	"tick" INT NOT NULL,
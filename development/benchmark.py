@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""
+Headless benchmark of the game simulation.
+
+Runs a number of ticks of some reference games without gui (just like the game tests)
+and reports ticks per second, the time spent in the subsystems, the time needed to save
+the game afterwards, the scheduler calls of the settlers, the memory used by the building
+indexers of every island and the peak memory usage as JSON. It also counts how often the
+change listeners added with once_per_tick were notified and called. Games are started with
+fixed seeds, so the results of different commits can be compared.
+
+	./development/benchmark.py --ticks 2000 --output before.json
+	./development/benchmark.py --scenario ai --scenario huge
+
+Every scenario is run in a separate process, so they don't influence each other.
+The time of a subsystem doesn't include the time of other subsystems it calls,
+e.g. pathfinding done by collectors is only counted as pathfinding. The time of the
+scheduler is everything that isn't attributed to another subsystem.
+"""
+
+import bz2
+import functools
+import gc
+import gettext
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from optparse import SUPPRESS_HELP, OptionParser
+
+try:
+	import resource
+except ImportError: # not available on windows
+	resource = None
+
+# make this script work both when started inside development and in the uh root dir
+if not os.path.exists('content'):
+	os.chdir('..')
+assert os.path.exists('content'), 'Content dir not found.'
+sys.path.append('.')
+
+
+# (subsystem, module, class, methods) of the methods whose time is measured
+INSTRUMENTED_METHODS = (
+	('scheduler', 'horizons.scheduler', 'Scheduler', ('tick', )),
+	('pathfinding', 'horizons.util.pathfinding.pathfinding', 'FindPath', ('__call__', )),
+	('ai', 'horizons.ai.aiplayer', 'AIPlayer', ('finish_init', 'tick', 'tick_long')),
+	('ai', 'horizons.ai.pirate', 'Pirate', ('tick', 'tick_long')),
+	('ai', 'horizons.ai.trader', 'Trader',
+	 ('ship_idle', 'send_ship_random', 'send_ship_random_warehouse')),
+	('production', 'horizons.world.production.producer', 'Producer',
+	 ('update_capacity_utilization', '_production_finished', '_on_production_change')),
+	('production', 'horizons.world.production.producer', 'MineProducer', ('_on_production_change', )),
+	('production', 'horizons.world.production.producer', 'QueueProducer', ('start_next_production', )),
+	('production', 'horizons.world.production.production', 'Production',
+	 ('_check_inventory', '_start_production', '_produce', '_finished_producing')),
+	('collectors', 'horizons.world.units.collectors.collector', 'Collector',
+	 ('search_job', 'begin_current_job', 'resume_movement', 'begin_working', 'finish_working')),
+	('movement', 'horizons.world.units.movingobject', 'MovingObject', ('_move_tick', )),
+	('movement', 'horizons.world.units.ship', 'Ship', ('_move_tick', )),
+	('movement', 'horizons.world.units.groundunit', 'GroundUnit', ('_move_tick', )),
+)
+
+
+def _run_map(mapgen, seed, ai_players, human_player=True):
+	from tests.game import new_session
+	return new_session(mapgen=mapgen, rng_seed=seed, human_player=human_player,
+	                   ai_players=ai_players)[0]
+
+def _run_savegame(path, seed):
+	from tests.game import load_session
+	fd, filename = tempfile.mkstemp()
+	os.close(fd)
+	with open(path, 'rb') as f:
+		data = f.read()
+	if path.endswith('.bz2'):
+		data = bz2.decompress(data)
+	with open(filename, 'wb') as f:
+		f.write(data)
+	return load_session(filename, rng_seed=seed)
+
+def _small(seed):
+	from horizons.util.random_map import generate_map_from_seed
+	return _run_map(functools.partial(generate_map_from_seed, seed), seed, ai_players=1)
+
+def _ai(seed):
+	from horizons.util.random_map import generate_map_from_seed
+	return _run_map(functools.partial(generate_map_from_seed, seed), seed, ai_players=4,
+	                human_player=False)
+
+def _huge(seed):
+	from horizons.util.random_map import generate_huge_map_from_seed
+	return _run_map(functools.partial(generate_huge_map_from_seed, seed), seed, ai_players=2)
+
+def _savegame(seed):
+	return _run_savegame(os.path.join('tests', 'game', 'fixtures', 'large.sqlite.bz2'), seed)
+
+# name: function(seed) that returns a started session
+SCENARIOS = {
+	'small': _small,
+	'ai': _ai,
+	'huge': _huge,
+	'savegame': _savegame,
+}
+
+
+class SubsystemTimings(object):
+	"""Measures the time spent in the INSTRUMENTED_METHODS by wrapping them."""
+
+	def __init__(self):
+		self._nested_times = [] # time spent in nested measured calls, for every active call
+		self.reset()
+
+	def reset(self):
+		self.seconds = defaultdict(float)
+		self.calls = defaultdict(int)
+
+	def install(self):
+		for subsystem, module, class_name, methods in INSTRUMENTED_METHODS:
+			cls = getattr(importlib.import_module(module), class_name)
+			for method in methods:
+				setattr(cls, method, self._wrap(subsystem, cls.__dict__[method]))
+
+	def _wrap(self, subsystem, function):
+		nested_times = self._nested_times
+		@functools.wraps(function)
+		def measured(*args, **kwargs):
+			nested_times.append(0.0)
+			start = time.perf_counter()
+			try:
+				return function(*args, **kwargs)
+			finally:
+				elapsed = time.perf_counter() - start
+				self.seconds[subsystem] += elapsed - nested_times.pop()
+				self.calls[subsystem] += 1
+				if nested_times:
+					nested_times[-1] += elapsed
+		return measured
+
+	def get_data(self):
+		return dict((subsystem, {'seconds': self.seconds[subsystem], 'calls': self.calls[subsystem]})
+		            for subsystem in sorted(self.seconds))
+
+
+def run_scenario(name, ticks, seed):
+	"""Runs the scenario in this process.
+	@return: dict with the results"""
+	gettext.install('')
+	from run_tests import setup_horizons
+	setup_horizons()
+
+	import horizons.globals
+	import horizons.main
+	from horizons.util.changelistener import OncePerTickListeners
+	from tests.game import SPTestSession
+	horizons.globals.db = horizons.main._create_main_db()
+
+	timings = SubsystemTimings()
+	timings.install()
+
+	start = time.perf_counter()
+	session = SCENARIOS[name](seed)
+	load_seconds = time.perf_counter() - start
+
+	timings.reset()
+	notifications, calls = OncePerTickListeners.notifications, OncePerTickListeners.calls
+	start = time.perf_counter()
+	session.run(ticks=ticks)
+	seconds = time.perf_counter() - start
+
+	result = {
+		'ticks': ticks,
+		'seed': seed,
+		'load_seconds': load_seconds,
+		'seconds': seconds,
+		'ticks_per_second': ticks / seconds,
+		'subsystems': timings.get_data(),
+		# change listeners added with once_per_tick, and how often they were actually called
+		'once_per_tick_listeners': {
+			'notifications': OncePerTickListeners.notifications - notifications,
+			'calls': OncePerTickListeners.calls - calls,
+		},
+		'settler_economy': measure_settler_economy(session),
+		'save': measure_save(session),
+		'building_indexers': measure_building_indexers(session),
+		# kilobytes on linux, bytes on mac os
+		'peak_memory': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+	}
+
+	session.end(keep_map=True)
+	SPTestSession.cleanup()
+	return result
+
+
+def measure_settler_economy(session):
+	"""Counts the settlers and the scheduler calls their monthly ticks need.
+	Without the settler economy, every settler had a call of its own.
+	@return: dict with the numbers"""
+	settlers = calls = 0
+	for island in session.world.islands:
+		for settlement in island.settlements:
+			settlers += settlement.settler_economy.get_num_settlers()
+			calls += settlement.settler_economy.get_num_calls()
+	return {'settlers': settlers, 'scheduler_calls': calls}
+
+
+def measure_save(session):
+	"""Saves the session into a temporary file.
+	@return: dict with the time and the number of rows of the savegame"""
+	from horizons.util.dbreader import DbReader
+	fd, savegame = tempfile.mkstemp()
+	os.close(fd)
+	try:
+		start = time.perf_counter()
+		assert session.save(savegamename=savegame)
+		seconds = time.perf_counter() - start
+
+		db = DbReader(savegame)
+		tables = db("SELECT name FROM sqlite_master WHERE type = 'table'")
+		rows = sum(db('SELECT count(*) FROM "{}"'.format(table))[0][0] for (table, ) in tables)
+		db.close()
+	finally:
+		os.remove(savegame)
+	return {'seconds': seconds, 'rows': rows, 'rows_per_second': rows / seconds}
+
+
+def get_deep_size(obj, exclude=()):
+	"""Returns the size in bytes of obj and all objects it references.
+	@param exclude: objects that aren't counted and not followed, e.g. the indexed buildings"""
+	seen = set(id(o) for o in exclude)
+	pending = [obj]
+	size = 0
+	while pending:
+		o = pending.pop()
+		if id(o) in seen or isinstance(o, type):
+			continue
+		seen.add(id(o))
+		size += sys.getsizeof(o)
+		pending.extend(gc.get_referents(o))
+	return size
+
+
+def measure_building_indexers(session):
+	"""Measures the memory used by the building indexers of every island and the time to
+	build them from scratch.
+	@return: dict {island worldid: {building id: dict with the measurements}}"""
+	from horizons.util.buildingindexer import BuildingIndexer
+	results = {}
+	for island in session.world.islands:
+		results[island.worldid] = island_results = {}
+		for building_id, indexer in island.building_indexers.items():
+			buildings = [building for building in island.buildings if building.id == building_id]
+			exclude = buildings + [island, session.random]
+
+			start = time.perf_counter()
+			new_indexer = BuildingIndexer(indexer.radius, island, session.random, buildings=buildings)
+			entries = sum(new_indexer.get_num_buildings_in_range(coords) for coords in island)
+			build_seconds = time.perf_counter() - start
+
+			island_results[building_id] = {
+				'tiles': len(island.ground_map),
+				'buildings': len(buildings),
+				'entries': entries,
+				'bytes': get_deep_size(new_indexer, exclude),
+				'build_seconds': build_seconds,
+			}
+	return results
+
+
+def get_commit():
+	try:
+		return subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+		                               stderr=subprocess.DEVNULL).decode().strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+def main():
+	parser = OptionParser(usage="%prog [options]")
+	parser.add_option("-s", "--scenario", dest="scenarios", action="append", metavar="<name>",
+	                  help="Run only this scenario, can be given multiple times. "
+	                       "Available: " + ", ".join(sorted(SCENARIOS)))
+	parser.add_option("-t", "--ticks", dest="ticks", type="int", default=2000,
+	                  help="Number of ticks to run every scenario (default: %default).")
+	parser.add_option("--seed", dest="seed", type="int", default=42,
+	                  help="Seed of the maps and the games (default: %default).")
+	parser.add_option("-o", "--output", dest="output", metavar="<file>",
+	                  help="Write the results to <file> instead of stdout.")
+	parser.add_option("--result-file", dest="result_file", help=SUPPRESS_HELP)
+	(options, args) = parser.parse_args()
+
+	if options.result_file:
+		# we are the child process of a single scenario
+		result = run_scenario(options.scenarios[0], options.ticks, options.seed)
+		with open(options.result_file, 'w') as f:
+			json.dump(result, f)
+		return 0
+
+	scenarios = options.scenarios or sorted(SCENARIOS)
+	for name in scenarios:
+		if name not in SCENARIOS:
+			parser.error("unknown scenario: " + name)
+
+	results = {
+		'commit': get_commit(),
+		'python': platform.python_version(),
+		'platform': platform.platform(),
+		'scenarios': {},
+	}
+	for name in scenarios:
+		print('running scenario {}...'.format(name), file=sys.stderr)
+		fd, result_file = tempfile.mkstemp(suffix='.json')
+		os.close(fd)
+		try:
+			returncode = subprocess.call([sys.executable, os.path.abspath(__file__),
+			                              '--scenario', name, '--ticks', str(options.ticks),
+			                              '--seed', str(options.seed), '--result-file', result_file],
+			                             stdout=subprocess.DEVNULL)
+			if returncode == 0:
+				with open(result_file) as f:
+					results['scenarios'][name] = json.load(f)
+			else:
+				results['scenarios'][name] = {'error': returncode}
+		finally:
+			os.remove(result_file)
+
+	output = json.dumps(results, indent=2, sort_keys=True)
+	if options.output:
+		with open(options.output, 'w') as f:
+			f.write(output + '\n')
+	else:
+		print(output)
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
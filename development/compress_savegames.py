@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""
+Compresses or decompresses savegames and reports sizes and times.
+
+	./development/compress_savegames.py ~/.unknown-horizons/save/*.sqlite
+	./development/compress_savegames.py --level 9 --check replays/*.sqlite
+	./development/compress_savegames.py --decompress replays/*.sqlite
+
+Files are replaced in place, the game loads both kinds. With --check, every compressed
+file is decompressed again and compared to the original.
+"""
+
+import filecmp
+import os
+import sys
+import tempfile
+import time
+from optparse import OptionParser
+
+# make this script work both when started inside development and in the uh root dir
+if not os.path.exists('content'):
+	os.chdir('..')
+assert os.path.exists('content'), 'Content dir not found.'
+sys.path.append('.')
+
+from horizons.util import savegamecompression # isort:skip
+
+
+def compress(path, level, check):
+	"""@return: (size before, size after, seconds to compress, seconds to decompress or None)"""
+	size = os.path.getsize(path)
+	fd, compressed = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+	os.close(fd)
+	try:
+		start = time.perf_counter()
+		savegamecompression.compress_file(path, compressed, level)
+		seconds = time.perf_counter() - start
+
+		decompress_seconds = None
+		if check:
+			fd, decompressed = tempfile.mkstemp()
+			os.close(fd)
+			try:
+				start = time.perf_counter()
+				savegamecompression.decompress_file(compressed, decompressed)
+				decompress_seconds = time.perf_counter() - start
+				if not filecmp.cmp(path, decompressed, shallow=False):
+					raise ValueError("Decompressed file differs from " + path)
+			finally:
+				os.remove(decompressed)
+		compressed_size = os.path.getsize(compressed)
+		os.replace(compressed, path)
+	except Exception:
+		os.remove(compressed)
+		raise
+	return size, compressed_size, seconds, decompress_seconds
+
+
+def decompress(path):
+	"""@return: (size before, size after, seconds, None)"""
+	size = os.path.getsize(path)
+	fd, decompressed = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+	os.close(fd)
+	start = time.perf_counter()
+	try:
+		savegamecompression.decompress_file(path, decompressed)
+	except Exception:
+		os.remove(decompressed)
+		raise
+	seconds = time.perf_counter() - start
+	os.replace(decompressed, path)
+	return size, os.path.getsize(path), seconds, None
+
+
+def main():
+	parser = OptionParser(usage="%prog [options] <savegame> ...")
+	parser.add_option("-l", "--level", dest="level", type="int", default=6,
+	                  help="zlib compression level from 1 (fast) to 9 (small) (default: %default).")
+	parser.add_option("-d", "--decompress", dest="decompress", action="store_true", default=False,
+	                  help="Decompress the savegames instead.")
+	parser.add_option("-c", "--check", dest="check", action="store_true", default=False,
+	                  help="Decompress the compressed savegames again, compare them and report the time.")
+	(options, args) = parser.parse_args()
+	if not args:
+		parser.error("no savegames given")
+
+	totals = [0, 0, 0.0, 0.0]
+	print('{:<50} {:>12} {:>12} {:>7} {:>9} {:>9}'.format('savegame', 'before', 'after', 'ratio', 'seconds',
+	                                                     'check'))
+	for path in args:
+		if savegamecompression.is_compressed(path) != options.decompress:
+			print('{:<50} skipped'.format(path))
+			continue
+		if options.decompress:
+			result = decompress(path)
+		else:
+			result = compress(path, options.level, options.check)
+		size, new_size, seconds, check_seconds = result
+		print('{:<50} {:>12} {:>12} {:>7.3f} {:>9.3f} {:>9}'.format(
+			path, size, new_size, new_size / size, seconds,
+			'{:.3f}'.format(check_seconds) if check_seconds is not None else '-'))
+		totals[0] += size
+		totals[1] += new_size
+		totals[2] += seconds
+		totals[3] += check_seconds or 0.0
+	if totals[0]:
+		print('{:<50} {:>12} {:>12} {:>7.3f} {:>9.3f} {:>9.3f}'.format(
+			'total', totals[0], totals[1], totals[1] / totals[0], totals[2], totals[3]))
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
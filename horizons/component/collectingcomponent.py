@@ -50,6 +50,8 @@ class CollectingComponent(Component):
 		"""Part of initiation that __init__() and load() share"""
 		# list that holds the collectors that belong to this building.
 		self.__collectors = []
+		# {collector class: (key, possible providers)}, see BuildingCollector.get_possible_providers
+		self.provider_cache = {}
 
 		self.path_nodes = ConsumerBuildingPathNodes(self.instance)
 
@@ -79,6 +81,7 @@ class CollectingComponent(Component):
 		assert not [c for c in self.__collectors]
 		super(CollectingComponent, self).remove()
 		self.__collectors = None
+		self.provider_cache = None
 		self.path_nodes = None
 
 	def save(self, db):
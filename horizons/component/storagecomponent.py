@@ -55,7 +55,7 @@ class StorageComponent(Component):
 		# NOTE: also called on load (initialize usually isn't)
 		if not self.has_own_inventory:
 			self.inventory = self.instance.settlement.get_component(StorageComponent).inventory
-		self.inventory.add_change_listener(self.something_changed)
+		self.inventory.add_change_listener(self.something_changed, once_per_tick=True)
 
 	def remove(self):
 		super(StorageComponent, self).remove()
@@ -64,6 +64,9 @@ class StorageComponent(Component):
 			self.inventory.clear_change_listeners()
 			# remove inventory to prevent any action here in subclass remove
 			self.inventory.reset_all()
+		else:
+			# the settlement inventory outlives us
+			self.inventory.discard_change_listener(self.something_changed)
 
 	def save(self, db):
 		super(StorageComponent, self).save(db)
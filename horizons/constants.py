@@ -99,7 +99,7 @@ class VERSION:
 	REQUIRED_FIFE_VERSION = (REQUIRED_FIFE_MAJOR_VERSION, REQUIRED_FIFE_MINOR_VERSION, REQUIRED_FIFE_PATCH_VERSION)
 
 	## +=1 this if you changed the savegame "api"
-	SAVEGAMEREVISION = 76
+	SAVEGAMEREVISION = 77
 	SAVEGAME_LEAST_UPGRADABLE_REVISION = 48
 
 	@staticmethod
@@ -443,6 +443,11 @@ class GAME:
 	WORLD_WORLDID = 0 # worldid of World object
 	# exit after on tick MAX_TICKS (disabled by setting to None)
 	MAX_TICKS = None # type: Optional[int]
+	# measure the time of the scheduler callbacks of the last ticks (disabled by setting to None)
+	SCHEDULER_PROFILE_TICKS = None # type: Optional[int]
+	SCHEDULER_PROFILE_TOP_COUNT = 20 # number of entries logged when the game ends
+	# zlib level (1-9) savegames are compressed with (disabled by setting to None)
+	SAVEGAME_COMPRESSION_LEVEL = None # type: Optional[int]
 
 # Map related constants
 class MAP:
@@ -516,6 +521,8 @@ class WILD_ANIMAL:
 class COLLECTORS:
 	DEFAULT_WORK_DURATION = 16 # how many ticks collectors pretend to work at target
 	DEFAULT_WAIT_TICKS = 32 # how long collectors wait before again looking for a job
+	JOB_BOARD_WAIT_TICKS = 256 # same for collectors that wait at a job board for new jobs
+	JOB_BOARD_DISPATCH_TICKS = 4 # how long job boards collect posts before waking up collectors
 	DEFAULT_STORAGE_SIZE = 8
 	STATISTICAL_WINDOW = 1000 # How many latest ticks are relevant for calculating how busy a collector is
 
@@ -578,6 +585,9 @@ class PATHS:
 	DEFAULT_WINDOW_ICON_PATH = os.path.join("content", "gui", "images", "logos", "uh_32.png")
 	MAC_WINDOW_ICON_PATH = os.path.join("content", "gui", "icons", "Icon.icns")
 	ATLAS_METADATA_PATH = os.path.join(USER_DIR, "atlas-metadata.cache")
+	# binary copy of the DB_FILES, digest is a hash of their contents
+	DB_SNAPSHOT_PATH = os.path.join(USER_DIR, "gamedata-{digest}.sqlite")
+	SAVEGAME_INDEX_PATH = os.path.join(USER_DIR, "savegame-metadata.cache")
 
 	# paths relative to uh dir
 	ACTION_SETS_DIRECTORY = os.path.join("content", "gfx")
@@ -626,6 +636,8 @@ class SINGLEPLAYER:
 ## MULTIPLAYER
 class MULTIPLAYER:
 	MAX_PLAYER_COUNT = 8
+	# send hashes of every settlement and ship with the checkup hash, to find out what diverged
+	CHECKUP_HASH_DIAGNOSTICS = False
 
 class NETWORK:
 	SERVER_ADDRESS = "master.unknown-horizons.org"
@@ -66,6 +66,7 @@ class Entities(object):
 		cls.load_buildings(db, load_now)
 		cls.load_units(load_now)
 		cls.loaded = True
+		YamlCache.log_statistics()
 
 	@classmethod
 	def load_grounds(cls, db, load_now=False):
@@ -0,0 +1,94 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import json
+import os
+import time
+
+import horizons.main
+from horizons.ext.dummy import Dummy
+from horizons.scheduler import Scheduler
+from horizons.spsession import SPSession
+
+
+class FastForwardSession(SPSession):
+	"""Singleplayer session that runs the simulation as fast as possible for a given time,
+	then saves the game and quits. Used for AI tuning and soak testing.
+
+	Ticking is decoupled from the frames (see Timer.fast_forward), the camera doesn't
+	render anything and there is no ingame gui, so there are no status icons, minimap etc.
+	"""
+
+	def __init__(self, db, game_minutes, savegame, rng_seed=None):
+		"""
+		@param game_minutes: number of ingame minutes to run
+		@param savegame: path of the savegame to write at the end. Timing statistics
+		                 are written to the same path with the extension .json.
+		"""
+		super(FastForwardSession, self).__init__(db, rng_seed, ingame_gui_class=Dummy)
+		self.game_minutes = game_minutes
+		self.savegame = savegame
+		self._start_tick = None
+		self._start_time = None
+
+	def load(self, options):
+		super(FastForwardSession, self).load(options)
+		self.view.cam.setEnabled(False)
+
+	def start(self):
+		super(FastForwardSession, self).start()
+		self.timer.fast_forward = True
+		self._start_tick = Scheduler().cur_tick
+		self._start_time = time.time()
+		ticks = max(1, self.timer.get_ticks(self.game_minutes * 60))
+		Scheduler().add_new_object(self._finish, self, run_in=ticks)
+
+	def reset_autosave(self):
+		pass # the game is saved once at the end
+
+	def save(self, savegamename=None):
+		# there is no gui to ask for another name if saving fails
+		return savegamename is not None and self._do_save(savegamename)
+
+	def _finish(self):
+		seconds = time.time() - self._start_time
+		ticks = Scheduler().cur_tick - self._start_tick
+		self.speed_pause() # stops the timer from running further ticks in this frame
+
+		stats = {
+			'game_minutes': self.game_minutes,
+			'ticks': ticks,
+			'seconds': seconds,
+			'ticks_per_second': ticks / seconds if seconds else None,
+			'savegame': self.savegame,
+		}
+		profiler = Scheduler().profiler
+		if profiler is not None:
+			stats['scheduler_profile'] = dict(
+				(kind, profiler.get_top(kind=kind)) for kind in ('callback', 'type'))
+
+		success = self._do_save(self.savegame)
+		stats['saved'] = success
+		with open(os.path.splitext(self.savegame)[0] + '.json', 'w') as f:
+			json.dump(stats, f, indent=2, sort_keys=True)
+		self.log.info("Fast forward: %s ticks in %.1f seconds, saved to %s", ticks, seconds, self.savegame)
+
+		horizons.main.quit()
@@ -186,9 +186,10 @@ class SelectSavegameDialog(Dialog):
 				# this was a click in the savegame list, but not on an element
 				# it happens when the savegame list is empty
 				return
-			savegame_info = SavegameManager.get_metadata(map_file)
+			savegame_info = SavegameManager.get_savegame_info(map_file)
+			screenshot = SavegameManager.get_screenshot(map_file) if savegame_info['has_screenshot'] else None
 
-			if savegame_info.get('screenshot'):
+			if screenshot:
 				# try to find a writable location, that is accessible via relative paths
 				# (required by fife)
 				fd, filename = tempfile.mkstemp()
@@ -206,7 +207,7 @@ class SelectSavegameDialog(Dialog):
 
 				if fd:
 					with os.fdopen(fd, "wb") as f:
-						f.write(savegame_info['screenshot'])
+						f.write(screenshot)
 					# fife only supports relative paths
 					gui.findChild(name="screenshot").image = path_rel
 					os.unlink(filename)
@@ -177,7 +177,7 @@ class ResourceOverviewBar(object):
 		# called when any game (also new ones) start
 		# register at player inventory for gold updates
 		inv = self.session.world.player.get_component(StorageComponent).inventory
-		inv.add_change_listener(self._update_gold, call_listener_now=True)
+		inv.add_change_listener(self._update_gold, call_listener_now=True, once_per_tick=True)
 		self.gold_gui.show()
 		self._update_gold() # call once more to make pychan happy
 
@@ -251,7 +251,7 @@ class ResourceOverviewBar(object):
 		# fill values
 		inv = self._get_current_inventory()
 		# update on all changes as well as now
-		inv.add_change_listener(self._update_resources, call_listener_now=True)
+		inv.add_change_listener(self._update_resources, call_listener_now=True, once_per_tick=True)
 
 	def set_construction_mode(self, resource_source_instance, build_costs):
 		"""Show resources relevant to construction and build costs
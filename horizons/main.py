@@ -29,10 +29,12 @@ Continue to horizons.session for further ingame digging.
 """
 
 
+import functools
 import json
 import logging
 import os
 import os.path
+import sqlite3
 import sys
 import threading
 import traceback
@@ -42,13 +44,14 @@ from typing import TYPE_CHECKING, Optional
 from fife import fife as fife_module
 
 import horizons.globals
-from horizons.constants import AI, GAME, GAME_SPEED, GFX, NETWORK, PATHS, SINGLEPLAYER, VERSION
+from horizons.constants import AI, GAME, GAME_SPEED, GFX, MULTIPLAYER, NETWORK, PATHS, SINGLEPLAYER, VERSION
 from horizons.extscheduler import ExtScheduler
 from horizons.gui import Gui
 from horizons.i18n import gettext as T
 from horizons.messaging import LoadingProgress
 from horizons.network.networkinterface import NetworkInterface
 from horizons.savegamemanager import SavegameManager
+from horizons.util import dbsnapshot
 from horizons.util.atlasloading import generate_atlases
 from horizons.util.preloader import PreloadingThread
 from horizons.util.python import parse_port
@@ -137,6 +140,15 @@ def start(_command_line_arguments):
 	if command_line_arguments.max_ticks:
 		GAME.MAX_TICKS = command_line_arguments.max_ticks
 
+	if command_line_arguments.profile_scheduler:
+		GAME.SCHEDULER_PROFILE_TICKS = command_line_arguments.profile_scheduler
+
+	if command_line_arguments.compress_savegames:
+		GAME.SAVEGAME_COMPRESSION_LEVEL = command_line_arguments.compress_savegames
+
+	if command_line_arguments.mp_hash_diagnostics:
+		MULTIPLAYER.CHECKUP_HASH_DIAGNOSTICS = True
+
 	# Setup atlases
 	if (command_line_arguments.atlas_generation
 	    and not command_line_arguments.gui_test
@@ -160,6 +172,10 @@ def start(_command_line_arguments):
 		horizons.globals.fife.engine.getSettings().setRenderBackend('OpenGL')
 		horizons.globals.fife.set_fife_setting('PlaySounds', False)
 
+	# the workers must not inherit anything from the engine
+	from horizons.world.mappreprocessor import MapPreprocessor
+	MapPreprocessor.start_workers()
+
 	ExtScheduler.create_instance(horizons.globals.fife.pump)
 	horizons.globals.fife.init()
 
@@ -235,6 +251,10 @@ def start(_command_line_arguments):
 		# don't start main loop if startup failed
 		return False
 
+	if command_line_arguments.fast_forward and _modules.session is None:
+		print("You can only fast forward in combination with a game start parameter such as --start-map, etc.")
+		return False
+
 	if command_line_arguments.gamespeed is not None:
 		if _modules.session is None:
 			print("You can only set the speed via command line in combination with a game start parameter such as --start-map, etc.")
@@ -305,6 +325,8 @@ def setup_gui_logger(command_line_arguments):
 def quit():
 	"""Quits the game"""
 	preloader.wait_for_finish()
+	from horizons.world.mappreprocessor import MapPreprocessor
+	MapPreprocessor.stop_workers()
 	horizons.globals.fife.quit()
 
 def quit_session():
@@ -330,6 +352,13 @@ def start_singleplayer(options):
 
 	if options.is_editor:
 		from horizons.editor.session import EditorSession as session_class
+	elif command_line_arguments.fast_forward:
+		from horizons.fastforwardsession import FastForwardSession
+		savegame = command_line_arguments.fast_forward_save
+		if savegame is None:
+			savegame = SavegameManager.create_filename('fastforward')
+		session_class = functools.partial(FastForwardSession, game_minutes=command_line_arguments.fast_forward,
+		                                  savegame=os.path.abspath(savegame))
 	else:
 		from horizons.spsession import SPSession as session_class
 
@@ -538,6 +567,18 @@ def edit_game_map(saved_game_name):
 def _create_main_db():
 	"""Returns a dbreader instance, that is connected to the main game data dbfiles.
 	NOTE: This data is read_only, so there are no concurrency issues."""
+	_db = UhDbAccessor(':memory:')
+	try:
+		# copying the binary snapshot is much faster than executing the sql files
+		snapshot = dbsnapshot.get_snapshot(PATHS.DB_FILES, PATHS.DB_SNAPSHOT_PATH)
+		# one table of each file, to notice if we got an empty or broken database
+		dbsnapshot.copy_into(snapshot, _db.connection, tables=('colors', 'balance_values', 'citynames'))
+		return _db
+	except (OSError, sqlite3.Error) as e:
+		# e.g. user dir not writable, start anyway
+		logging.getLogger("main").warning("Could not use database snapshot: %s", e)
+		_db.close()
+
 	_db = UhDbAccessor(':memory:')
 	for i in PATHS.DB_FILES:
 		with open(i, "r") as f:
@@ -179,20 +179,25 @@ class MPManager(LivingObject):
 				self.session.ingame_gui.open_error_popup('Out of sync', msg)
 
 	def hash_value_diff(self, player1, hash1, player2, hash2):
-		"""Called when a divergence has been detected"""
+		"""Called when a divergence has been detected.
+		Logs the subsystems that differ, and with MULTIPLAYER.CHECKUP_HASH_DIAGNOSTICS enabled
+		on both sides, also the single settlements and ships."""
 		self.log.error("MPManager: Hash diff:\n%s hash1: %s\n%s hash2: %s" % (player1, hash1, player2, hash2))
 		self.log.error("------------------")
 		self.log.error("Differences:")
-		if len(hash1) != len(hash2):
-			self.log.error("Different length")
-		items1 = sorted(hash1.items())
-		items2 = sorted(hash2.items())
-		for i in range(min(len(hash1), len(hash2))):
-			if (items1[i] != items2[i]):
-				self.log.error(str(i)+": "+str(items1[i]))
-				self.log.error(str(i)+": "+str(items2[i]))
+		self._log_hash_differences(player1, hash1, player2, hash2)
+		details1 = hash1.get('details')
+		details2 = hash2.get('details')
+		if details1 is not None and details2 is not None:
+			self.log.error("Differences of single objects:")
+			self._log_hash_differences(player1, details1, player2, details2)
 		self.log.error("------------------")
 
+	def _log_hash_differences(self, player1, hash1, player2, hash2):
+		for key in sorted(set(hash1) | set(hash2)):
+			if key != 'details' and hash1.get(key) != hash2.get(key):
+				self.log.error("%s: %s: %s, %s: %s", key, player1, hash1.get(key), player2, hash2.get(key))
+
 	def calculate_execution_tick(self, tick):
 		return tick + self.EXECUTIONDELAY
 
@@ -281,8 +286,11 @@ class MPCheckupHashManager(MPPacketmanager):
 		@return False if they are not equal
 		"""
 		pkges = self.get_packets_for_tick(tick)
+		# per object details are only there for diagnostics, the sum of them is part of the hash anyway
+		strip_details = lambda checkup_hash: dict((key, value) for (key, value) in checkup_hash.items()
+		                                          if key != 'details')
 		for pkg in pkges[1:]:
-			if pkges[0].checkup_hash != pkg.checkup_hash:
+			if strip_details(pkges[0].checkup_hash) != strip_details(pkg.checkup_hash):
 				if cb_diff is not None:
 					localplayerid = self.mpmanager.session.world.player.worldid
 					cb_diff("local" if pkges[0].player_id==localplayerid else "pl#%02d" % (pkges[0].player_id),
@@ -32,7 +32,9 @@ from collections import defaultdict
 import horizons.globals
 import horizons.main
 from horizons.constants import PATHS, VERSION
+from horizons.util import savegamecompression
 from horizons.util.dbreader import DbReader
+from horizons.util.savegameindex import SavegameMetadataIndex
 from horizons.util.yamlcache import YamlCache
 
 
@@ -85,6 +87,9 @@ class SavegameManager(object):
 	savegame_metadata_types = {'timestamp': float, 'savecounter': int,
 	                           'savegamerev': int, 'rng_state': str}
 
+	# SavegameMetadataIndex used by get_savegame_info, created on first use
+	metadata_index = None
+
 	@classmethod
 	def init(cls):
 		# create savegame directory if it does not exist
@@ -108,15 +113,16 @@ class SavegameManager(object):
 
 		for f in files:
 			if f.startswith(cls.autosave_dir):
-				name = "Autosave {date}".format(date=get_timestamp_string(cls.get_metadata(f)))
+				name = "Autosave {date}".format(date=get_timestamp_string(cls.get_savegame_info(f)))
 			elif f.startswith(cls.quicksave_dir):
-				name = "Quicksave {date}".format(date=get_timestamp_string(cls.get_metadata(f)))
+				name = "Quicksave {date}".format(date=get_timestamp_string(cls.get_savegame_info(f)))
 			else:
 				name = os.path.splitext(os.path.basename(f))[0]
 
 			if not isinstance(name, str):
 				name = str(name, errors='replace') # only use unicode strings, guichan needs them
 			displaynames.append(name)
+		cls._get_metadata_index().sync()
 		return displaynames
 
 	@classmethod
@@ -222,8 +228,72 @@ class SavegameManager(object):
 		metadata = cls.savegame_metadata.copy()
 		if isinstance(savegamefile, list):
 			return metadata
-		db = DbReader(savegamefile)
+		with savegamecompression.uncompressed(savegamefile) as path:
+			db = DbReader(path)
+			try:
+				cls._read_metadata(db, savegamefile, metadata)
+			finally:
+				db.close()
+		return metadata
+
+	@classmethod
+	def _get_metadata_index(cls):
+		if cls.metadata_index is None:
+			cls.metadata_index = SavegameMetadataIndex(PATHS.SAVEGAME_INDEX_PATH)
+		return cls.metadata_index
+
+	@classmethod
+	def get_savegame_info(cls, savegamefile):
+		"""Returns metainfo of a savegame for listing it, the file is only read if it has changed
+		since the last call.
+
+		The dict contains the keys of get_metadata except for the rng state and the screenshot,
+		which can be fetched with get_screenshot if 'has_screenshot' is set. Additionally,
+		there are 'map_name' (None for random maps) and 'players' (number of human and ai players).
+		"""
+		return cls._get_metadata_index().get(savegamefile, cls._read_savegame_info)
+
+	@classmethod
+	def _read_savegame_info(cls, savegamefile):
+		metadata = cls.savegame_metadata.copy()
+		with savegamecompression.uncompressed(savegamefile) as path:
+			db = DbReader(path)
+			try:
+				cls._read_metadata(db, savegamefile, metadata)
+				return cls._get_savegame_info(db, metadata)
+			finally:
+				db.close()
+
+	@classmethod
+	def _get_savegame_info(cls, db, metadata):
+		"""Returns the entry of the metadata index, see get_savegame_info.
+		@param metadata: dict like get_metadata, is modified"""
+		try:
+			map_name = db("SELECT value FROM metadata WHERE name = ?", 'map_name')
+			players = db("SELECT count(rowid) FROM player WHERE is_trader = 0 AND is_pirate = 0")
+		except sqlite3.OperationalError:
+			map_name, players = None, None
+		del metadata['rng_state']
+		metadata['has_screenshot'] = metadata.pop('screenshot', None) is not None
+		metadata['map_name'] = map_name[0][0] if map_name else None
+		metadata['players'] = players[0][0] if players else None
+		return metadata
+
+	@classmethod
+	def index_savegame(cls, savegamefile, info):
+		"""Updates the metadata index after a savegame has been written.
+		@param info: the return value of write_metadata for the savegame"""
+		index = cls._get_metadata_index()
+		index.update(savegamefile, info)
+		index.sync()
+
+	@classmethod
+	def get_screenshot(cls, savegamefile):
+		"""Returns the screenshot of a savegame as png data or None."""
+		return cls.get_metadata(savegamefile).get('screenshot')
 
+	@classmethod
+	def _read_metadata(cls, db, savegamefile, metadata):
 		try:
 			for key in metadata.keys():
 				result = db("SELECT `value` FROM `metadata` WHERE `name` = ?", key)
@@ -233,7 +303,7 @@ class SavegameManager(object):
 		except sqlite3.OperationalError as e:
 			cls.log.warning('Warning: Cannot read savegame {file}: {exception}'
 			                ''.format(file=savegamefile, exception=e))
-			return metadata
+			return
 
 		screenshot_data = None
 		try:
@@ -244,8 +314,6 @@ class SavegameManager(object):
 			pass
 		metadata['screenshot'] = screenshot_data
 
-		return metadata
-
 	@classmethod
 	def _write_screenshot(cls, db):
 		# special handling for screenshot (as blob)
@@ -285,6 +353,7 @@ class SavegameManager(object):
 
 		@param db: DbReader instance.
 		@param savecounter: int, how many times this file has been saved.
+		@return: the data of the savegame for index_savegame, so it doesn't have to be read again.
 		"""
 		metadata = cls.savegame_metadata.copy()
 		metadata['timestamp'] = time.time()
@@ -297,6 +366,12 @@ class SavegameManager(object):
 
 		cls._write_screenshot(db)
 
+		# read the values back, so the index has exactly what the file contains
+		# (e.g. the timestamp is stored as text)
+		metadata = cls.savegame_metadata.copy()
+		cls._read_metadata(db, db.db_path, metadata)
+		return cls._get_savegame_info(db, metadata)
+
 	@classmethod
 	def get_regular_saves(cls, include_displaynames=True):
 		"""Returns all savegames that were saved via the ingame save dialog.
@@ -19,6 +19,7 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import itertools
 import logging
 from collections import deque
 
@@ -26,17 +27,25 @@ import horizons.main
 from horizons.constants import GAME
 from horizons.util.living import LivingObject
 from horizons.util.python.singleton import ManualConstructionSingleton
+from horizons.util.schedulerprofiler import SchedulerProfiler
 
 
 class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 	""""Class providing timed callbacks.
 	Master of time.
 
-	TODO:
-	- Refactor to use a data structure that is suitable for iteration (ticking) as well as
-	  searching/deleting by instance, possibly also by callback.
-	  Suggestion: { tick -> { instance -> [callback] }} (basically a k-d tree)
+	Data structures:
+	- schedule: { tick -> deque of (CallbackObject, entry id) }. This is a timing wheel keyed
+	  by absolute tick, the order of a deque is the execution order within that tick.
+	- calls_by_instance: { instance -> [CallbackObject] }, used for get_classinst_calls.
+	- queued_by_instance: { instance -> { CallbackObject -> None } } of all calls that have
+	  valid entries in the schedule (which may differ from calls_by_instance), used by rem_call.
 
+	Removing calls never searches the schedule. All queued entries of a CallbackObject
+	are invalidated at once by raising its valid_from entry id, stale entries are dropped
+	when their tick is run. Adding and removing calls therefore doesn't depend on the size
+	of the schedule, only on the number of calls of the instance, and the remaining calls
+	are executed in exactly the same order as if they had been deleted from the deques.
 
 	@param timer: Timer instance the schedular registers itself with.
 	"""
@@ -54,12 +63,29 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 		self.schedule = {}
 		self.additional_cur_tick_schedule = [] # jobs to be executed at the same tick they were added
 		self.calls_by_instance = {} # for get_classinst_calls
+		self.queued_by_instance = {} # for rem_call
 		self.cur_tick = self.__class__.FIRST_TICK_ID-1 # before ticking
+		self.ticking = False # whether tick() is running
+		self._entry_ids = itertools.count(1)
 		self.timer = timer
 		self.timer.add_call(self.tick)
+		self.profiler = None # SchedulerProfiler, only set when profiling
+		if GAME.SCHEDULER_PROFILE_TICKS:
+			self.enable_profiling(GAME.SCHEDULER_PROFILE_TICKS)
+
+	def enable_profiling(self, window):
+		"""Starts measuring the time spent in the callbacks, see SchedulerProfiler.
+		@param window: int, number of ticks to take into account"""
+		self.profiler = SchedulerProfiler(window)
+
+	def disable_profiling(self):
+		self.profiler = None
 
 	def end(self):
 		self.log.debug("Scheduler end; len: %s", len(self.schedule))
+		if self.profiler is not None:
+			self.log.info("Scheduler profile of the last %s ticks:\n%s", self.profiler.window,
+			              self.profiler.format_top(GAME.SCHEDULER_PROFILE_TOP_COUNT))
 		self.schedule = None
 		self.timer.remove_call(self.tick)
 		self.timer = None
@@ -76,34 +102,48 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 			horizons.main.quit()
 			return
 
+		self.ticking = True
+
+		profiler = self.profiler
+		if profiler is not None:
+			profiler.start_tick(tick_id)
+
 		if self.cur_tick in self.schedule:
 			self.log.debug("Scheduler: tick %s, cbs: %s", self.cur_tick, len(self.schedule[self.cur_tick]))
 
-			# use iteration method that works in case the list is altered during iteration
-			# this can happen for e.g. rem_all_classinst_calls
+			# use iteration method that works in case the deque is altered during iteration
 			cur_schedule = self.schedule[self.cur_tick]
 			while cur_schedule:
-				callback = cur_schedule.popleft()
+				callback, entry = cur_schedule.popleft()
 				# TODO: some system-level unit tests fail if this list is not processed in the correct order
 				#       (i.e. if e.g. pop() was used here). This is an indication of invalid assumptions
 				#       in the program and should be fixed.
 
-				if hasattr(callback, "invalid"):
+				if entry < callback.valid_from:
+					continue # removed after it has been queued
+				callback.queued -= 1
+				if not callback.queued:
+					self._forget_queued(callback)
+				if callback.invalid:
 					self.log.debug("S(t:%s): %s: INVALID", tick_id, callback)
 					continue
 				self.log.debug("S(t:%s): %s", tick_id, callback)
-				callback.callback()
+				if profiler is None:
+					callback.callback()
+				else:
+					profiler.run(callback)
 				assert callback.loops >= -1
 				if callback.loops != 0:
 					self.add_object(callback, readd=True)
 				else: # gone for good
-					if callback.class_instance in self.calls_by_instance:
+					calls = self.calls_by_instance.get(callback.class_instance)
+					if calls is not None:
 						# this can already be removed by e.g. rem_all_classinst_calls
 						if callback.finish_callback is not None:
 							callback.finish_callback()
 
 						try:
-							self.calls_by_instance[callback.class_instance].remove(callback)
+							calls.remove(callback)
 						except ValueError:
 							pass # also the callback can be deleted by e.g. rem_call
 			del self.schedule[self.cur_tick]
@@ -112,6 +152,7 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 
 		# run jobs added in the loop above
 		self._run_additional_jobs()
+		self.ticking = False
 
 		assert (not self.schedule) or next(iter(self.schedule.keys())) > self.cur_tick
 
@@ -124,9 +165,13 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 		self._run_additional_jobs()
 
 	def _run_additional_jobs(self):
+		profiler = self.profiler
 		for callback in self.additional_cur_tick_schedule:
 			assert callback.loops == 0 # can't loop with no delay
-			callback.callback()
+			if profiler is None:
+				callback.callback()
+			else:
+				profiler.run(callback)
 		self.additional_cur_tick_schedule = []
 
 	def add_object(self, callback_obj, readd=False):
@@ -144,7 +189,13 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 			if tick_key not in self.schedule:
 				self.schedule[tick_key] = deque()
 			callback_obj.tick = tick_key
-			self.schedule[tick_key].append(callback_obj)
+			callback_obj.queued += 1
+			if callback_obj.queued == 1:
+				queued = self.queued_by_instance.get(callback_obj.class_instance)
+				if queued is None:
+					queued = self.queued_by_instance[callback_obj.class_instance] = {}
+				queued[callback_obj] = None
+			self.schedule[tick_key].append((callback_obj, next(self._entry_ids)))
 			if not readd:  # readded calls haven't been removed here
 				if callback_obj.class_instance not in self.calls_by_instance:
 					self.calls_by_instance[callback_obj.class_instance] = []
@@ -156,9 +207,37 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 		@param class_instance: class instance the function belongs to.
 		@param run_in: int number of ticks after which the callback is called. Defaults to 1, run next tick.
 		@param loops: How often the callback is called. -1 = infinite times. Defaults to 1, run once.
-		@param loop_interval: Delay between subsequent loops in ticks. Defaults to run_in."""
+		@param loop_interval: Delay between subsequent loops in ticks. Defaults to run_in.
+		@return: the CallbackObject"""
 		callback_obj = _CallbackObject(self, callback, class_instance, run_in, loops, loop_interval, finish_callback=finish_callback)
 		self.add_object(callback_obj)
+		return callback_obj
+
+	def is_last_call(self, callback_obj):
+		"""Returns whether no other call has been queued for the tick of callback_obj after it.
+		Adding work to callback_obj instead of adding a new call is then invisible to everything else.
+		@param callback_obj: CallbackObject of a future tick, see add_new_object"""
+		entries = self.schedule.get(callback_obj.tick)
+		if not entries:
+			return False
+		last_callback_obj, entry = entries[-1]
+		return last_callback_obj is callback_obj and entry >= callback_obj.valid_from
+
+	def _dequeue(self, callback_obj):
+		"""Invalidates all queued schedule entries of callback_obj.
+		@return: int, number of invalidated entries"""
+		removed = callback_obj.queued
+		if removed:
+			callback_obj.valid_from = next(self._entry_ids)
+			callback_obj.queued = 0
+			self._forget_queued(callback_obj)
+		return removed
+
+	def _forget_queued(self, callback_obj):
+		queued = self.queued_by_instance[callback_obj.class_instance]
+		del queued[callback_obj]
+		if not queued:
+			del self.queued_by_instance[callback_obj.class_instance]
 
 	def rem_object(self, callback_obj):
 		"""Removes a CallbackObject from all callback lists
@@ -166,30 +245,24 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 		@return: int, number of removed calls
 		"""
 		removed_objs = 0
+		calls = self.calls_by_instance.get(callback_obj.class_instance)
 		if self.schedule is not None:
-			for key in self.schedule:
-				while callback_obj in self.schedule[key]:
-					self.schedule[key].remove(callback_obj)
-					self.calls_by_instance[callback_obj.class_instance].remove(callback_obj)
-					removed_objs += 1
+			removed_objs = self._dequeue(callback_obj)
+			if calls is not None:
+				for i in range(removed_objs):
+					calls.remove(callback_obj)
 
-		if not self.calls_by_instance[callback_obj.class_instance]:
+		if calls is not None and not calls:
 			del self.calls_by_instance[callback_obj.class_instance]
 
 		return removed_objs
 
 	def rem_all_classinst_calls(self, class_instance):
 		"""Removes all callbacks from the scheduler that belong to the class instance class_inst."""
-		"""
-		for key in self.schedule:
-			callback_objects = self.schedule[key]
-			for i in xrange(len(callback_objects) - 1, -1, -1):
-				if callback_objects[i].class_instance is class_instance:
-					del callback_objects[i]
-		"""
 		if class_instance in self.calls_by_instance:
 			for callback_obj in self.calls_by_instance[class_instance]:
-				callback_obj.invalid = True # don't remove, finding them all takes too long
+				callback_obj.invalid = True # also stops calls that are currently executed from looping
+				self._dequeue(callback_obj)
 			del self.calls_by_instance[class_instance]
 
 		# filter additional callbacks as well
@@ -205,31 +278,22 @@ class Scheduler(LivingObject, metaclass=ManualConstructionSingleton):
 		"""
 		assert callable(callback)
 		removed_calls = 0
-		for key in self.schedule:
-			callback_objects = self.schedule[key]
-			for i in range(len(callback_objects) - 1, -1, -1):
-				if (callback_objects[i].class_instance is instance
-				    and callback_objects[i].callback == callback
-				    and not hasattr(callback_objects[i], "invalid")):
-					del callback_objects[i]
-					removed_calls += 1
-
-		test = 0
-		if removed_calls > 0: # there also must be calls in the calls_by_instance dict
-			for i in range(len(self.calls_by_instance[instance]) - 1, -1, -1):
-				obj = self.calls_by_instance[instance][i]
-				if obj.callback == callback:
-					del self.calls_by_instance[instance][i]
-					test += 1
-			assert test == removed_calls, "{}, {}".format(test, removed_calls)
-			if not self.calls_by_instance[instance]:
+		if instance in self.queued_by_instance:
+			for callback_obj in list(self.queued_by_instance[instance]):
+				if callback_obj.callback == callback and not callback_obj.invalid:
+					removed_calls += self._dequeue(callback_obj)
+
+		if removed_calls > 0 and instance in self.calls_by_instance:
+			calls = self.calls_by_instance[instance]
+			calls[:] = [obj for obj in calls if obj.callback != callback]
+			if not calls:
 				del self.calls_by_instance[instance]
 
-		for i in range(len(self.additional_cur_tick_schedule) - 1, -1, -1):
-			if self.additional_cur_tick_schedule[i].class_instance is instance and \
-				self.additional_cur_tick_schedule[i].callback == callback:
-					del callback_objects[i]
-					removed_calls += 1
+		# filter additional callbacks as well
+		additional_calls = [cb for cb in self.additional_cur_tick_schedule
+		                    if cb.class_instance is not instance or cb.callback != callback]
+		removed_calls += len(self.additional_cur_tick_schedule) - len(additional_calls)
+		self.additional_cur_tick_schedule = additional_calls
 
 		return removed_calls
 
@@ -290,6 +354,11 @@ class _CallbackObject(object):
 		self.loop_interval = loop_interval if loop_interval is not None else run_in
 		self.class_instance = class_instance
 
+		self.tick = None # tick this call is scheduled for
+		self.queued = 0 # number of valid entries in the schedule
+		self.valid_from = 0 # schedule entries with a smaller id have been removed
+		self.invalid = False # set by Scheduler.rem_all_classinst_calls, never run again
+
 	def __str__(self):
 		cb = str(self.callback)
 		if "_move_tick" in cb: # very crude measure to reduce log noise
@@ -36,7 +36,7 @@ from horizons.command.unit import RemoveUnit
 from horizons.component.ambientsoundcomponent import AmbientSoundComponent
 from horizons.component.namedcomponent import NamedComponent
 from horizons.component.selectablecomponent import SelectableBuildingComponent
-from horizons.constants import GAME_SPEED
+from horizons.constants import GAME, GAME_SPEED
 from horizons.entities import Entities
 from horizons.extscheduler import ExtScheduler
 from horizons.gui.ingamegui import IngameGui
@@ -45,9 +45,13 @@ from horizons.messaging import LoadingProgress, MessageBus, SettingChanged, Spee
 from horizons.savegamemanager import SavegameManager
 from horizons.scenario import ScenarioEventHandler
 from horizons.scheduler import Scheduler
-from horizons.util.dbreader import DbReader
+from horizons.util import savegamecompression
+from horizons.util.changelistener import OncePerTickListeners
+from horizons.util.dbreader import BatchedDbWriter
 from horizons.util.living import LivingObject, livingProperty
+from horizons.util.python import get_traced_memory
 from horizons.util.savegameaccessor import SavegameAccessor
+from horizons.util.savegamesnapshot import SavegameWriterThread
 from horizons.util.uhdbaccessor import read_savegame_template
 from horizons.util.worldobject import WorldObject
 from horizons.view import View
@@ -119,6 +123,8 @@ class Session(LivingObject):
 		self.selection_groups = [set() for _unused in range(10)]
 
 		self._old_autosave_interval = None
+		# (SavegameWriterThread, callback, savegame info) while saving in the background
+		self._background_save = None
 
 	def start(self):
 		"""Actually starts the game."""
@@ -161,11 +167,17 @@ class Session(LivingObject):
 		NamedComponent.reset()
 		AIPlayer.clear_caches()
 		SelectableBuildingComponent.reset()
+		OncePerTickListeners.reset()
 
 	def end(self):
 		self.log.debug("Ending session")
 		self.is_alive = False
 
+		# don't report the result anymore, the gui is gone soon
+		if self._background_save is not None:
+			self._background_save[0].join()
+			self._background_save = None
+
 		# Has to be done here, cause the manager uses Scheduler!
 		Scheduler().rem_all_classinst_calls(self)
 		ExtScheduler().rem_all_classinst_calls(self)
@@ -194,6 +206,7 @@ class Session(LivingObject):
 
 		# discard() in case loading failed and we did not yet subscribe
 		SettingChanged.discard(self._on_setting_changed)
+		LoadingProgress.discard(self._on_loading_progress)
 		MessageBus().reset()
 
 	def quit(self):
@@ -226,6 +239,9 @@ class Session(LivingObject):
 			options.is_map = True
 
 		self.log.debug("Session: Loading from %s", options.game_identifier)
+		self._load_phases = []
+		self._on_loading_progress(LoadingProgress(self, 'session_load_savegame'))
+		LoadingProgress.subscribe(self._on_loading_progress)
 		savegame_db = SavegameAccessor(options.game_identifier, options.is_map, options) # Initialize new dbreader
 		savegame_data = SavegameManager.get_metadata(savegame_db.db_path)
 		self.view.resize_layers(savegame_db)
@@ -270,6 +286,8 @@ class Session(LivingObject):
 
 		assert hasattr(self.world, "player"), 'Error: there is no human player'
 		LoadingProgress.broadcast(self, "session_finish")
+		LoadingProgress.unsubscribe(self._on_loading_progress)
+		self._log_load_phases()
 		"""
 		TUTORIAL:
 		That's it. After that, we call start() to activate the timer, and we're live.
@@ -277,6 +295,15 @@ class Session(LivingObject):
 		(horizons/world/__init__.py). It's where the magic happens and all buildings and units are loaded.
 		"""
 
+	def _on_loading_progress(self, message):
+		self._load_phases.append((message.stage, time.perf_counter(), get_traced_memory()))
+
+	def _log_load_phases(self):
+		"""Logs the time and memory of every loading stage until the next one."""
+		for (stage, start, memory), (_, end, next_memory) in zip(self._load_phases, self._load_phases[1:]):
+			allocated = next_memory - memory if memory is not None else None
+			self.log.info("Loading stage %-25s %8.3fs %12s bytes", stage, end - start, allocated)
+
 	def speed_set(self, ticks, suggestion=False):
 		"""Set game speed to ticks ticks per second"""
 		old = self.timer.ticks_per_second
@@ -389,12 +416,13 @@ class Session(LivingObject):
 		@param savegame: absolute path"""
 		assert os.path.isabs(savegame)
 		self.log.debug("Session: Saving to %s", savegame)
+		self.wait_for_background_save()
 		try:
 			if os.path.exists(savegame):
 				os.unlink(savegame)
 			self.savecounter += 1
 
-			db = DbReader(savegame)
+			db = BatchedDbWriter(savegame)
 		except IOError as e: # usually invalid filename
 			headline = T("Failed to create savegame file")
 			descr = T("There has been an error while creating your savegame file.")
@@ -413,22 +441,10 @@ class Session(LivingObject):
 			return self.save()
 
 		try:
-			read_savegame_template(db)
-
-			db("BEGIN")
-			self.world.save(db)
-			self.view.save(db)
-			self.ingame_gui.save(db)
-			self.scenario_eventhandler.save(db)
-
-			# Store RNG state
-			rng_state = json.dumps(self.random.getstate())
-			SavegameManager.write_metadata(db, self.savecounter, rng_state)
-
-			# Make sure everything gets written now
-			db("COMMIT")
+			savegame_info = self._save_into(db)
 			db.close()
-			return True
+			if GAME.SAVEGAME_COMPRESSION_LEVEL is not None:
+				savegamecompression.compress_in_place(savegame, GAME.SAVEGAME_COMPRESSION_LEVEL)
 		except Exception:
 			self.log.error("Save Exception:")
 			traceback.print_exc()
@@ -436,3 +452,76 @@ class Session(LivingObject):
 			db.close()
 			os.unlink(savegame)
 			return False
+		SavegameManager.index_savegame(savegame, savegame_info)
+		return True
+
+	def _save_into(self, db):
+		"""Writes the game state into an empty database.
+		@param db: DbReader
+		@return: the data of the savegame for SavegameManager.index_savegame"""
+		read_savegame_template(db)
+
+		db("BEGIN")
+		self.world.save(db)
+		self.view.save(db)
+		self.ingame_gui.save(db)
+		self.scenario_eventhandler.save(db)
+
+		# Store RNG state
+		rng_state = json.dumps(self.random.getstate())
+		savegame_info = SavegameManager.write_metadata(db, self.savecounter, rng_state)
+
+		# Make sure everything gets written now
+		db("COMMIT")
+		return savegame_info
+
+	def _do_save_in_background(self, savegame, callback=None):
+		"""Saves the game without blocking it while the file is written.
+
+		The game state is saved into an in-memory database at once, so it is consistent.
+		That database is handed over to a SavegameWriterThread, which writes it to the file.
+		Only one such save can be in progress at a time.
+		@param savegame: absolute path
+		@param callback: called with the success as bool on the main thread when the file
+		                 has been written
+		@return: bool, whether the save has been started"""
+		assert os.path.isabs(savegame)
+		if self._background_save is not None:
+			self.log.warning("Session: Not saving to %s, still writing the last savegame", savegame)
+			return False
+		self.log.debug("Session: Saving to %s in the background", savegame)
+		self.savecounter += 1
+		db = BatchedDbWriter(':memory:', check_same_thread=False)
+		try:
+			savegame_info = self._save_into(db)
+		except Exception:
+			self.log.error("Save Exception:")
+			traceback.print_exc()
+			db.close()
+			return False
+
+		thread = SavegameWriterThread(db, savegame, GAME.SAVEGAME_COMPRESSION_LEVEL)
+		self._background_save = (thread, callback, savegame_info)
+		thread.start()
+		ExtScheduler().add_new_object(self._check_background_save, self, run_in=0.1)
+		return True
+
+	def _check_background_save(self):
+		"""Runs the callback of the background save if it has finished, else checks again later."""
+		if self._background_save is None: # already handled by wait_for_background_save
+			return
+		thread, callback, savegame_info = self._background_save
+		if thread.is_alive():
+			ExtScheduler().add_new_object(self._check_background_save, self, run_in=0.1)
+			return
+		self._background_save = None
+		if thread.success:
+			SavegameManager.index_savegame(thread.path, savegame_info)
+		if callback is not None:
+			callback(thread.success)
+
+	def wait_for_background_save(self):
+		"""Blocks until a running background save has been written."""
+		if self._background_save is not None:
+			self._background_save[0].join()
+			self._check_background_save()
@@ -49,7 +49,9 @@ class SPSession(Session):
 	def autosave(self):
 		"""Called automatically in an interval"""
 		self.log.debug("Session: autosaving")
-		success = self._do_save(SavegameManager.create_autosave_filename())
+		self._do_save_in_background(SavegameManager.create_autosave_filename(), self._on_autosaved)
+
+	def _on_autosaved(self, success):
 		if success:
 			SavegameManager.delete_dispensable_savegames(autosaves=True)
 			self.ingame_gui.message_widget.add('AUTOSAVE')
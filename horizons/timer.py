@@ -36,6 +36,7 @@ class Timer(LivingObject):
 
 	ACCEPTABLE_TICK_DELAY = 0.2 # sec
 	DEFER_TICK_ON_DELAY_BY = 0.4 # sec
+	FAST_FORWARD_FRAME_TIME = 0.5 # sec, time to tick between two frames in fast forward mode
 
 
 	def __init__(self, tick_next_id=Scheduler.FIRST_TICK_ID, freeze_protection=False):
@@ -51,6 +52,7 @@ class Timer(LivingObject):
 		self.tick_next_time = 0.0
 		self.tick_func_test = []
 		self.tick_func_call = []
+		self.fast_forward = False # tick as fast as possible, see check_tick
 
 	def activate(self):
 		"""Actually starts the timer"""
@@ -96,6 +98,9 @@ class Timer(LivingObject):
 		"""check_tick is called by the engines _pump function to signal a frame idle."""
 		if self.ticks_per_second == 0:
 			return
+		if self.fast_forward:
+			self._fast_forward()
+			return
 		while time.time() >= self.tick_next_time and (GAME.MAX_TICKS is None or self.tick_next_id <= GAME.MAX_TICKS):
 			for f in self.tick_func_test:
 				r = f(self.tick_next_id)
@@ -116,3 +121,23 @@ class Timer(LivingObject):
 				# If a callback changed the speed to zero, we have to exit
 				return
 			self.tick_next_time = (self.tick_next_time or time.time()) + 1.0 / self.ticks_per_second
+
+	def _fast_forward(self):
+		"""Runs ticks regardless of the game speed until FAST_FORWARD_FRAME_TIME has passed,
+		so only few frames are drawn in between."""
+		end = time.time() + self.FAST_FORWARD_FRAME_TIME
+		while time.time() < end and (GAME.MAX_TICKS is None or self.tick_next_id <= GAME.MAX_TICKS):
+			for f in self.tick_func_test:
+				if f(self.tick_next_id) == self.TEST_SKIP:
+					return
+			for f in self.tick_func_call:
+				f(self.tick_next_id)
+			self.tick_next_id += 1
+			if self.ticks_per_second == 0:
+				# If a callback changed the speed to zero, we have to exit
+				return
+			if not self.fast_forward:
+				# continue in normal speed from now on
+				break
+		# the next tick is due one tick after the last one, if fast forward is stopped
+		self.tick_next_time = time.time() + 1.0 / self.ticks_per_second
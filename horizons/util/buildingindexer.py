@@ -19,6 +19,8 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import functools
+
 
 class BuildingIndexer(object):
 	"""
@@ -27,6 +29,11 @@ class BuildingIndexer(object):
 
 	Used to answer queries of the form 'I am at (x, y), where is the closest / random
 	building that provides resource X in my range'.
+
+	Every tile maps to a tuple of the buildings in range, sorted by distance and then
+	by position. Tiles without buildings share the empty tuple. Changes are collected
+	and merged into the tuples of the affected tiles when one of them is queried, so
+	a tile is never fully resorted.
 	"""
 
 	def __init__(self, radius, coords_list, random=None, buildings=None):
@@ -38,9 +45,9 @@ class BuildingIndexer(object):
 		@param buildings: initial list of buildings. Will only be read.
 		"""
 		self.radius = radius
-		self._map = {}
-		for coords in coords_list:
-			self._map[coords] = BuildingIndex(coords, random)
+		self._random = random
+		self._map = dict.fromkeys(coords_list, ())
+		self._changed_tiles = {} # {coords: (set of added buildings, set of removed buildings)}
 		self._add_set = set()
 		self._remove_set = set()
 		self._changed = False
@@ -58,47 +65,58 @@ class BuildingIndexer(object):
 		self._remove_set.add(building)
 		self._changed = True
 
+	def _get_tile_changes(self, coords):
+		try:
+			return self._changed_tiles[coords]
+		except KeyError:
+			changes = self._changed_tiles[coords] = (set(), set())
+			return changes
+
 	def _update(self, add_buildings=None, initial=False):
 		"""
 		@param add_buildings: Don't use unless you know why.
 		@param initial: can be set on first call as optimization
 		"""
+		island_map = self._map
 		for building in self._remove_set:
 			for coords in building.position.get_radius_coordinates(self.radius, include_self=True):
-				try:
-					index = self._map[coords]
-				except KeyError:
-					continue # should be faster than contains check, since usually True
-				index._remove_set.add(building)
-				index._add_set.discard(building)
-				index._changed = True
+				if coords in island_map:
+					added, removed = self._get_tile_changes(coords)
+					removed.add(building)
+					added.discard(building)
 
 		if not add_buildings:
 			add_buildings = self._add_set
 		for building in add_buildings:
 			for coords in building.position.get_radius_coordinates(self.radius, include_self=True):
-				try:
-					index = self._map[coords]
-				except KeyError:
-					continue # should be faster than contains check, since usually True
-				if not initial:
-					index._remove_set.discard(building)
-				index._add_set.add(building)
-				index._changed = True
+				if coords in island_map:
+					added, removed = self._get_tile_changes(coords)
+					if not initial:
+						removed.discard(building)
+					added.add(building)
 
 		self._changed = False
 		self._add_set.clear()
 		self._remove_set.clear()
 
+	def _get_tile(self, coords):
+		"""Returns the sorted tuple of buildings in range of coords after applying the changes."""
+		if self._changed:
+			self._update()
+		buildings = self._map[coords]
+		if coords in self._changed_tiles:
+			added, removed = self._changed_tiles.pop(coords)
+			buildings = _update_tile(coords, buildings, added, removed)
+			self._map[coords] = buildings
+		return buildings
+
 	def get_buildings_in_range(self, coords):
 		"""
 		Returns all buildings in range in the form of a Building generator
 		@param coords: tuple, the point around which to get the buildings
 		"""
 		if coords in self._map:
-			if self._changed:
-				self._update()
-			return self._map[coords].get_buildings_in_range()
+			return iter(self._get_tile(coords))
 		return []
 
 	def get_random_building_in_range(self, coords):
@@ -108,9 +126,9 @@ class BuildingIndexer(object):
 		@param coords: tuple, the point around which to get the building
 		"""
 		if coords in self._map:
-			if self._changed:
-				self._update()
-			return self._map[coords].get_random_building_in_range()
+			buildings = self._get_tile(coords)
+			if buildings:
+				return self._random.choice(buildings)
 		return None
 
 	def get_num_buildings_in_range(self, coords):
@@ -119,76 +137,62 @@ class BuildingIndexer(object):
 		@param coords: tuple, the center point
 		"""
 		if coords in self._map:
-			if self._changed:
-				self._update()
-			return self._map[coords].get_num_buildings_in_range()
-
-
-
-class BuildingIndex(object):
+			return len(self._get_tile(coords))
+
+
+def _get_sort_key(coords, building):
+	"""Returns the key the buildings around coords are sorted by:
+	squared distance, then the position of the building."""
+	x, y = coords
+	pos = building.position
+	left = pos.left
+	right = pos.right
+	top = pos.top
+	bottom = pos.bottom
+
+	x_diff = left - x
+	if x_diff < x - right:
+		x_diff = x - right
+	if x_diff < 0:
+		x_diff = 0
+
+	y_diff = top - y
+	if y_diff < y - bottom:
+		y_diff = y - bottom
+	if y_diff < 0:
+		y_diff = 0
+
+	return (x_diff * x_diff + y_diff * y_diff, top, bottom, left, right)
+
+
+def _update_tile(coords, buildings, added, removed):
+	"""Returns the new sorted tuple of buildings around coords.
+	The added buildings are sorted on their own and then inserted at the positions found by
+	binary search in the old tuple, which is copied in slices between them.
+	@param buildings: old sorted tuple
+	@param added: set of buildings to add
+	@param removed: set of buildings to remove
 	"""
-	Indexes buildings around a tile to improve nearby building lookup speed.
-	The code isn't particularly pretty for performance reasons.
-	"""
-
-	def __init__(self, coords, random):
-		self._coords = coords
-		self._random = random
-		self._add_set = set()
-		self._remove_set = set()
-		self._list = []
-		self._changed = False
-
-	def _update(self):
-		new_list = []
-		for element in self._list:
-			if element[5] not in self._remove_set:
-				new_list.append(element)
-
-		x = self._coords[0]
-		y = self._coords[1]
-		for building in self._add_set:
-			pos = building.position
-			left = pos.left
-			right = pos.right
-			top = pos.top
-			bottom = pos.bottom
-
-			x_diff = left - x
-			if x_diff < x - right:
-				x_diff = x - right
-			if x_diff < 0:
-				x_diff = 0
-
-			y_diff = top - y
-			if y_diff < y - bottom:
-				y_diff = y - bottom
-			if y_diff < 0:
-				y_diff = 0
-
-			new_list.append((x_diff * x_diff + y_diff * y_diff, top, bottom, left, right, building))
-
-		self._list = new_list
-		self._list.sort()
-
-		self._add_set.clear()
-		self._remove_set.clear()
-		self._changed = False
-
-	def get_buildings_in_range(self):
-		if self._changed:
-			self._update()
-		for element in self._list:
-			yield element[5]
-
-	def get_random_building_in_range(self):
-		if self._changed:
-			self._update()
-		if self._list:
-			return self._random.choice(self._list)[5]
-		return None
-
-	def get_num_buildings_in_range(self):
-		if self._changed:
-			self._update()
-		return len(self._list)
+	if removed:
+		buildings = [building for building in buildings if building not in removed]
+	if not added:
+		return tuple(buildings)
+
+	key = functools.partial(_get_sort_key, coords)
+	result = []
+	start = 0
+	end = len(buildings)
+	for building in sorted(added, key=key):
+		building_key = key(building)
+		low, high = start, end
+		while low < high:
+			middle = (low + high) // 2
+			if key(buildings[middle]) < building_key:
+				low = middle + 1
+			else:
+				high = middle
+		result.extend(buildings[start:low])
+		result.append(building)
+		start = low
+	result.extend(buildings[start:])
+	return tuple(result)
@@ -21,6 +21,7 @@
 
 import logging
 import traceback
+from collections import OrderedDict
 
 from horizons.util.python.callback import Callback
 from horizons.util.python.weakmethodlist import WeakMethodList
@@ -31,6 +32,8 @@ class ChangeListener(object):
 	The object that changes and the object that listens have to inherit from this class.
 	An object calls _changed every time something has changed, obviously.
 	This function calls every Callback, that has been registered to listen for a change.
+	Listeners that only need to know that something has changed during a tick can be added
+	with once_per_tick, they are called once at the end of the tick, see OncePerTickListeners.
 	NOTE: ChangeListeners aren't saved, they have to be reregistered on load
 	NOTE: RemoveListeners must not access the object, as it is in progress of being destroyed.
 	"""
@@ -43,6 +46,7 @@ class ChangeListener(object):
 
 	def __init(self):
 		self.__listeners = WeakMethodList()
+		self.__tick_listeners = WeakMethodList() # listeners added with once_per_tick
 		self.__remove_listeners = WeakMethodList()
 		# number of event calls
 		# if any event is triggered increase the number, after all callbacks are executed decrease it
@@ -85,18 +89,28 @@ class ChangeListener(object):
 			listener_list[:] = [ l for l in listener_list if l ]
 
 	## Normal change listener
-	def add_change_listener(self, listener, call_listener_now=False, no_duplicates=False):
+	def add_change_listener(self, listener, call_listener_now=False, no_duplicates=False, once_per_tick=False):
+		"""
+		@param once_per_tick: only call the listener once at the end of a tick, however often
+		                      something changes during the tick. Changes outside of ticks
+		                      still call it immediately.
+		"""
 		assert callable(listener)
-		if not no_duplicates or listener not in self.__listeners:
-			self.__listeners.append(listener)
+		listener_list = self.__tick_listeners if once_per_tick else self.__listeners
+		if not no_duplicates or listener not in listener_list:
+			listener_list.append(listener)
 		if call_listener_now: # also call if duplicate is added
 			listener()
 
 	def remove_change_listener(self, listener):
-		self.__remove_listener(self.__listeners, listener)
+		if listener in self.__tick_listeners:
+			# never iterated directly, so it can always be removed
+			self.__tick_listeners.remove(listener)
+		else:
+			self.__remove_listener(self.__listeners, listener)
 
 	def has_change_listener(self, listener):
-		return (listener in self.__listeners)
+		return (listener in self.__listeners or listener in self.__tick_listeners)
 
 	def discard_change_listener(self, listener):
 		"""Remove listener if it's there"""
@@ -106,10 +120,17 @@ class ChangeListener(object):
 	def clear_change_listeners(self):
 		"""Removes all change listeners"""
 		self.__listeners = WeakMethodList()
+		self.__tick_listeners = WeakMethodList()
 
 	def _changed(self):
 		"""Calls every listener when an object changed"""
 		self.__call_listeners(self.__listeners)
+		if self.__tick_listeners:
+			OncePerTickListeners.add(self, self.__tick_listeners)
+
+	def _has_tick_listener(self, listener):
+		"""Returns whether the listener is still added with once_per_tick."""
+		return self.__tick_listeners is not None and listener in self.__tick_listeners
 
 	## Removal change listener
 	def add_remove_listener(self, listener, no_duplicates=False):
@@ -138,9 +159,82 @@ class ChangeListener(object):
 
 	def end(self):
 		self.__listeners = None
+		self.__tick_listeners = None
 		self.__remove_listeners = None
 
 
+class OncePerTickListeners(object):
+	"""Calls the change listeners added with once_per_tick at the end of the tick.
+
+	A listener is called once per tick, even if it listens to several objects that have
+	changed. It isn't called if it has been removed from all of them in the meantime.
+	The listeners are called in the order they were first notified, which is the same
+	on all clients.
+	"""
+
+	log = logging.getLogger('changelistener')
+
+	_pending = OrderedDict() # {listener: list of ChangeListeners that have changed}
+	_scheduler = None # the Scheduler that calls the pending listeners at the end of its tick
+
+	# how often listeners were notified, and how often they were actually called
+	notifications = 0
+	calls = 0
+
+	@classmethod
+	def add(cls, changelistener, listeners):
+		"""Notifies the listeners that changelistener has changed."""
+		# NOTE avoid circular import
+		from horizons.scheduler import Scheduler
+		cls.notifications += len(listeners)
+		scheduler = Scheduler()
+		if scheduler is None or not scheduler.ticking:
+			# nobody would call them soon, e.g. while the game is paused
+			for listener in list(listeners):
+				cls._call(listener)
+			return
+
+		if cls._scheduler is not scheduler:
+			cls._pending.clear() # left over from a session that has ended
+			cls._scheduler = scheduler
+			scheduler.add_new_object(cls._flush, cls, run_in=0)
+		for listener in listeners:
+			if listener is None:
+				continue
+			if listener.instance is not None and listener.instance() is None:
+				# dead listeners can't be hashed, see _call for the synchronous case
+				cls.log.warning('The dead are listening to %s: %s', changelistener, listener)
+				continue
+			cls._pending.setdefault(listener, []).append(changelistener)
+
+	@classmethod
+	def reset(cls):
+		"""Forgets the pending listeners, called when a session ends."""
+		cls._pending = OrderedDict()
+		cls._scheduler = None
+
+	@classmethod
+	def _flush(cls):
+		pending = cls._pending
+		cls._pending = OrderedDict()
+		cls._scheduler = None
+		for listener, changelisteners in pending.items():
+			if any(changelistener._has_tick_listener(listener) for changelistener in changelisteners):
+				cls._call(listener)
+
+	@classmethod
+	def _call(cls, listener):
+		if listener is None:
+			return
+		cls.calls += 1
+		try:
+			listener()
+		except ReferenceError as e:
+			# listener object is dead, don't crash since it doesn't need updates now anyway
+			cls.log.warning('The dead are listening: %s', e)
+			traceback.print_stack()
+
+
 """ Class decorator that adds methods for listening for certain events to a class.
 These methods get added automatically (eventname is the name you pass to the decorator):
 - add_eventname_listener(listener):
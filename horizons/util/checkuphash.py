@@ -0,0 +1,68 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import zlib
+
+
+MASK = 2 ** 64 - 1
+
+
+def hash_entry(entry):
+	"""Returns a 64 bit hash of a tuple of values, which is the same in every client.
+	The builtin hash() can't be used, it depends on the platform and is randomized for strings.
+	@param entry: tuple of ints or values with a stable str() representation"""
+	value = 0xcbf29ce484222325
+	for item in entry:
+		if not isinstance(item, int):
+			item = zlib.crc32(str(item).encode())
+		value = ((value ^ (item & MASK)) * 0x100000001b3) & MASK
+	# final mixing (splitmix64), else similar entries would result in similar hashes
+	value = ((value ^ (value >> 30)) * 0xbf58476d1ce4e5b9) & MASK
+	value = ((value ^ (value >> 27)) * 0x94d049bb133111eb) & MASK
+	return value ^ (value >> 31)
+
+
+class CheckupHash(object):
+	"""Hash of a collection of entries, which doesn't depend on the order of the entries.
+
+	It is maintained incrementally by adding and removing single entries, so it can be
+	sampled at any time without looking at the whole collection. Used to check whether
+	the states of multiplayer games have diverged.
+	"""
+
+	def __init__(self):
+		self.value = 0
+
+	def add(self, entry):
+		"""@param entry: tuple, see hash_entry"""
+		self.value = (self.value + hash_entry(entry)) & MASK
+
+	def remove(self, entry):
+		"""Removes an entry that has been added before"""
+		self.value = (self.value - hash_entry(entry)) & MASK
+
+	def replace(self, old_entry, new_entry):
+		self.value = (self.value - hash_entry(old_entry) + hash_entry(new_entry)) & MASK
+
+	@staticmethod
+	def combine(values):
+		"""Combines hash values of several collections into one, order independent"""
+		return sum(values) & MASK
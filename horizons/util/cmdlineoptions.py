@@ -91,8 +91,19 @@ def get_option_parser():
 	             help="Writes log to <filename> instead of to the uh-userdir")
 	dev_group.add_option("--profile", dest="profile", action="store_true",
 	             default=False, help="Enable profiling (for developing only).")
+	dev_group.add_option("--profile-scheduler", dest="profile_scheduler", metavar="<ticks>", type="int",
+	             help="Measure the time of the scheduler callbacks of the last <ticks> ticks "
+	                  "and log the most expensive ones when the game ends.")
 	dev_group.add_option("--max-ticks", dest="max_ticks", metavar="<max_ticks>", type="int",
 	             help="Run the game for <max_ticks> ticks.")
+	dev_group.add_option("--fast-forward", dest="fast_forward", metavar="<minutes>", type="float",
+	             help="Run the started game as fast as possible for <minutes> ingame minutes without "
+	                  "drawing it, then save it and quit. Timing statistics are written next to the savegame.")
+	dev_group.add_option("--fast-forward-save", dest="fast_forward_save", metavar="<filename>",
+	             help="Savegame to write after --fast-forward (default: fastforward in the savegame dir).")
+	dev_group.add_option("--compress-savegames", dest="compress_savegames", metavar="<level>", type="int",
+	             help="Compress the savegames written by this game with zlib level <level> (1-9). "
+	                  "Compressed savegames can always be loaded.")
 	dev_group.add_option("--no-freeze-protection", dest="freeze_protection", action="store_false",
 	             default=True, help="Disable freeze protection.")
 	dev_group.add_option("--string-previewer", dest="stringpreview", action="store_true",
@@ -113,6 +124,9 @@ def get_option_parser():
 	             help="Create an multiplayer game with default settings.")
 	dev_group.add_option("--join-mp-game", action="store_true", dest="join_mp_game",
 	             help="Join first multiplayer game.")
+	dev_group.add_option("--mp-hash-diagnostics", action="store_true", dest="mp_hash_diagnostics",
+	             default=False, help="Log which settlements and ships differ if a multiplayer game "
+	                                 "runs out of sync (for developing only, all players need it).")
 	if VERSION.IS_DEV_VERSION:
 		dev_group.add_option("--no-atlas-generation", action="store_false", dest="atlas_generation",
 	             help="Disable atlas generation.")
@@ -21,22 +21,32 @@
 
 import re
 import sqlite3
-
-from horizons.util.python import decorators
+from collections import OrderedDict
 
 
 class DbReader(object):
 	"""Class that handles connections to sqlite databases
-	@param file: str containing the database file."""
-	def __init__(self, dbfile):
+	@param file: str containing the database file.
+	@param check_same_thread: False to allow using the connection in another thread,
+	                          only one thread may use it at a time then."""
+
+	# maximum number of results that are kept by cached_query, least recently used ones are dropped
+	CACHED_QUERY_SIZE = 4096
+
+	# number of sql commands that have been sent to any database, used for profiling
+	query_count = 0
+
+	def __init__(self, dbfile, check_same_thread=True):
 		self.db_path = dbfile
-		self.connection = sqlite3.connect(dbfile)
+		self.connection = sqlite3.connect(dbfile, check_same_thread=check_same_thread)
 		self.connection.isolation_level = None
 		def regexp(expr, item):
 			r = re.compile(expr)
 			return r.match(item) is not None
 		self.connection.create_function("regexp", 2, regexp)
 		self.cur = self.connection.cursor()
+		self._query_cache = OrderedDict() # {(command, args): result}, least recently used first
+		self._query_cache_size = self.CACHED_QUERY_SIZE
 
 	def __call__(self, command, *args):
 		"""Executes a sql command.
@@ -48,20 +58,36 @@ class DbReader(object):
 		"""
 		assert not command.endswith(";")
 		command = '{};'.format(command)
+		DbReader.query_count += 1
 		self.cur.execute(command, args)
 		return self.cur.fetchall()
 
-	@decorators.cachedmethod
 	def cached_query(self, command, *args):
-		"""Executes a sql command and saves its result in a dict.
+		"""Executes a sql command and saves its result for later calls with the same arguments.
+		Only the CACHED_QUERY_SIZE most recently used results are kept.
 		@params, return: same as in __call__"""
-		return self(command, *args)
+		key = (command, args)
+		try:
+			result = self._query_cache[key]
+		except KeyError:
+			result = self(command, *args)
+			self._query_cache[key] = result
+			if len(self._query_cache) > self._query_cache_size:
+				self._query_cache.popitem(last=False)
+		else:
+			self._query_cache.move_to_end(key)
+		return result
+
+	def clear_cache(self):
+		"""Drops all cached results, use after changing data that might have been cached."""
+		self._query_cache.clear()
 
 	def execute_many(self, command, parameters):
 		"""Executes a sql command for each sequence or mapping
 		found in parameters.
 		@param command: same as in __call__
 		@param parameters: sequence or iterator"""
+		DbReader.query_count += 1
 		return self.cur.executemany(command, parameters)
 
 	def execute_script(self, script):
@@ -72,3 +98,46 @@ class DbReader(object):
 	def close(self):
 		"""Closes the db"""
 		self.connection.close()
+
+
+class BatchedDbWriter(DbReader):
+	"""DbReader for writing lots of data into a new database, e.g. savegames.
+
+	INSERT commands are buffered per table and executed with executemany when any other
+	command (like SELECT or COMMIT) is executed, so reading data that has just been inserted
+	works as usual. Rows of a table are inserted in the order of the commands, so implicit
+	rowids stay the same as without buffering.
+
+	The connection is tuned for bulk writes, an interrupted write can leave a corrupt
+	file, so only use it for files that are discarded in that case.
+	"""
+
+	_INSERT_RE = re.compile(r'\s*INSERT\s+INTO\s+"?(\w+)"?[\s(]', re.IGNORECASE)
+
+	def __init__(self, dbfile, check_same_thread=True):
+		super(BatchedDbWriter, self).__init__(dbfile, check_same_thread)
+		self.connection.execute("PRAGMA synchronous = OFF")
+		self.connection.execute("PRAGMA journal_mode = MEMORY")
+		self._batches = {} # {table: [(command, [args])]}, in order of the commands
+		self.rows = 0 # number of rows that have been inserted
+
+	def __call__(self, command, *args):
+		match = self._INSERT_RE.match(command)
+		if match is None:
+			self.flush()
+			return super(BatchedDbWriter, self).__call__(command, *args)
+
+		batches = self._batches.setdefault(match.group(1), [])
+		if batches and batches[-1][0] == command:
+			batches[-1][1].append(args)
+		else:
+			batches.append((command, [args]))
+		return []
+
+	def flush(self):
+		"""Executes all buffered INSERT commands."""
+		for batches in self._batches.values():
+			for command, args in batches:
+				self.execute_many(command, args)
+				self.rows += len(args)
+		self._batches.clear()
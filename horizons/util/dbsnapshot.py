@@ -0,0 +1,125 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""
+Binary snapshots of databases that are created from sql scripts.
+
+Executing the scripts of the game database takes much longer than copying an sqlite
+file, so the result is stored once and reused until any of the scripts changes.
+"""
+
+import glob
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+from urllib.request import pathname2url
+
+log = logging.getLogger("util.dbsnapshot")
+
+
+def get_snapshot(sql_files, filename_pattern):
+	"""Returns the path of a snapshot of the database created by the sql files.
+	It is created if it doesn't exist yet, outdated snapshots are removed.
+	@param sql_files: paths of the sql scripts, executed in this order
+	@param filename_pattern: path of the snapshot, containing {digest}, e.g. 'dir/db-{digest}.sqlite'
+	@return: path
+	"""
+	scripts = []
+	digest = hashlib.sha1()
+	for sql_file in sql_files:
+		with open(sql_file, 'rb') as f:
+			data = f.read()
+		scripts.append(data.decode('utf-8'))
+		digest.update(data)
+	path = filename_pattern.format(digest=digest.hexdigest())
+	if os.path.exists(path):
+		return path
+
+	log.debug("Creating database snapshot %s", path)
+	for old_path in glob.glob(filename_pattern.format(digest='*')):
+		try:
+			os.remove(old_path)
+		except OSError:
+			pass # might be used by another process on windows, doesn't matter
+
+	# create under a temporary name, so other processes never see half written files
+	fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+	os.close(fd)
+	try:
+		connection = sqlite3.connect(tmp_path)
+		try:
+			for script in scripts:
+				connection.executescript("BEGIN TRANSACTION;" + script + "COMMIT;")
+		finally:
+			connection.close()
+		os.replace(tmp_path, path)
+	except Exception:
+		os.remove(tmp_path)
+		raise
+	return path
+
+
+def copy_into(path, connection, tables=()):
+	"""Copies a database file into the connection, usually an in-memory database.
+	@param path: path of the database file, e.g. from get_snapshot
+	@param connection: sqlite3.Connection of an empty database
+	@param tables: names of tables the snapshot has to contain
+	@raises sqlite3.DatabaseError: if the snapshot is missing any of the tables
+	"""
+	# characters like '#' or '?' in the path would otherwise be part of the uri syntax
+	uri = 'file:{}?mode=ro'.format(pathname2url(os.path.abspath(path)))
+	source = sqlite3.connect(uri, uri=True)
+	try:
+		existing = set(name for (name, ) in
+		               source.execute("SELECT name FROM sqlite_master WHERE type = 'table'"))
+		missing = set(tables) - existing
+		if not existing or missing:
+			raise sqlite3.DatabaseError("Snapshot {} is missing tables: {}".format(
+				path, ', '.join(sorted(missing)) or 'all'))
+		if hasattr(source, 'backup'): # python 3.7+
+			source.backup(connection)
+		else:
+			_copy_tables(source, path, connection)
+	finally:
+		source.close()
+
+
+def _copy_tables(source, path, connection):
+	"""Fallback for copy_into if the backup api isn't available."""
+	schema = source.execute("SELECT type, name, sql FROM sqlite_master "
+	                        "WHERE sql NOT NULL AND name NOT LIKE 'sqlite_%'").fetchall()
+	connection.execute("ATTACH DATABASE ? AS snapshot", (path, ))
+	try:
+		cur = connection.cursor()
+		cur.execute("BEGIN TRANSACTION")
+		for object_type, name, sql in schema:
+			if object_type == 'table':
+				cur.execute(sql)
+				cur.execute('INSERT INTO main."{0}" SELECT * FROM snapshot."{0}"'.format(name))
+		# indices, views and triggers after the data is there
+		for object_type, name, sql in schema:
+			if object_type != 'table':
+				cur.execute(sql)
+		cur.execute("COMMIT")
+	finally:
+		connection.execute("DETACH DATABASE snapshot")
@@ -0,0 +1,159 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""
+Computations on the ground tiles of a map that only need plain data.
+
+This module must not import any other part of the game: the MapPreprocessor runs these
+functions in worker processes, which only import what the functions need.
+"""
+
+import operator
+from collections import deque
+from functools import partial
+from itertools import compress, product, repeat
+
+_BIT_VALUES = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def get_buildable_coords(tile_classes, sizes):
+	"""Computes where buildings can be placed on an island given the terrain.
+	@param tile_classes: iterable of ((x, y), classes of the tile)
+	@param sizes: list of (width, height) of the buildings, rotated sizes are added
+	@return: tuple (land_or_coast, land, land_and_coast), see TerrainBuildabilityCache:
+	         land_or_coast: set of coords of all constructible and coastline tiles
+	         land: {(width, height): set of origins of rectangles on constructible tiles}
+	         land_and_coast: same as land for 2x2 and 3x3 rectangles that have at least
+	                         one constructible and one coastline tile and nothing else
+	"""
+	land = set()
+	coast = set()
+	for coords, classes in tile_classes:
+		if 'constructible' in classes:
+			land.add(coords)
+		elif 'coastline' in classes:
+			coast.add(coords)
+	land_or_coast = land.union(coast)
+
+	# the row masks cover the rows min_y to min_y + num_rows - 1, bit 0 is at x = min_x
+	if land_or_coast:
+		min_x = min(x for (x, y) in land_or_coast)
+		min_y = min(y for (x, y) in land_or_coast)
+		num_rows = max(y for (x, y) in land_or_coast) - min_y + 1
+	else:
+		min_x = min_y = num_rows = 0
+
+	land_rows = _get_row_masks(land, min_x, min_y, num_rows)
+	coast_rows = _get_row_masks(coast, min_x, min_y, num_rows)
+	land_or_coast_rows = _get_row_masks(land_or_coast, min_x, min_y, num_rows)
+
+	# land buildings: all tiles are constructible
+	land_cache = {}
+	land_cache[(1, 1)] = land
+	for size in sizes:
+		if size == (1, 1):
+			continue
+		for width, height in set([size, (size[1], size[0])]):
+			rects = _get_rect_masks(land_rows, width, height, operator.and_)
+			land_cache[(width, height)] = _get_coords(rects, min_x, min_y)
+
+	# coastal buildings: at least one constructible and one coastline tile, and nothing else
+	land_and_coast = {}
+	for width, height in [(2, 2), (3, 3)]:
+		on_island = _get_rect_masks(land_or_coast_rows, width, height, operator.and_)
+		has_land = _get_rect_masks(land_rows, width, height, operator.or_)
+		has_coast = _get_rect_masks(coast_rows, width, height, operator.or_)
+		rects = list(map(operator.and_, on_island, map(operator.and_, has_land, has_coast)))
+		land_and_coast[(width, height)] = _get_coords(rects, min_x, min_y)
+
+	return land_or_coast, land_cache, land_and_coast
+
+
+def _get_row_masks(coords_set, min_x, min_y, num_rows):
+	"""Returns the coords as bit masks of the rows, which allows checking whole rows
+	at once with bitwise operations.
+	@return: list of ints, bit x - min_x of item y - min_y is set if (x, y) is in the set"""
+	rows = [0] * num_rows
+	for (x, y) in coords_set:
+		rows[y - min_y] |= 1 << (x - min_x)
+	return rows
+
+
+def _get_rect_masks(rows, width, height, combine):
+	"""Combines the bits of all width x height rectangles.
+	@param rows: list of ints, see _get_row_masks
+	@param combine: operator.and_ (whole rectangle is set) or operator.or_ (any tile is set)
+	@return: list of ints like rows, a bit is set if combining the bits in the rectangle
+	         with that origin results in a set bit"""
+	horizontal = rows
+	for dx in range(1, width):
+		horizontal = list(map(combine, horizontal, map(operator.rshift, rows, repeat(dx))))
+
+	padded = horizontal + [0] * (height - 1)
+	rects = horizontal
+	for dy in range(1, height):
+		rects = list(map(combine, rects, padded[dy:]))
+	return rects
+
+
+def _get_coords(rows, min_x, min_y):
+	"""Inverse of _get_row_masks"""
+	coords = set()
+	for y, mask in enumerate(rows, min_y):
+		if mask:
+			bits = bin(mask)[:1:-1].encode().translate(_BIT_VALUES) # 0 or 1, lowest bit first
+			coords.update(compress(zip(range(min_x, min_x + len(bits)), repeat(y)), bits))
+	return coords
+
+
+def get_water_bodies(bounds, land_coords):
+	"""Runs the flood fill algorithm on the water to make it easy to recognize different
+	water bodies. They are numbered in the order of their first tile when going through
+	the columns from left to right, so the numbers don't depend on the order of any dict.
+	@param bounds: (min_x, min_y, max_x, max_y) of the water, max_x and max_y are excluded
+	@param land_coords: set of coords in the bounds that aren't water
+	@return: {(x, y): water body number} for all water tiles
+	"""
+	min_x, min_y, max_x, max_y = bounds
+	moves = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+	columns = partial(product, range(min_x, max_x), range(min_y, max_y))
+	unvisited = set(columns())
+	unvisited.difference_update(land_coords)
+
+	water_bodies = {}
+	n = 0
+	for coords in columns():
+		if coords not in unvisited:
+			continue
+
+		unvisited.remove(coords)
+		water_bodies[coords] = n
+		queue = deque([coords])
+		while queue:
+			x, y = queue.popleft()
+			for dx, dy in moves:
+				coords2 = (x + dx, y + dy)
+				if coords2 in unvisited:
+					unvisited.remove(coords2)
+					water_bodies[coords2] = n
+					queue.append(coords2)
+		n += 1
+	return water_bodies
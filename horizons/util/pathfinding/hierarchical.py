@@ -0,0 +1,355 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+from heapq import heappop, heappush
+
+from horizons.util.pathfinding.pathfinding import GridFindPath
+from horizons.util.shapes import Point
+
+
+"""
+Hierarchical pathfinding (HPA*) for large static path nodes such as the water of the world.
+Long paths are searched on a small abstract graph of clusters first and are then
+refined tile by tile, which only touches the tiles close to the resulting path.
+"""
+
+class ClusterGraph(object):
+	"""Abstract graph of a PathGrid.
+
+	The grid is divided into square clusters. Where two neighboring clusters share
+	a walkable border, a pair of portal tiles connects them, one on each side, in the
+	middle of every walkable stretch of the border. The portals of a cluster are connected
+	by edges weighted with the distance between them within the cluster.
+	Movement is assumed to be diagonal, just like the one of ships.
+
+	Like its PathGrid, the graph is static after it has been created.
+	"""
+	log = logging.getLogger("world.pathfinding")
+
+	CLUSTER_SIZE = 16
+
+	def __init__(self, grid, cluster_size=CLUSTER_SIZE):
+		"""
+		@param grid: PathGrid to create the graph for
+		@param cluster_size: side length of the clusters
+		"""
+		self.grid = grid
+		self.cluster_size = cluster_size
+		# paths shorter than this are found faster without the graph
+		self.min_distance = 2 * cluster_size
+
+		# the clusters cover all tiles of the grid except for its border
+		self.left = grid.min_x + 1
+		self.top = grid.min_y + 1
+		self.right = grid.min_x + grid.width - 2
+		self.bottom = grid.min_y + grid.height - 2
+		self.columns = (self.right - self.left) // cluster_size + 1
+		self.rows = (self.bottom - self.top) // cluster_size + 1
+
+		self.borders = {} # {(cluster, cluster right of or below it): [(portal, portal of neighbor), ..]}
+		self.portals = {} # {cluster: sorted list of portals}
+		self.edges = {} # {cluster: {portal: [(other portal, distance), ..]}}
+		self.open_clusters = {} # {cluster: tile cost} of clusters without obstacles and uniform costs
+		self.links = {} # {portal: [(portal, distance), ..]}, all edges of the graph
+		self.min_cost = None # lowest tile cost, keeps the heuristic of the search admissible
+
+		clusters = [(cx, cy) for cx in range(self.columns) for cy in range(self.rows)]
+		for cluster in clusters:
+			for neighbor in self._get_neighbors(cluster):
+				if neighbor > cluster: # right of or below
+					self._build_border(cluster, neighbor)
+		for cluster in clusters:
+			self._build_edges(cluster)
+		self._build_links()
+		self.log.debug("created cluster graph with %s clusters and %s portals",
+		               len(clusters), len(self.links))
+
+	def get_cluster(self, index):
+		"""Returns the cluster of the tile with the grid index"""
+		x, y = self.grid.get_coords(index)
+		return ((x - self.left) // self.cluster_size, (y - self.top) // self.cluster_size)
+
+	def _get_bounds(self, cluster):
+		"""Returns the coords of the first and the last tile of the cluster as (x0, y0, x1, y1)"""
+		x0 = self.left + cluster[0] * self.cluster_size
+		y0 = self.top + cluster[1] * self.cluster_size
+		return (x0, y0,
+		        min(x0 + self.cluster_size - 1, self.right),
+		        min(y0 + self.cluster_size - 1, self.bottom))
+
+	def _get_neighbors(self, cluster):
+		"""Returns the existing clusters next to the cluster, not including diagonal ones"""
+		cx, cy = cluster
+		return [(x, y) for (x, y) in ((cx + 1, cy), (cx, cy + 1), (cx - 1, cy), (cx, cy - 1))
+		        if 0 <= x < self.columns and 0 <= y < self.rows]
+
+	def _build_border(self, cluster, neighbor):
+		"""Finds the portals between cluster and its neighbor right of or below it"""
+		grid = self.grid
+		walkable = grid.walkable
+		x0, y0, x1, y1 = self._get_bounds(cluster)
+		if neighbor[0] > cluster[0]:
+			pairs = [(grid.get_index(x1, y), grid.get_index(x1 + 1, y)) for y in range(y0, y1 + 1)]
+		else:
+			pairs = [(grid.get_index(x, y1), grid.get_index(x, y1 + 1)) for x in range(x0, x1 + 1)]
+
+		portals = []
+		stretch = []
+		for pair in pairs + [None]:
+			if pair is not None and walkable[pair[0]] and walkable[pair[1]]:
+				stretch.append(pair)
+			elif stretch:
+				portals.append(stretch[len(stretch) // 2])
+				stretch = []
+		self.borders[(cluster, neighbor)] = portals
+
+	def _build_edges(self, cluster):
+		"""Connects the portals of the cluster"""
+		portals = set()
+		for neighbor in self._get_neighbors(cluster):
+			if neighbor > cluster:
+				portals.update(pair[0] for pair in self.borders[(cluster, neighbor)])
+			else:
+				portals.update(pair[1] for pair in self.borders[(neighbor, cluster)])
+		portals = sorted(portals)
+		self.portals[cluster] = portals
+
+		grid = self.grid
+		x0, y0, x1, y1 = self._get_bounds(cluster)
+		costs = set(grid.costs[grid.get_index(x, y)] if grid.walkable[grid.get_index(x, y)] else None
+		            for x in range(x0, x1 + 1) for y in range(y0, y1 + 1))
+		if len(costs) == 1 and None not in costs:
+			self.open_clusters[cluster] = costs.pop()
+
+		self.edges[cluster] = dict((portal, self._get_distances(cluster, portal, portals))
+		                           for portal in portals)
+
+	def _build_links(self):
+		costs = self.grid.costs
+		links = {}
+		for cluster in sorted(self.edges):
+			for portal, edges in self.edges[cluster].items():
+				links[portal] = list(edges)
+		for key in sorted(self.borders):
+			for portal, other in self.borders[key]:
+				links[portal].append((other, costs[portal]))
+				links[other].append((portal, costs[other]))
+		self.links = links
+		self.min_cost = min(self.grid.path_nodes.values(), default=1.0)
+
+	def _get_distances(self, cluster, start, targets, reverse=False):
+		"""Searches the distances from start to targets, moving only within the cluster.
+		@param start: grid index of a walkable tile of the cluster
+		@param targets: grid indices of tiles of the cluster
+		@param reverse: search the distances from targets to start instead
+		@return: list of (target, distance) for all reachable targets except start"""
+		grid = self.grid
+		if cluster in self.open_clusters:
+			# the direct way is free, so the distance can be calculated
+			cost = self.open_clusters[cluster]
+			x, y = grid.get_coords(start)
+			return [(target, cost * max(abs(tx - x), abs(ty - y))) for target, (tx, ty)
+			        in ((target, grid.get_coords(target)) for target in targets) if target != start]
+
+		walkable = grid.walkable
+		costs = grid.costs
+		height = grid.height
+		x0, y0, x1, y1 = self._get_bounds(cluster)
+		# work with coords relative to the grid, as used by its indices
+		x0 -= grid.min_x
+		x1 -= grid.min_x
+		y0 -= grid.min_y
+		y1 -= grid.min_y
+
+		remaining = set(targets)
+		distances = {start: 0.0}
+		done = set()
+		heap = [(0.0, start)]
+		while heap and remaining:
+			distance, cur = heappop(heap)
+			if cur in done:
+				continue
+			done.add(cur)
+			remaining.discard(cur)
+			x, y = divmod(cur, height)
+			for nx in (x - 1, x, x + 1):
+				if not x0 <= nx <= x1:
+					continue
+				for ny in (y - 1, y, y + 1):
+					if not y0 <= ny <= y1:
+						continue
+					neighbor = nx * height + ny
+					if neighbor in done or not walkable[neighbor]:
+						continue
+					# the cost of a tile is paid when leaving it
+					neighbor_distance = distance + (costs[neighbor] if reverse else costs[cur])
+					if neighbor not in distances or neighbor_distance < distances[neighbor]:
+						distances[neighbor] = neighbor_distance
+						heappush(heap, (neighbor_distance, neighbor))
+
+		return [(target, distances[target]) for target in targets
+		        if target != start and target in done]
+
+	def find_waypoints(self, start, goal):
+		"""Searches a path on the graph via a*-algo.
+		@param start: grid index of a walkable tile
+		@param goal: grid index of a walkable tile
+		@return: list of grid indices of the portals to pass on the way from start to goal
+		         or None if the graph doesn't contain a path"""
+		if start == goal:
+			return []
+		start_cluster = self.get_cluster(start)
+		goal_cluster = self.get_cluster(goal)
+
+		# temporarily connect start and goal to the portals of their clusters
+		targets = self.portals[start_cluster]
+		if start_cluster == goal_cluster:
+			targets = targets + [goal]
+		start_edges = self._get_distances(start_cluster, start, targets)
+		goal_edges = dict(self._get_distances(goal_cluster, goal, self.portals[goal_cluster],
+		                                      reverse=True))
+
+		get_coords = self.grid.get_coords
+		goal_x, goal_y = get_coords(goal)
+		min_cost = self.min_cost
+		def estimate(index):
+			x, y = get_coords(index)
+			return max(abs(x - goal_x), abs(y - goal_y)) * min_cost
+
+		links = self.links
+		distances = {start: 0.0}
+		previous = {start: None}
+		checked = set()
+		heap = [(estimate(start), start)]
+		while heap:
+			(_, cur) = heappop(heap)
+			if cur in checked:
+				continue
+			if cur == goal:
+				waypoints = []
+				cur = previous[goal]
+				while cur != start:
+					waypoints.append(cur)
+					cur = previous[cur]
+				waypoints.reverse()
+				return waypoints
+			checked.add(cur)
+
+			edges = links.get(cur, [])
+			if cur == start:
+				edges = edges + start_edges
+			if cur in goal_edges:
+				edges = edges + [(goal, goal_edges[cur])]
+			for neighbor, cost in edges:
+				if neighbor in checked:
+					continue
+				distance = distances[cur] + cost
+				if neighbor not in distances or distance < distances[neighbor]:
+					distances[neighbor] = distance
+					previous[neighbor] = cur
+					heappush(heap, (distance + estimate(neighbor), neighbor))
+
+		return None
+
+
+class HierarchicalFindPath(GridFindPath):
+	"""Finds long paths on a ClusterGraph and refines them with GridFindPath.
+
+	The paths are close to the best ones, but not necessarily equal to them.
+	Short paths, units that can't move diagonally and everything the graph can't
+	deal with are handed to GridFindPath directly.
+	"""
+
+	def __init__(self, cluster_graph):
+		"""
+		@param cluster_graph: ClusterGraph of the path_nodes this instance will be called with
+		"""
+		super(HierarchicalFindPath, self).__init__(cluster_graph.grid)
+		self.cluster_graph = cluster_graph
+
+	def execute(self):
+		"""Executes algorithm"""
+		graph = self.cluster_graph
+		grid = self.grid
+		path_nodes = self.path_nodes
+		source_coords = self.source.get_coordinates()
+		if not self.diagonal or not source_coords or source_coords[0] not in path_nodes or \
+		   not all(grid.contains(coords) for coords in source_coords):
+			return super(HierarchicalFindPath, self).execute()
+
+		# head for the closest free tile of the destination
+		start = source_coords[0]
+		def get_distance(coords):
+			return max(abs(coords[0] - start[0]), abs(coords[1] - start[1]))
+		goals = [coords for coords in self.destination.tuple_iter()
+		         if coords in path_nodes and coords not in self.blocked_coords and grid.contains(coords)]
+		if not goals:
+			return super(HierarchicalFindPath, self).execute()
+		goal = min(goals, key=lambda coords: (get_distance(coords), coords))
+		if get_distance(goal) < graph.min_distance:
+			return super(HierarchicalFindPath, self).execute()
+
+		waypoints = graph.find_waypoints(grid.get_index(*start), grid.get_index(*goal))
+		if waypoints is None:
+			return super(HierarchicalFindPath, self).execute()
+
+		# refine the path in sections of about the size of a cluster,
+		# the last one leads to the actual destination
+		targets = []
+		last = start
+		for waypoint in waypoints:
+			coords = grid.get_coords(waypoint)
+			if max(abs(coords[0] - last[0]), abs(coords[1] - last[1])) >= graph.cluster_size:
+				targets.append(Point(*coords))
+				last = coords
+		targets.append(self.destination)
+
+		find_path = GridFindPath(grid)
+		path = []
+		indices = {} # {coords: index in path}
+		source = self.source
+		for i, target in enumerate(targets):
+			make_target_walkable = self.make_target_walkable if i == len(targets) - 1 else False
+			section = find_path(source, target, path_nodes, self.blocked_coords,
+			                    True, make_target_walkable)
+			if section is None:
+				# a portal is blocked, e.g. by another ship
+				return super(HierarchicalFindPath, self).execute()
+			self._append_section(path, indices, section)
+			source = Point(*path[-1])
+		return path
+
+	@staticmethod
+	def _append_section(path, indices, section):
+		"""Appends section to path, cutting out loops where the path returns to a tile
+		@param indices: {coords: index in path} of the tiles of path, is updated"""
+		if path:
+			section = section[1:]
+		for coords in section:
+			index = indices.get(coords)
+			if index is None:
+				indices[coords] = len(path)
+				path.append(coords)
+			else:
+				for removed in path[index + 1:]:
+					del indices[removed]
+				del path[index + 1:]
@@ -0,0 +1,93 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import logging
+from collections import OrderedDict
+
+from horizons.util.shapes import Point, Rect
+
+
+class PathCache(object):
+	"""LRU cache for paths on path nodes that change rarely, such as roads.
+
+	Paths are keyed by the version of the path nodes, so that all cached paths are
+	invalid as soon as the path nodes change. Old entries are evicted in least recently
+	used order. Only searches without blocked coords can be cached.
+
+	hits and misses count the lookups, use them to tune the size.
+	"""
+	log = logging.getLogger("world.pathfinding")
+
+	DEFAULT_SIZE = 512
+
+	def __init__(self, path_nodes, size=DEFAULT_SIZE):
+		"""
+		@param path_nodes: PathNodes instance with a version attribute, which is changed
+		                   whenever the path nodes change
+		@param size: maximum number of cached paths
+		"""
+		self.path_nodes = path_nodes
+		self.size = size
+		self.paths = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	@classmethod
+	def _get_shape_key(cls, shape):
+		"""Returns a hashable representation of shape, or None if it isn't supported"""
+		if hasattr(shape, 'position'):
+			shape = shape.position
+		if isinstance(shape, Point):
+			return (shape.x, shape.y)
+		if isinstance(shape, Rect):
+			return (shape.left, shape.top, shape.right, shape.bottom)
+		return None
+
+	def get_path(self, source, destination, diagonal, make_target_walkable, find_path):
+		"""Returns the path from source to destination.
+		@param source, destination: Rect, Point or BasicBuilding
+		@param diagonal, make_target_walkable: see FindPath
+		@param find_path: callable that calculates the path, is called as find_path(source, destination)
+		@return: a new list of coords or None, see FindPath"""
+		source_key = self._get_shape_key(source)
+		destination_key = self._get_shape_key(destination)
+		if source_key is None or destination_key is None:
+			return find_path(source, destination)
+
+		key = (self.path_nodes.version, source_key, destination_key, diagonal, make_target_walkable)
+		if key in self.paths:
+			self.hits += 1
+			self.paths.move_to_end(key)
+			path = self.paths[key]
+		else:
+			self.misses += 1
+			path = find_path(source, destination)
+			if path is not None:
+				path = tuple(path) # the caller may modify the list it gets
+			self.paths[key] = path
+			if len(self.paths) > self.size:
+				self.paths.popitem(last=False)
+
+		return None if path is None else list(path)
+
+	def clear(self):
+		self.paths.clear()
@@ -23,7 +23,8 @@ import logging
 import weakref
 
 from horizons.util.pathfinding import PathBlockedError
-from horizons.util.pathfinding.pathfinding import FindPath
+from horizons.util.pathfinding.hierarchical import HierarchicalFindPath
+from horizons.util.pathfinding.pathfinding import FindPath, GridFindPath
 from horizons.util.shapes import Point
 
 
@@ -70,6 +71,21 @@ class AbstractPather(object):
 		Return value type must be supported by FindPath"""
 		return []
 
+	def _get_find_path(self):
+		"""Returns the pathfinding algorithm instance, FindPath or a subclass of it.
+		Subclasses with static path nodes can use the faster GridFindPath."""
+		return FindPath()
+
+	def _get_path_cache(self):
+		"""Returns a PathCache for the path nodes or None if paths can't be cached,
+		e.g. because there are blocked coords"""
+		return None
+
+	def _find_path(self, source, destination):
+		return self._get_find_path()(source, destination, self._get_path_nodes(),
+		                             self._get_blocked_coords(), self.move_diagonal,
+		                             self.make_target_walkable)
+
 	def _check_for_obstacles(self, point):
 		"""Check if the path is unexpectedly blocked by e.g. a unit
 		@param point: tuple: (x, y)
@@ -103,10 +119,12 @@ class AbstractPather(object):
 			source = self._get_position()
 
 		# call algorithm
-		# to use a different pathfinding code, just change the following line
-		path = FindPath()(source, destination, self._get_path_nodes(),
-		                  self._get_blocked_coords(), self.move_diagonal,
-		                  self.make_target_walkable)
+		path_cache = self._get_path_cache()
+		if path_cache is not None:
+			path = path_cache.get_path(source, destination, self.move_diagonal,
+			                           self.make_target_walkable, self._find_path)
+		else:
+			path = self._find_path(source, destination)
 
 		if path is None:
 			return False
@@ -219,6 +237,10 @@ class ShipPather(AbstractPather):
 	def _get_blocked_coords(self):
 		return self.session.world.ship_map
 
+	def _get_find_path(self):
+		# water hardly ever changes, so it is cheap to keep it as grid and cluster graph
+		return HierarchicalFindPath(self.session.world.get_cluster_graph('water'))
+
 
 class FisherShipPather(ShipPather):
 	"""Can also drive through shallow water"""
@@ -229,6 +251,9 @@ class FisherShipPather(ShipPather):
 		# don't let fisher be blocked by other ships (#1023)
 		return []
 
+	def _get_find_path(self):
+		return GridFindPath(self.session.world.get_path_grid('water_and_coastline'))
+
 
 class BuildingCollectorPather(AbstractPather):
 	"""Pather for collectors, that move freely (without depending on roads)
@@ -250,6 +275,9 @@ class RoadPather(AbstractPather):
 	def _get_path_nodes(self):
 		return self.island.path_nodes.road_nodes
 
+	def _get_path_cache(self):
+		return self.island.path_nodes.road_path_cache
+
 
 class SoldierPather(AbstractPather):
 	"""Pather for units, that move absolutely freely (such as soldiers)
@@ -290,4 +318,5 @@ class StaticPather(object):
 		@param island: island to search path on
 		@param source, destination: Point or anything supported by FindPath
 		@return: list of tuples or None in case no path is found"""
-		return FindPath()(source, destination, island.path_nodes.road_nodes)
+		find_path = lambda source, destination: FindPath()(source, destination, island.path_nodes.road_nodes)
+		return island.path_nodes.road_path_cache.get_path(source, destination, False, True, find_path)
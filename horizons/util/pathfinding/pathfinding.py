@@ -20,6 +20,8 @@
 # ###################################################
 
 import logging
+from array import array
+from heapq import heappop, heappush
 
 
 """
@@ -148,7 +150,6 @@ class FindPath(object):
 		if not dest_coords_set:
 			return None
 
-		from heapq import heappush, heappop
 		heap = []
 		for coords, data in to_check.items():
 			heappush(heap, (data[2], coords))
@@ -246,3 +247,171 @@ class FindPath(object):
 
 		else:
 			return None
+
+
+class PathGrid(object):
+	"""Flat array representation of static path nodes, used by GridFindPath.
+
+	Every coordinate of the bounding rect gets an index, ordered by x first and y second,
+	so that comparing indices yields the same result as comparing coordinate tuples.
+	There is a border of one never walkable tile around the rect, so neighbors of tiles
+	within the rect never wrap around.
+
+	The grid also owns the buffers that are used during the search. They are stamped
+	with the id of the search that wrote them, so they don't need to be reset between searches.
+
+	The grid is static: it is only used for path nodes that don't change after the world
+	has been loaded, like World.water. Dynamic obstacles such as ships are passed to the
+	search as blocked coords instead.
+	"""
+
+	def __init__(self, path_nodes, bounds):
+		"""
+		@param path_nodes: dict { (x, y) = speed_on_coords }, must not change afterwards
+		@param bounds: Rect containing all coords of path_nodes
+		"""
+		self.path_nodes = path_nodes
+		self.min_x = bounds.left - 1
+		self.min_y = bounds.top - 1
+		self.width = bounds.width + 2
+		self.height = bounds.height + 2
+		size = self.width * self.height
+
+		self.walkable = bytearray(size)
+		self.costs = array('d', [0.0]) * size
+		for (x, y), cost in path_nodes.items():
+			index = self.get_index(x, y)
+			self.walkable[index] = 1
+			self.costs[index] = cost
+
+		self.search_id = 0
+		self.discovered = array('L', [0]) * size # search id if node has been added to the heap
+		self.marked = array('L', [0]) * size # search id if node is a source or destination
+		self.previous = array('l', [0]) * size
+		self.distances = array('d', [0.0]) * size
+
+	def get_index(self, x, y):
+		return (x - self.min_x) * self.height + (y - self.min_y)
+
+	def get_coords(self, index):
+		x, y = divmod(index, self.height)
+		return (x + self.min_x, y + self.min_y)
+
+	def contains(self, coords):
+		"""Whether coords is within the bounds (not on the border)"""
+		x, y = coords
+		return (self.min_x < x < self.min_x + self.width - 1 and
+		        self.min_y < y < self.min_y + self.height - 1)
+
+	def next_search_id(self):
+		self.search_id += 1
+		if self.search_id == 2 ** 32:
+			# stamps would overflow, start over with clean buffers
+			for stamps in (self.discovered, self.marked):
+				for i in range(len(stamps)):
+					stamps[i] = 0
+			self.search_id = 1
+		return self.search_id
+
+
+class GridFindPath(FindPath):
+	"""A* on a PathGrid instead of dicts of coordinate tuples.
+
+	Yields exactly the same paths as FindPath, but is only applicable
+	for path nodes that rarely change, such as the water of the world.
+	"""
+
+	def __init__(self, grid):
+		"""
+		@param grid: PathGrid of the path_nodes this instance will be called with
+		"""
+		super(GridFindPath, self).__init__()
+		self.grid = grid
+
+	def execute(self):
+		"""Executes algorithm"""
+		grid = self.grid
+		assert self.path_nodes is grid.path_nodes
+
+		source_coords = self.source.get_coordinates()
+		dest_coords = self.destination.get_coordinates()
+		if not all(grid.contains(coords) for coords in source_coords) or \
+		   not all(grid.contains(coords) for coords in dest_coords):
+			return super(GridFindPath, self).execute()
+
+		if not self.make_target_walkable:
+			dest_coords = [coords for coords in dest_coords if coords in self.path_nodes]
+		if not dest_coords:
+			return None
+
+		search_id = grid.next_search_id()
+		walkable = grid.walkable
+		costs = grid.costs
+		discovered = grid.discovered
+		marked = grid.marked
+		previous = grid.previous
+		distances = grid.distances
+		get_index = grid.get_index
+		get_coords = grid.get_coords
+
+		# sources and destinations can be walked on even if they aren't path nodes
+		for coords in source_coords:
+			marked[get_index(*coords)] = search_id
+		dest_indices = set()
+		for coords in dest_coords:
+			index = get_index(*coords)
+			marked[index] = search_id
+			dest_indices.add(index)
+
+		blocked_indices = set(get_index(*coords) for coords in self.blocked_coords
+		                      if grid.contains(coords))
+
+		destination = self.destination
+		destination_to_tuple_distance_func = destination.get_distance_function((0, 0))
+
+		heap = []
+		for coords in source_coords:
+			index = get_index(*coords)
+			if discovered[index] == search_id:
+				continue
+			discovered[index] = search_id
+			previous[index] = -1
+			distances[index] = 0
+			heappush(heap, (destination_to_tuple_distance_func(destination, coords), index))
+
+		height = grid.height
+		min_x = grid.min_x
+		min_y = grid.min_y
+		if self.diagonal:
+			offsets = (-height - 1, -height, -height + 1, -1, 1, height - 1, height, height + 1)
+		else:
+			offsets = (-height, height, -1, 1)
+
+		while heap:
+			(_, cur_index) = heappop(heap)
+			# distance via the current node, the cost of a tile is paid when leaving it
+			dist_to_here = distances[cur_index] + costs[cur_index]
+
+			for offset in offsets:
+				neighbor = cur_index + offset
+				if discovered[neighbor] == search_id:
+					# the first path to a node is kept, just like in FindPath
+					continue
+				if (walkable[neighbor] or marked[neighbor] == search_id) and \
+				   neighbor not in blocked_indices:
+					discovered[neighbor] = search_id
+					previous[neighbor] = cur_index
+					distances[neighbor] = dist_to_here
+					x, y = divmod(neighbor, height)
+					total_dist_estimation = destination_to_tuple_distance_func(destination, (x + min_x, y + min_y)) + dist_to_here
+					heappush(heap, (total_dist_estimation, neighbor))
+
+			if cur_index in dest_indices:
+				path = []
+				while cur_index != -1:
+					path.append(get_coords(cur_index))
+					cur_index = previous[cur_index]
+				path.reverse()
+				return path
+
+		return None
@@ -21,6 +21,8 @@
 
 import logging
 
+from horizons.util.pathfinding.pathcache import PathCache
+
 
 class PathNodes(object):
 	"""
@@ -57,6 +59,9 @@ class IslandPathNodes(PathNodes):
 	self.nodes: List of nodes on island, where the terrain allows to be walked on
 	self.road_nodes: dictionary of nodes, where a road is built on
 
+	self.version: changed whenever nodes or road_nodes change
+	self.road_path_cache: PathCache for paths on road_nodes
+
 	(un)register_road has to be called for each coord, where a road is built on (destroyed)
 	reset_tile_walkablity has to be called when the terrain changes the walkability
 	(e.g. building construction, a flood, or whatever)
@@ -78,13 +83,23 @@ class IslandPathNodes(PathNodes):
 		# nodes where a real road is built on.
 		self.road_nodes = {}
 
+		self.version = 0
+		self.road_path_cache = PathCache(self)
+
+	def _changed(self):
+		# invalidates all cached paths
+		self.version += 1
+		self.road_path_cache.clear()
+
 	def register_road(self, road):
 		for i in road.position:
 			self.road_nodes[(i.x, i.y)] = self.NODE_DEFAULT_SPEED
+		self._changed()
 
 	def unregister_road(self, road):
 		for i in road.position:
 			del self.road_nodes[(i.x, i.y)]
+		self._changed()
 
 	def is_road(self, x, y):
 		"""Return if there is a road on (x, y)"""
@@ -123,8 +138,10 @@ class IslandPathNodes(PathNodes):
 		in_list = (coord in self.nodes)
 		if not in_list and actually_walkable:
 			self.nodes[coord] = self.NODE_DEFAULT_SPEED
+			self._changed()
 		if in_list and not actually_walkable:
 			del self.nodes[coord]
+			self._changed()
 
 
 class IslandBarrierNodes(PathNodes):
@@ -26,6 +26,11 @@ but rather a generic enhancement of the programming language.
 
 import collections
 
+try:
+	import tracemalloc
+except ImportError: # python can be built without it
+	tracemalloc = None
+
 from .decorators import *
 
 class Const(object):
@@ -104,3 +109,10 @@ class ChainedContainer(collections.Container): # type: ignore
 
 	def __contains__(self, value):
 		return any(value in c for c in self.containers)
+
+def get_traced_memory():
+	"""Returns the size of the memory blocks currently allocated by python in bytes, or None if
+	tracemalloc isn't tracing (it can be started with PYTHONTRACEMALLOC=1)."""
+	if tracemalloc is None or not tracemalloc.is_tracing():
+		return None
+	return tracemalloc.get_traced_memory()[0]
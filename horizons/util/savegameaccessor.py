@@ -20,14 +20,18 @@
 # ###################################################
 
 import hashlib
+import logging
 import os
 import os.path
 import tempfile
+import time
 from collections import defaultdict, deque
 
 from horizons.constants import MAP, PATHS
 from horizons.savegamemanager import SavegameManager
+from horizons.util import savegamecompression
 from horizons.util.dbreader import DbReader
+from horizons.util.python import get_traced_memory
 from horizons.util.random_map import create_random_island
 from horizons.util.savegameupgrader import SavegameUpgrader
 
@@ -42,8 +46,21 @@ class SavegameAccessor(DbReader):
 	"""
 	SavegameAccessor is the class used for loading saved games.
 
-	Frequent select queries are preloaded for faster access.
+	Frequent select queries are preloaded for faster access. Every table is read by its
+	_load_* method on first access of one of the attributes it sets (see _LOADERS), so only
+	the tables that are actually needed are kept in memory.
 	"""
+	log = logging.getLogger("util.savegameaccessor")
+
+	# (table, column) of tables that are queried with "WHERE column = ?" for every object
+	# while loading, an index is created on them
+	INDEXES = (
+		('collector_job', 'collector'),
+		('production_queue', 'object'),
+		('weapon_storage', 'owner_id'),
+		('stance', 'worldid'),
+		('trade_history', 'settlement'),
+	)
 
 	def __init__(self, game_identifier, is_map, options=None):
 		is_random_map = False
@@ -112,22 +129,36 @@ class SavegameAccessor(DbReader):
 		map_padding = self("SELECT value FROM map_properties WHERE name = 'padding'")
 		self.map_padding = int(map_padding[0][0]) if map_padding else MAP.PADDING
 
-		self._load_building()
-		self._load_settlement()
-		self._load_concrete_object()
-		self._load_production()
-		self._load_storage()
-		self._load_wildanimal()
-		self._load_unit()
-		self._load_building_collector()
-		self._load_production_line()
-		self._load_unit_path()
-		self._load_storage_global_limit()
-		self._load_health()
-		self._load_fish_data()
+		# the db is always a temporary copy, so it can be changed
+		for table, column in self.INDEXES:
+			self('CREATE INDEX IF NOT EXISTS "{0}_{1}" ON "{0}"("{1}")'.format(table, column))
+
+		self.load_report = [] # [(loader name, seconds, bytes allocated or None)]
 		self._hash = None
 
+	def __getattr__(self, name):
+		"""Runs the loader of an index that hasn't been accessed yet."""
+		try:
+			loader = self._LOADERS[name]
+		except KeyError:
+			raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+		memory = get_traced_memory()
+		start = time.perf_counter()
+		getattr(self, loader)()
+		seconds = time.perf_counter() - start
+		if memory is not None:
+			memory = get_traced_memory() - memory
+		self.load_report.append((loader, seconds, memory))
+		self.log.debug("%s took %.3fs, %s bytes", loader, seconds, memory)
+		return self.__dict__[name]
+
+	def log_load_report(self):
+		"""Logs the time and memory of the loaders, most expensive first."""
+		for loader, seconds, memory in sorted(self.load_report, key=lambda entry: -entry[1]):
+			self.log.info("%-30s %8.3fs %12s bytes", loader, seconds, memory)
+
 	def close(self):
+		self.log_load_report()
 		super(SavegameAccessor, self).close()
 		if self.upgrader is not None:
 			self.upgrader.close()
@@ -312,12 +343,38 @@ class SavegameAccessor(DbReader):
 	def get_last_fish_usage_tick(self, worldid):
 		return self._fish_data[worldid]
 
+	# attribute name: name of the method that sets it
+	_LOADERS = {
+		'_building': '_load_building',
+		'_settlement': '_load_settlement',
+		'_concrete_object': '_load_concrete_object',
+		'_productions_by_worldid': '_load_production',
+		'_production_lines_by_owner': '_load_production',
+		'_productions_by_id_and_owner': '_load_production',
+		'_production_state_history': '_load_production',
+		'_storage': '_load_storage',
+		'_wildanimal': '_load_wildanimal',
+		'_unit': '_load_unit',
+		'_building_collector': '_load_building_collector',
+		'_building_collector_job_history': '_load_building_collector',
+		'_production_line': '_load_production_line',
+		'_unit_path': '_load_unit_path',
+		'_storage_global_limit': '_load_storage_global_limit',
+		'_health': '_load_health',
+		'_fish_data': '_load_fish_data',
+	}
+
 	# Random savegamefile related utility that i didn't know where to put
 
 	@classmethod
 	def get_players_num(cls, savegamefile):
 		"""Return number of regular human and ai players"""
-		return DbReader(savegamefile)("SELECT count(rowid) FROM player WHERE is_trader = 0 AND is_pirate = 0")[0][0]
+		with savegamecompression.uncompressed(savegamefile) as path:
+			db = DbReader(path)
+			try:
+				return db("SELECT count(rowid) FROM player WHERE is_trader = 0 AND is_pirate = 0")[0][0]
+			finally:
+				db.close()
 
 	@classmethod
 	def get_hash(cls, savegamefile):
@@ -0,0 +1,104 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""
+Compressed savegame container.
+
+A compressed savegame is the zlib stream of the sqlite file behind a short header. It is
+written and read in chunks, so the whole file never has to be in memory. Compressed
+savegames keep their file name, they are detected by the header.
+"""
+
+import contextlib
+import os
+import shutil
+import tempfile
+import zlib
+
+HEADER = b'UHSAVEZ\x01'
+CHUNK_SIZE = 1 << 20
+
+
+def is_compressed(path):
+	"""Returns whether the file at path is a compressed savegame."""
+	with open(path, 'rb') as f:
+		return f.read(len(HEADER)) == HEADER
+
+
+def compress_file(source, destination, level=6):
+	"""Writes a compressed version of the savegame source to destination.
+	@param level: zlib compression level, 1 (fast) to 9 (small)"""
+	compressor = zlib.compressobj(level)
+	with open(source, 'rb') as src, open(destination, 'wb') as dst:
+		dst.write(HEADER)
+		for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+			dst.write(compressor.compress(chunk))
+		dst.write(compressor.flush())
+
+
+def decompress_file(source, destination):
+	"""Writes the sqlite file of the compressed savegame source to destination.
+	@raise ValueError: if source isn't a complete compressed savegame"""
+	decompressor = zlib.decompressobj()
+	with open(source, 'rb') as src, open(destination, 'wb') as dst:
+		if src.read(len(HEADER)) != HEADER:
+			raise ValueError("Not a compressed savegame: " + source)
+		for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+			dst.write(decompressor.decompress(chunk))
+		dst.write(decompressor.flush())
+	if not decompressor.eof:
+		raise ValueError("Compressed savegame is truncated: " + source)
+
+
+def compress_in_place(path, level=6):
+	"""Replaces the savegame at path by a compressed version."""
+	tmp_path = path + '.tmp'
+	try:
+		compress_file(path, tmp_path, level)
+		os.replace(tmp_path, path)
+	except Exception:
+		if os.path.exists(tmp_path):
+			os.remove(tmp_path)
+		raise
+
+
+def copy_uncompressed(source, destination):
+	"""Copies a savegame, which is decompressed if necessary."""
+	if is_compressed(source):
+		decompress_file(source, destination)
+	else:
+		shutil.copyfile(source, destination)
+
+
+@contextlib.contextmanager
+def uncompressed(path):
+	"""Context manager that returns the path of an sqlite file with the content of the
+	savegame at path. That is path itself or a temporary file if it is compressed."""
+	if not is_compressed(path):
+		yield path
+		return
+	fd, tmp_path = tempfile.mkstemp(suffix='.sqlite')
+	os.close(fd)
+	try:
+		decompress_file(path, tmp_path)
+		yield tmp_path
+	finally:
+		os.remove(tmp_path)
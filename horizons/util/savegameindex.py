@@ -0,0 +1,98 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+import os
+import pickle
+
+
+class SavegameMetadataIndex(object):
+	"""Persistent cache of data about savegame files, e.g. for listing them in the load menu.
+
+	Entries are keyed by path and are only valid as long as modification time and size of
+	the file are the same, so only changed files have to be read again. Like the yaml
+	cache, failing to read or write the index file is not critical and only logged.
+	"""
+	log = logging.getLogger("util.savegameindex")
+
+	# Increment this when the format of the entries changes.
+	version = 1
+
+	def __init__(self, filename):
+		self._filename = filename
+		self._entries = {} # {path: (file stamp, data)}
+		self._dirty = False
+		self.files_read = 0
+		self._load()
+
+	def _load(self):
+		if not os.path.exists(self._filename):
+			return
+		try:
+			with open(self._filename, 'rb') as f:
+				version, entries = pickle.load(f)
+			if version != self.version:
+				raise ValueError('Index has version {}, expected {}'.format(version, self.version))
+		except Exception as e:
+			self.log.warning("Warning: Failed to read savegame index %s: %s", self._filename, e)
+			return
+		self._entries = entries
+
+	@classmethod
+	def _get_stamp(cls, path):
+		stat = os.stat(path)
+		return stat.st_mtime_ns, stat.st_size
+
+	def get(self, path, read_function):
+		"""Returns the data of the file at path.
+		@param read_function: function(path) that reads the data, called if the file isn't
+		                      in the index or has changed
+		"""
+		stamp = self._get_stamp(path)
+		entry = self._entries.get(path)
+		if entry is not None and entry[0] == stamp:
+			return entry[1]
+		data = read_function(path)
+		self.files_read += 1
+		self._entries[path] = (stamp, data)
+		self._dirty = True
+		return data
+
+	def update(self, path, data):
+		"""Sets the data of a file that has just been written."""
+		self._entries[path] = (self._get_stamp(path), data)
+		self._dirty = True
+
+	def sync(self):
+		"""Drops the entries of files that don't exist anymore and writes the index if it changed."""
+		for path in [path for path in self._entries if not os.path.exists(path)]:
+			del self._entries[path]
+			self._dirty = True
+		if not self._dirty:
+			return
+		tmp_filename = self._filename + '.tmp'
+		try:
+			with open(tmp_filename, 'wb') as f:
+				pickle.dump((self.version, self._entries), f, pickle.HIGHEST_PROTOCOL)
+			os.replace(tmp_filename, self._filename)
+			self._dirty = False
+		except Exception as e:
+			self.log.warning("Warning: Unable to save savegame index %s: %s", self._filename, e)
@@ -0,0 +1,116 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""
+Writing savegames in the background.
+
+The game state is saved into an in-memory database as usual, which is fast. The database is
+then handed over to a worker thread, which copies its content into python lists and writes
+the savegame file while the game keeps running.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+
+from horizons.util import savegamecompression
+
+
+class SavegameSnapshot(object):
+	"""Content of a savegame database as row tuples per table."""
+
+	def __init__(self, db):
+		"""Copies the content of db.
+		@param db: DbReader, usually of an in-memory database"""
+		schema = db("SELECT type, name, sql FROM sqlite_master "
+		            "WHERE sql NOT NULL AND name NOT LIKE 'sqlite_%' ORDER BY rowid")
+		self.tables = [] # [(create statement, insert statement, [row tuples])]
+		self.other_statements = [] # create statements of indices, views and triggers
+		for object_type, name, sql in schema:
+			if object_type == 'table':
+				# rowids are used as ids by some tables, so they have to be kept
+				table_info = db('PRAGMA table_info("{}")'.format(name))
+				columns = ['rowid'] + ['"{}"'.format(column[1]) for column in table_info]
+				insert = 'INSERT INTO "{}"({}) VALUES ({})'.format(
+					name, ', '.join(columns), ', '.join('?' * len(columns)))
+				rows = db('SELECT {} FROM "{}"'.format(', '.join(columns), name))
+				self.tables.append((sql, insert, rows))
+			else:
+				self.other_statements.append(sql)
+
+	def write(self, path):
+		"""Writes the snapshot into a new database file.
+		The file is created under a temporary name first, so a half written savegame never
+		shows up at path.
+		@param path: path of the savegame, an existing file is replaced"""
+		tmp_path = path + '.tmp'
+		if os.path.exists(tmp_path):
+			os.unlink(tmp_path)
+		connection = sqlite3.connect(tmp_path)
+		try:
+			connection.isolation_level = None
+			cur = connection.cursor()
+			cur.execute("BEGIN")
+			for sql, insert, rows in self.tables:
+				cur.execute(sql)
+				cur.executemany(insert, rows)
+			for sql in self.other_statements:
+				cur.execute(sql)
+			cur.execute("COMMIT")
+		except Exception:
+			connection.close()
+			os.unlink(tmp_path)
+			raise
+		connection.close()
+		os.replace(tmp_path, path)
+
+
+class SavegameWriterThread(threading.Thread):
+	"""Writes a database to a file. `success` is set when the thread has finished."""
+	log = logging.getLogger("util.savegamesnapshot")
+
+	def __init__(self, db, path, compression_level=None):
+		"""
+		@param db: DbReader that may be used in another thread, it is closed by the thread and
+		           must not be used elsewhere anymore
+		@param compression_level: zlib level to compress the savegame with, None to not compress it
+		"""
+		super(SavegameWriterThread, self).__init__(name='SavegameWriter')
+		self.daemon = False # don't lose the savegame if the game is quit meanwhile
+		self.db = db
+		self.path = path
+		self.compression_level = compression_level
+		self.success = None
+
+	def run(self):
+		try:
+			try:
+				snapshot = SavegameSnapshot(self.db)
+			finally:
+				self.db.close()
+			snapshot.write(self.path)
+			if self.compression_level is not None:
+				savegamecompression.compress_in_place(self.path, self.compression_level)
+			self.success = True
+		except Exception:
+			self.log.exception("Failed to write savegame %s", self.path)
+			self.success = False
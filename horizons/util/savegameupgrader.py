@@ -23,7 +23,6 @@ import json
 import logging
 import os
 import os.path
-import shutil
 import tempfile
 from collections import defaultdict
 from sqlite3 import OperationalError
@@ -32,6 +31,7 @@ from yaml.parser import ParserError
 
 from horizons.constants import BUILDINGS, UNITS, VERSION
 from horizons.entities import Entities
+from horizons.util import savegamecompression
 from horizons.util.dbreader import DbReader
 from horizons.util.shapes import Rect
 from horizons.util.yamlcache import YamlCache
@@ -414,11 +414,18 @@ class SavegameUpgrader(object):
 		db("UPDATE message_widget_active  SET id = ? WHERE id = ?", new, old)
 		db("UPDATE message_widget_archive SET id = ? WHERE id = ?", new, old)
 
+	def _upgrade_to_rev77(self, db):
+		# create empty job board tables, collectors that were idle wait at the board after loading
+		db('CREATE TABLE "collector_job_board" ( idle_since INTEGER, waiting BOOL NOT NULL )')
+		db('CREATE TABLE "collector_job_board_resource" ( collector INTEGER NOT NULL, resource INTEGER NOT NULL )')
+		db('CREATE TABLE "collector_job_board_target" ( collector INTEGER NOT NULL, building INTEGER NOT NULL )')
+		db('CREATE TABLE "job_board_post" ( settlement INTEGER NOT NULL, building INTEGER NOT NULL, remaining_ticks INTEGER NOT NULL )')
+
 
 	def _upgrade(self):
 		# fix import loop
 		from horizons.savegamemanager import SavegameManager
-		metadata = SavegameManager.get_metadata(self.original_path)
+		metadata = SavegameManager.get_metadata(self.final_path)
 		rev = metadata['savegamerev']
 
 		if rev < VERSION.SAVEGAMEREVISION :
@@ -486,6 +493,8 @@ class SavegameUpgrader(object):
 				self._upgrade_to_rev75(db)
 			if rev < 76:
 				self._upgrade_to_rev76(db)
+			if rev < 77:
+				self._upgrade_to_rev77(db)
 
 			db('COMMIT')
 			db.close()
@@ -504,7 +513,7 @@ class SavegameUpgrader(object):
 			self.using_temp = True
 			handle, self.final_path = tempfile.mkstemp(prefix='uh-savegame.' + os.path.basename(os.path.splitext(self.original_path)[0]) + '.', suffix='.sqlite')
 			os.close(handle)
-			shutil.copyfile(self.original_path, self.final_path)
+			savegamecompression.copy_uncompressed(self.original_path, self.final_path)
 			self._upgrade()
 		return self.final_path
 
@@ -0,0 +1,164 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import functools
+import time
+from collections import deque
+
+from horizons.util.dbreader import DbReader
+from horizons.util.python.callback import Callback
+from horizons.util.python.weakmethod import WeakMethod
+
+
+def get_callback_name(callback):
+	"""Returns the qualified name of the function that is executed by a callback,
+	e.g. 'MovingObject._move_tick' for Callback(unit._move_tick)."""
+	while True:
+		if isinstance(callback, Callback):
+			callback = callback.callback
+		elif isinstance(callback, WeakMethod):
+			callback = callback.function
+		elif isinstance(callback, functools.partial):
+			callback = callback.func
+		else:
+			break
+	name = getattr(callback, '__qualname__', None)
+	if name is None: # callable object
+		name = type(callback).__qualname__
+	return name
+
+
+class SchedulerProfiler(object):
+	"""Collects the time spent in the callbacks of the scheduler during the last ticks.
+
+	The times, numbers of calls and numbers of sql queries are summed up per callback (by function name) and
+	per type of the class instance the callback has been registered for.
+	Only the last `window` ticks are taken into account.
+
+	Callbacks that do the work of several instances at once can record each part on its own
+	with run_part, so the work is attributed as if every instance had a callback of its own.
+	"""
+
+	def __init__(self, window):
+		"""
+		@param window: int, number of ticks to take into account
+		"""
+		assert window > 0
+		self.window = window
+		self.ticks = deque() # [(tick_id, {key: [seconds, calls, queries]})] of the ticks in the window
+		self.totals = {} # {key: [seconds, calls, queries]}, sum of self.ticks
+		self._current = None
+		self._parts = [0.0, 0] # [seconds, queries] of the parts of the running callback
+
+	def start_tick(self, tick_id):
+		"""Starts recording a new tick, drops the data of ticks that are out of the window"""
+		self._current = {}
+		self.ticks.append((tick_id, self._current))
+		while self.ticks and self.ticks[0][0] <= tick_id - self.window:
+			self._drop(self.ticks.popleft()[1])
+
+	def _drop(self, data):
+		totals = self.totals
+		for key, (seconds, calls, queries) in data.items():
+			total = totals[key]
+			total[1] -= calls
+			if total[1]:
+				total[0] -= seconds
+				total[2] -= queries
+			else:
+				del totals[key]
+
+	def run(self, callback_obj):
+		"""Executes a scheduler callback and records its time and sql queries.
+		@param callback_obj: _CallbackObject"""
+		self._parts = [0.0, 0]
+		query_count = DbReader.query_count
+		start = time.perf_counter()
+		try:
+			callback_obj.callback()
+		finally:
+			# the parts have already been recorded on their own
+			seconds = time.perf_counter() - start - self._parts[0]
+			queries = DbReader.query_count - query_count - self._parts[1]
+			self._record_call(callback_obj.callback, callback_obj.class_instance, seconds, queries)
+
+	def run_part(self, function, class_instance):
+		"""Executes a part of the running callback and records it like a callback of its own
+		that has been registered for class_instance.
+		@param function: callable without arguments
+		@param class_instance: the instance the part does the work of"""
+		query_count = DbReader.query_count
+		start = time.perf_counter()
+		try:
+			function()
+		finally:
+			seconds = time.perf_counter() - start
+			queries = DbReader.query_count - query_count
+			self._parts[0] += seconds
+			self._parts[1] += queries
+			self._record_call(function, class_instance, seconds, queries)
+
+	def _record_call(self, callback, class_instance, seconds, queries):
+		if self._current is None: # callback before the first tick
+			self.start_tick(-1)
+		self._record(('callback', get_callback_name(callback)), seconds, queries)
+		self._record(('type', type(class_instance).__name__), seconds, queries)
+
+	def _record(self, key, seconds, queries):
+		for data in (self._current, self.totals):
+			entry = data.get(key)
+			if entry is None:
+				data[key] = [seconds, 1, queries]
+			else:
+				entry[0] += seconds
+				entry[1] += 1
+				entry[2] += queries
+
+	def get_top(self, count=10, kind='callback'):
+		"""Returns the entries that took the most time in the window.
+		@param count: int, maximum number of entries
+		@param kind: 'callback' to group by callback function or 'type' to group by class instance type
+		@return: list of tuples (name, seconds, calls, queries), most expensive first"""
+		entries = [(name, seconds, calls, queries)
+		           for (entry_kind, name), (seconds, calls, queries) in self.totals.items()
+		           if entry_kind == kind]
+		entries.sort(key=lambda entry: (-entry[1], entry[0]))
+		return entries[:count]
+
+	def get_queries_per_tick(self):
+		"""Returns the average number of sql queries of the callbacks per tick in the window."""
+		if not self.ticks:
+			return 0.0
+		queries = sum(queries for (kind, name), (seconds, calls, queries) in self.totals.items()
+		              if kind == 'callback')
+		return queries / len(self.ticks)
+
+	def format_top(self, count=10):
+		"""Returns a printable table of the top entries of both kinds."""
+		lines = []
+		for kind, title in (('callback', 'Callback'), ('type', 'Class instance type')):
+			lines.append('{:<60} {:>10} {:>8} {:>10} {:>8}'.format(title, 'seconds', 'calls', 'ms/call', 'queries'))
+			for name, seconds, calls, queries in self.get_top(count, kind):
+				lines.append('{:<60} {:>10.3f} {:>8} {:>10.3f} {:>8}'.format(
+					name, seconds, calls, 1000.0 * seconds / calls, queries))
+			lines.append('')
+		lines.append('SQL queries per tick: {:.2f}'.format(self.get_queries_per_tick()))
+		return '\n'.join(lines)
@@ -0,0 +1,117 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import itertools
+
+
+class SpatialIndex(object):
+	"""
+	Uniform grid of square cells that keeps track of the coords of objects
+	such as units or buildings.
+
+	Used to answer queries of the form 'which objects are within this radius',
+	at a cost proportional to the number of objects nearby instead of all objects.
+	The results are in the order the objects have been added, so they are the same
+	as when filtering the list the objects are kept in, which keeps them deterministic.
+	"""
+
+	CELL_SIZE = 8
+
+	def __init__(self, cell_size=CELL_SIZE):
+		"""
+		@param cell_size: int, side length of the cells
+		"""
+		self.cell_size = cell_size
+		self._cells = {} # {(cell x, cell y): {object: (x, y)}}
+		self._objects = {} # {object: (cell, number in order of addition)}
+		self._numbers = itertools.count()
+
+	def __len__(self):
+		return len(self._objects)
+
+	def __contains__(self, obj):
+		return obj in self._objects
+
+	def _get_cell(self, coords):
+		return (coords[0] // self.cell_size, coords[1] // self.cell_size)
+
+	def add(self, obj, coords):
+		"""Adds an object, which must not be part of the index yet.
+		@param coords: tuple (x, y)"""
+		assert obj not in self._objects
+		cell = self._get_cell(coords)
+		self._cells.setdefault(cell, {})[obj] = coords
+		self._objects[obj] = (cell, next(self._numbers))
+
+	def move(self, obj, coords):
+		"""Updates the coords of an object of the index.
+		@param coords: tuple (x, y)"""
+		old_cell, number = self._objects[obj]
+		cell = self._get_cell(coords)
+		if cell != old_cell:
+			self._discard_from_cell(obj, old_cell)
+			self._objects[obj] = (cell, number)
+		self._cells.setdefault(cell, {})[obj] = coords
+
+	def remove(self, obj):
+		cell, number = self._objects.pop(obj)
+		self._discard_from_cell(obj, cell)
+
+	def _discard_from_cell(self, obj, cell):
+		objects = self._cells[cell]
+		del objects[obj]
+		if not objects:
+			del self._cells[cell]
+
+	def get_in_circle(self, center, radius):
+		"""Returns all objects with coords within the circle, like Circle.contains does.
+		@param center: Point
+		@param radius: int or float
+		@return: list of objects in the order they have been added"""
+		x = center.x
+		y = center.y
+		radius_sq = radius * radius
+		first_cell_x, first_cell_y = self._get_cell((x - radius, y - radius))
+		last_cell_x, last_cell_y = self._get_cell((x + radius, y + radius))
+		first_cell_x = int(first_cell_x)
+		first_cell_y = int(first_cell_y)
+		last_cell_x = int(last_cell_x)
+		last_cell_y = int(last_cell_y)
+
+		if (last_cell_x - first_cell_x + 1) * (last_cell_y - first_cell_y + 1) > len(self._cells):
+			# huge radius, fewer cells are occupied than covered
+			cells = [objects for (cell_x, cell_y), objects in self._cells.items()
+			         if first_cell_x <= cell_x <= last_cell_x and first_cell_y <= cell_y <= last_cell_y]
+		else:
+			cells = [self._cells[(cell_x, cell_y)]
+			         for cell_x in range(first_cell_x, last_cell_x + 1)
+			         for cell_y in range(first_cell_y, last_cell_y + 1)
+			         if (cell_x, cell_y) in self._cells]
+
+		found = []
+		for objects in cells:
+			for obj, (obj_x, obj_y) in objects.items():
+				dx = obj_x - x
+				dy = obj_y - y
+				if dx * dx + dy * dy <= radius_sq:
+					found.append((self._objects[obj][1], obj))
+		found.sort(key=lambda entry: entry[0])
+		return [obj for (number, obj) in found]
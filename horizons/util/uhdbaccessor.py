@@ -20,6 +20,7 @@
 # ###################################################
 
 import random
+from collections import namedtuple
 
 from horizons.constants import PATHS, TIER
 from horizons.entities import Entities
@@ -27,6 +28,9 @@ from horizons.i18n import gettext as T
 from horizons.util.dbreader import DbReader
 from horizons.util.python import decorators
 
+ResourceData = namedtuple('ResourceData', 'name value tradeable shown_in_inventory')
+TierData = namedtuple('TierData', 'name tax_income inhabitants_max')
+WeaponData = namedtuple('WeaponData', 'stackable attack_radius')
 
 ########################################################################
 class UhDbAccessor(DbReader):
@@ -38,10 +42,46 @@ class UhDbAccessor(DbReader):
 	it doesn't belong, such as game logic.
 
 	Due to historic reasons, sql code is spread over the game code; for now, it is left at
-	places, that are data access routines (e.g. unit/building class)."""
+	places, that are data access routines (e.g. unit/building class).
+
+	Static tables that are read from game code frequently are loaded into dicts on first
+	access (see _get_indexed), so the getters don't need any sql queries afterwards."""
 
 	def __init__(self, dbfile):
 		super(UhDbAccessor, self).__init__(dbfile=dbfile)
+		self._indexes = {}
+
+	def clear_cache(self):
+		super(UhDbAccessor, self).clear_cache()
+		self._indexes.clear()
+
+	def _get_indexed(self, sql, key, row_type=None):
+		"""Returns the value for key from the result of a query, which is stored as dict,
+		so the query is only executed once.
+		@param sql: query that selects the key as first column
+		@param key: value of the first column
+		@param row_type: callable that gets the other columns and returns the value.
+		                 If None, the query must select exactly one other column, which is the value.
+		@raise IndexError: if there is no row for key, like a query for it that returns no rows"""
+		index = self._indexes.get(sql)
+		if index is None:
+			if row_type is None:
+				index = dict(self(sql))
+			else:
+				index = {row[0]: row_type(*row[1:]) for row in self(sql)}
+			self._indexes[sql] = index
+		try:
+			return index[key]
+		except KeyError:
+			raise IndexError("No row for {!r}: {}".format(key, sql))
+
+	def _get_resource(self, id):
+		sql = "SELECT id, name, value, tradeable, shown_in_inventory FROM resource"
+		return self._get_indexed(sql, id, ResourceData)
+
+	def _get_tier(self, level):
+		sql = "SELECT level, name, tax_income, inhabitants_max FROM tier"
+		return self._get_indexed(sql, level, TierData)
 
 
 	# ------------------------------------------------------------------
@@ -53,18 +93,16 @@ class UhDbAccessor(DbReader):
 	def get_res_name(self, id):
 		"""Returns the translated name for a specific resource id.
 		@param id: int resource's id, of which the name is returned """
-		name = self.cached_query("SELECT name FROM resource WHERE id = ?", id)[0][0]
-		return T(name)
+		return T(self._get_resource(id).name)
 
 	def get_res_inventory_display(self, id):
-		sql = "SELECT shown_in_inventory FROM resource WHERE id = ?"
-		return self.cached_query(sql, id)[0][0]
+		return self._get_resource(id).shown_in_inventory
 
 	def get_res_value(self, id):
 		"""Returns the resource's value
 		@param id: resource id
 		@return: float value"""
-		return self.cached_query("SELECT value FROM resource WHERE id = ?", id)[0][0]
+		return self._get_resource(id).value
 
 	def get_res(self, only_tradeable=False, only_inventory=False):
 		"""Returns a list of all resources.
@@ -170,8 +208,7 @@ class UhDbAccessor(DbReader):
 		"""Returns the name of inhabitants for a specific tier.
 		@param level: int - which tier
 		@return: string - inhabitant name"""
-		sql = "SELECT name FROM tier WHERE level = ?"
-		return self.cached_query(sql, level)[0][0]
+		return self._get_tier(level).name
 
 	def get_settler_house_name(self, level):
 		"""Returns name of the residential building for a specific tier
@@ -181,16 +218,14 @@ class UhDbAccessor(DbReader):
 		return self.cached_query(sql, level)[0][0]
 
 	def get_settler_tax_income(self, level):
-		sql = "SELECT tax_income FROM tier WHERE level = ?"
-		return self.cached_query(sql, level)[0][0]
+		return self._get_tier(level).tax_income
 
 	def get_tier_inhabitants_max(self, level):
 		"""Returns the upper limit of inhabitants per house for a specific tier.
 		Inhabitants will try to increase their tier upon exceeding this value.
 		@param level: int - which tier
 		"""
-		sql = "SELECT inhabitants_max FROM tier WHERE level = ?"
-		return self.cached_query(sql, level)[0][0]
+		return self._get_tier(level).inhabitants_max
 
 	def get_tier_inhabitants_min(self, level):
 		"""Returns the lower limit of inhabitants per house for a specific tier.
@@ -201,16 +236,18 @@ class UhDbAccessor(DbReader):
 		if level == TIER.LOWEST:
 			return 0
 		else:
-			sql = "SELECT inhabitants_max FROM tier WHERE level = ?"
-			return self.cached_query(sql, level - 1)[0][0]
+			return self._get_tier(level - 1).inhabitants_max
+
+	def get_balance_value(self, name):
+		"""Returns a value of the balance_values table.
+		@param name: str, e.g. 'happiness_init_value'"""
+		return self._get_indexed("SELECT name, value FROM balance_values", name)
 
 	def get_upper_happiness_limit(self):
-		sql = "SELECT value FROM balance_values WHERE name='happiness_inhabitants_increase_requirement'"
-		return self.cached_query(sql)[0][0]
+		return self.get_balance_value('happiness_inhabitants_increase_requirement')
 
 	def get_lower_happiness_limit(self):
-		sql = "SELECT value FROM balance_values WHERE name='happiness_inhabitants_decrease_limit'"
-		return self.cached_query(sql)[0][0]
+		return self.get_balance_value('happiness_inhabitants_decrease_limit')
 
 	# Misc
 
@@ -219,12 +256,10 @@ class UhDbAccessor(DbReader):
 		start_res = self.cached_query("SELECT resource, amount FROM player_start_res")
 		return dict(start_res)
 
-	@decorators.cachedmethod
 	def get_storage_building_capacity(self, storage_type):
 		"""Returns the amount that a storage building can store of every resource.
 		@param storage_type: building class id"""
-		sql = "SELECT size FROM storage_building_capacity WHERE type = ?"
-		return self.cached_query(sql, storage_type)[0][0]
+		return self._get_indexed("SELECT type, size FROM storage_building_capacity", storage_type)
 
 	def get_random_ai_name(self, locale, used_names):
 		"""Returns a random name compatible with the given locale. If there are
@@ -258,11 +293,15 @@ class UhDbAccessor(DbReader):
 
 	def get_weapon_stackable(self, weapon_id):
 		"""Returns True if the weapon is stackable, False otherwise."""
-		return self.cached_query("SELECT stackable FROM weapon WHERE id = ?", weapon_id)[0][0]
+		return self._get_weapon(weapon_id).stackable
 
 	def get_weapon_attack_radius(self, weapon_id):
 		"""Returns weapon's attack radius modifier."""
-		return self.cached_query("SELECT attack_radius FROM weapon WHERE id = ?", weapon_id)[0][0]
+		return self._get_weapon(weapon_id).attack_radius
+
+	def _get_weapon(self, weapon_id):
+		sql = "SELECT id, stackable, attack_radius FROM weapon"
+		return self._get_indexed(sql, weapon_id, WeaponData)
 
 
 	# Units
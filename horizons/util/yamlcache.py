@@ -19,9 +19,11 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import hashlib
 import logging
 import os
 import threading
+import time
 
 import yaml
 
@@ -83,6 +85,9 @@ class YamlCache(object):
 	"""Loads and caches YAML files in a persistent cache.
 	Threadsafe.
 
+	Entries are kept per file name together with the modification time and size of the
+	file and a digest of its contents, so unchanged files don't have to be read at all.
+
 	Use get_file for files to cache (default case) or load_yaml_data for special use cases (behaves like yaml.load).
 	"""
 
@@ -91,6 +96,12 @@ class YamlCache(object):
 
 	sync_scheduled = False
 
+	# statistics for log_statistics
+	files_from_cache = 0
+	parse_seconds_saved = 0.0 # how long parsing took when the files were put into the cache
+	files_parsed = 0
+	parse_seconds = 0.0
+
 	lock = threading.Lock()
 
 	log = logging.getLogger("yamlcache")
@@ -106,38 +117,64 @@ class YamlCache(object):
 		@param filename: path to the file
 		@param game_data: Whether this file contains data like BUILDINGS.LUMBERJACK to resolve
 		"""
-		with open(filename, 'r', encoding="utf-8") as f:
-			filedata = f.read()
-
-		# calc the hash
-		h = hash(filedata)
-
 		# check for updates or new files
 		if cls.cache is None:
 			cls._open_cache()
 
-		yaml_file_in_cache = (filename in cls.cache and cls.cache[filename][0] == h)
-		if not yaml_file_in_cache:
-			data = cls.load_yaml_data(filedata)
-			if game_data: # need to convert some values
-				try:
-					data = convert_game_data(data)
-				except Exception as e:
-					# add info about file
-					to_add = "\nThis error happened in {0!s} .".format(filename)
-					e.args = ( e.args[0] + to_add, ) + e.args[1:]
-					e.message = ( e.message + to_add )
-					raise
-
-			cls.lock.acquire()
-			cls.cache[filename] = (h, data)
-			if not cls.sync_scheduled:
-				cls.sync_scheduled = True
-				from horizons.extscheduler import ExtScheduler
-				ExtScheduler().add_new_object(cls._do_sync, cls, run_in=1)
-			cls.lock.release()
-
-		return cls.cache[filename][1] # returns an object from the YAML
+		# files that haven't been modified are not even read
+		stat = os.stat(filename)
+		file_stamp = (stat.st_mtime_ns, stat.st_size)
+		cached = cls.cache[filename] if filename in cls.cache else None
+		if cached is not None and cached[0] == file_stamp:
+			cls.files_from_cache += 1
+			cls.parse_seconds_saved += cached[2]
+			return cached[3]
+
+		with open(filename, 'rb') as f:
+			filedata = f.read()
+		# builtin hash() is randomized for every process, this one is stable
+		digest = hashlib.sha1(filedata).digest()
+
+		if cached is not None and cached[1] == digest: # only touched
+			cls.files_from_cache += 1
+			cls.parse_seconds_saved += cached[2]
+			cls._store(filename, (file_stamp, digest, cached[2], cached[3]))
+			return cached[3]
+
+		start = time.time()
+		data = cls.load_yaml_data(filedata.decode('utf-8'))
+		if game_data: # need to convert some values
+			try:
+				data = convert_game_data(data)
+			except Exception as e:
+				# add info about file
+				to_add = "\nThis error happened in {0!s} .".format(filename)
+				e.args = ( e.args[0] + to_add, ) + e.args[1:]
+				e.message = ( e.message + to_add )
+				raise
+		parse_seconds = time.time() - start
+		cls.files_parsed += 1
+		cls.parse_seconds += parse_seconds
+
+		cls._store(filename, (file_stamp, digest, parse_seconds, data))
+		return data # returns an object from the YAML
+
+	@classmethod
+	def _store(cls, filename, entry):
+		"""Puts an entry (stamp, digest, parse time, data) into the cache and schedules writing it."""
+		cls.lock.acquire()
+		cls.cache[filename] = entry
+		if not cls.sync_scheduled:
+			cls.sync_scheduled = True
+			from horizons.extscheduler import ExtScheduler
+			ExtScheduler().add_new_object(cls._do_sync, cls, run_in=1)
+		cls.lock.release()
+
+	@classmethod
+	def log_statistics(cls):
+		"""Logs how much parsing has been avoided by the cache so far."""
+		cls.log.info("YamlCache: %d files from cache, saved %.2f s of parsing; %d files parsed in %.2f s",
+		             cls.files_from_cache, cls.parse_seconds_saved, cls.files_parsed, cls.parse_seconds)
 
 	@classmethod
 	def _open_cache(cls):
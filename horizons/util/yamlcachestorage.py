@@ -35,7 +35,7 @@ class YamlCacheStorage(object):
 	log = logging.getLogger("yamlcachestorage")
 
 	# Increment this when the users of this class change the way they use it.
-	version = 1
+	version = 2
 
 	def __init__(self, filename):
 		super(YamlCacheStorage, self).__init__()
@@ -91,7 +91,7 @@ class YamlCacheStorage(object):
 		"""Write the file to disk if possible. Do nothing otherwise."""
 		try:
 			with open(self._filename, 'wb') as f:
-				pickle.dump((self.version, self._data), f)
+				pickle.dump((self.version, self._data), f, pickle.HIGHEST_PROTOCOL)
 				self.log.debug('%s.sync(): success', self)
 		except Exception as e:
 			# Ignore all exceptions because saving the cache on disk is not critical.
@@ -24,7 +24,6 @@ import logging
 import json
 import copy
 
-from collections import deque
 from functools import partial
 
 import horizons.globals
@@ -32,16 +31,21 @@ from horizons.world.island import Island
 from horizons.world.player import HumanPlayer
 from horizons.scheduler import Scheduler
 from horizons.util.buildingindexer import BuildingIndexer
+from horizons.util.checkuphash import CheckupHash, hash_entry
 from horizons.util.color import Color
+from horizons.util.pathfinding.hierarchical import ClusterGraph
+from horizons.util.pathfinding.pathfinding import PathGrid
 from horizons.util.shapes import Circle, Point, Rect
+from horizons.util.spatialindex import SpatialIndex
 from horizons.util.worldobject import WorldObject
-from horizons.constants import UNITS, BUILDINGS, RES, GROUND, GAME, MAP, PATHS
+from horizons.constants import UNITS, BUILDINGS, RES, GROUND, GAME, MAP, PATHS, MULTIPLAYER
 from horizons.ai.trader import Trader
 from horizons.ai.pirate import Pirate
 from horizons.ai.aiplayer import AIPlayer
 from horizons.entities import Entities
 from horizons.world.buildingowner import BuildingOwner
 from horizons.world.diplomacy import Diplomacy
+from horizons.world.mappreprocessor import MapPreprocessor
 from horizons.world.units.weapon import Weapon
 from horizons.command.unit import CreateUnit
 from horizons.component.healthcomponent import HealthComponent
@@ -95,8 +99,15 @@ class World(BuildingOwner, WorldObject):
 		# and having at least one reference to them
 		self.ships = []
 		self.ground_units = []
+		# positions of ships and ground units for radius queries
+		self.ship_index = SpatialIndex()
+		self.ground_unit_index = SpatialIndex()
+		self.ships_checkup_hash = CheckupHash() # see get_checkup_hash
 
 		self.islands = []
+		self.map_preprocessor = None
+		self.path_grids = {} # see get_path_grid
+		self.cluster_graphs = {} # see get_cluster_graph
 
 		super(World, self).__init__(worldid=GAME.WORLD_WORLDID)
 
@@ -125,10 +136,14 @@ class World(BuildingOwner, WorldObject):
 		self.full_map = None
 		self.island_map = None
 		self.water = None
+		self.path_grids = None
+		self.cluster_graphs = None
 		self.ships = None
+		self.ship_index = None
 		self.ship_map = None
 		self.fish_indexer = None
 		self.ground_units = None
+		self.ground_unit_index = None
 
 		if self.pirate is not None:
 			self.pirate.end()
@@ -138,6 +153,7 @@ class World(BuildingOwner, WorldObject):
 			self.trader.end()
 			self.trader = None
 
+		self.map_preprocessor = None
 		self.islands = None
 		self.diplomacy = None
 
@@ -173,7 +189,7 @@ class World(BuildingOwner, WorldObject):
 		# use a dict because it's directly supported by the pathfinding algo
 		LoadingProgress.broadcast(self, 'world_init_water')
 		self.water = dict((tile, 1.0) for tile in self.ground_map)
-		self._init_water_bodies()
+		self.water_body = self.map_preprocessor.get_water_bodies()
 		self.sea_number = self.water_body[(self.min_x, self.min_y)]
 		for island in self.islands:
 			island.terrain_cache.create_sea_cache()
@@ -187,8 +203,12 @@ class World(BuildingOwner, WorldObject):
 			for coord, tile in island.ground_map.items():
 				if 'coastline' in tile.classes or 'constructible' not in tile.classes:
 					self.water_and_coastline[coord] = 1.0
-		self._init_shallow_water_bodies()
+		self.shallow_water_body = self.map_preprocessor.get_shallow_water_bodies()
 		self.shallow_sea_number = self.shallow_water_body[(self.min_x, self.min_y)]
+		self.map_preprocessor = None
+
+		# building it on the first long ship path would stall that tick on big maps
+		self.get_cluster_graph('water')
 
 		# create ship position list. entries: ship_map[(x, y)] = ship
 		self.ship_map = {}
@@ -261,9 +281,14 @@ class World(BuildingOwner, WorldObject):
 	def load_raw_map(self, savegame_db, preview=False):
 		self.map_name = savegame_db.map_name
 
+		if not preview:
+			# starts the work that can be done in the background while the tiles are created
+			self.map_preprocessor = MapPreprocessor(savegame_db, savegame_db.map_padding)
+
 		# Load islands.
 		for (islandid,) in savegame_db("SELECT DISTINCT island_id + 1001 FROM ground"):
-			island = Island(savegame_db, islandid, self.session, preview=preview)
+			island = Island(savegame_db, islandid, self.session, preview=preview,
+			                preprocessor=self.map_preprocessor)
 			self.islands.append(island)
 
 		# Calculate map dimensions.
@@ -359,39 +384,22 @@ class World(BuildingOwner, WorldObject):
 			self.log.warning('WARNING: Cannot autoselect a player because there '
 			                 'are no or multiple candidates.')
 
-	@classmethod
-	def _recognize_water_bodies(cls, map_dict):
-		"""This function runs the flood fill algorithm on the water to make it easy
-		to recognize different water bodies."""
-		moves = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-
-		n = 0
-		for coords, num in map_dict.items():
-			if num is not None:
-				continue
-
-			map_dict[coords] = n
-			queue = deque([coords])
-			while queue:
-				x, y = queue.popleft()
-				for dx, dy in moves:
-					coords2 = (x + dx, y + dy)
-					if coords2 in map_dict and map_dict[coords2] is None:
-						map_dict[coords2] = n
-						queue.append(coords2)
-			n += 1
-
-	def _init_water_bodies(self):
-		"""This function runs the flood fill algorithm on the water to make it easy
-		to recognize different water bodies."""
-		self.water_body = dict.fromkeys(self.water)
-		self._recognize_water_bodies(self.water_body)
-
-	def _init_shallow_water_bodies(self):
-		"""This function runs the flood fill algorithm on the water and the coast to
-		make it easy to recognise different water bodies for fishers."""
-		self.shallow_water_body = dict.fromkeys(self.water_and_coastline)
-		self._recognize_water_bodies(self.shallow_water_body)
+	def get_path_grid(self, path_nodes_name):
+		"""Returns the PathGrid of static path nodes of the world, which is created on first use.
+		@param path_nodes_name: 'water' or 'water_and_coastline'
+		@return: PathGrid"""
+		if path_nodes_name not in self.path_grids:
+			self.path_grids[path_nodes_name] = PathGrid(getattr(self, path_nodes_name), self.map_dimensions)
+		return self.path_grids[path_nodes_name]
+
+	def get_cluster_graph(self, path_nodes_name):
+		"""Returns the ClusterGraph for hierarchical pathfinding on static path nodes of the world.
+		The one of 'water' is created when the world is loaded, others on first use.
+		@param path_nodes_name: 'water' or 'water_and_coastline'
+		@return: ClusterGraph"""
+		if path_nodes_name not in self.cluster_graphs:
+			self.cluster_graphs[path_nodes_name] = ClusterGraph(self.get_path_grid(path_nodes_name))
+		return self.cluster_graphs[path_nodes_name]
 
 	def init_fish_indexer(self):
 		radius = Entities.buildings[ BUILDINGS.FISHER ].radius
@@ -602,16 +610,14 @@ class World(BuildingOwner, WorldObject):
 		@return: List of ships.
 		"""
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
-			return [ship for ship in self.ships if circle.contains(ship.position)]
+			return self.ship_index.get_in_circle(position, radius)
 		else:
 			return self.ships
 
 	def get_ground_units(self, position=None, radius=None):
 		"""@see get_ships"""
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
-			return [unit for unit in self.ground_units if circle.contains(unit.position)]
+			return self.ground_unit_index.get_in_circle(position, radius)
 		else:
 			return self.ground_units
 
@@ -619,11 +625,8 @@ class World(BuildingOwner, WorldObject):
 		"""@see get_ships"""
 		buildings = []
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
 			for island in self.islands:
-				for building in island.buildings:
-					if circle.contains(building.position.center):
-						buildings.append(building)
+				buildings.extend(island.building_index.get_in_circle(position, radius))
 			return buildings
 		else:
 			return [b for b in island.buildings for island in self.islands]
@@ -675,36 +678,45 @@ class World(BuildingOwner, WorldObject):
 
 	def get_checkup_hash(self):
 		"""Returns a collection of important game state values. Used to check if two mp games have diverged.
-		Not designed to be reliable."""
+		Not designed to be reliable.
+		The values are hashes of the subsystems, which are mostly maintained incrementally, so this is cheap.
+		If MULTIPLAYER.CHECKUP_HASH_DIAGNOSTICS is set, hashes of every single object are included
+		as well, which tells which objects have diverged."""
 		# NOTE: don't include float values, they are represented differently in python 2.6 and 2.7
 		# and will differ at some insignificant place. Also make sure to handle them correctly in the game logic.
+		settlements = self._get_settlement_checkup_hashes()
 		data = {
 			'rngvalue': self.session.random.random(),
-			'settlements': [],
-			'ships': [],
+			'settlements': CheckupHash.combine(entry[0] for entry in settlements.values()),
+			'inventories': CheckupHash.combine(entry[1] for entry in settlements.values()),
+			'ships': self.ships_checkup_hash.value,
 		}
+		if MULTIPLAYER.CHECKUP_HASH_DIAGNOSTICS:
+			details = {}
+			for worldid, (settlement_hash, inventory_hash) in settlements.items():
+				details['settlement {}'.format(worldid)] = settlement_hash
+				details['inventory {}'.format(worldid)] = inventory_hash
+			for ship in self.ships:
+				details['ship {}'.format(ship.worldid)] = hash_entry(ship._get_checkup_hash_entry())
+			data['details'] = details
+		return data
+
+	def _get_settlement_checkup_hashes(self):
+		"""Returns {settlement worldid: (hash of the settlement, hash of its inventory)}"""
+		hashes = {}
 		for island in self.islands:
-			# dicts usually aren't hashable, this makes them
-			# since defaultdicts appear, we discard values that can be autogenerated
-			# (those are assumed to default to something evaluating False)
-			dict_hash = lambda d : sorted(i for i in d.items() if i[1])
 			for settlement in island.settlements:
-				storage_dict = settlement.get_component(StorageComponent).inventory._storage
-				entry = {
-					'owner': str(settlement.owner.worldid),
-					'inhabitants': str(settlement.inhabitants),
-					'cumulative_running_costs': str(settlement.cumulative_running_costs),
-					'cumulative_taxes': str(settlement.cumulative_taxes),
-					'inventory': str(dict_hash(storage_dict))
-				}
-				data['settlements'].append(entry)
-		for ship in self.ships:
-			entry = {
-				'owner': str(ship.owner.worldid),
-				'position': ship.position.to_tuple(),
-			}
-			data['ships'].append(entry)
-		return data
+				entry = (settlement.worldid,
+				         settlement.owner.worldid,
+				         settlement.inhabitants,
+				         # str() like hash_entry does for non-int values
+				         str(settlement.cumulative_running_costs),
+				         str(settlement.cumulative_taxes),
+				         settlement.buildings_checkup_hash.value)
+				inventory = settlement.get_component(StorageComponent).inventory
+				hashes[settlement.worldid] = (hash_entry(entry),
+				                              hash_entry((settlement.worldid, inventory.checkup_hash.value)))
+		return hashes
 
 	def toggle_owner_highlight(self):
 		renderer = self.session.view.renderer['InstanceRenderer']
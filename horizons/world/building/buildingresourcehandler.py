@@ -19,6 +19,7 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+from horizons.component.storagecomponent import StorageComponent
 from horizons.messaging import ResourceProduced
 from horizons.world.production.producer import Producer
 from horizons.world.resourcehandler import ResourceHandler
@@ -38,6 +39,9 @@ class BuildingResourceHandler(ResourceHandler):
 
 	def __init(self):
 		self.island.provider_buildings.append(self)
+		self.get_component(StorageComponent).inventory.add_change_listener(self._post_to_job_board, once_per_tick=True)
+		if self.settlement is not None:
+			self.settlement.job_board.add_building(self)
 		if self.has_component(Producer):
 			self.get_component(Producer).add_activity_changed_listener(self._set_running_costs_to_status)
 			self.get_component(Producer).add_production_finished_listener(self.on_production_finished)
@@ -50,6 +54,9 @@ class BuildingResourceHandler(ResourceHandler):
 	def remove(self):
 		super(BuildingResourceHandler, self).remove()
 		self.island.provider_buildings.remove(self)
+		self.get_component(StorageComponent).inventory.discard_change_listener(self._post_to_job_board)
+		if self.settlement is not None and self.settlement.job_board is not None:
+			self.settlement.job_board.remove_building(self)
 		if self.has_component(Producer):
 			self.get_component(Producer).remove_activity_changed_listener(self._set_running_costs_to_status)
 			self.get_component(Producer).remove_production_finished_listener(self.on_production_finished)
@@ -58,6 +65,11 @@ class BuildingResourceHandler(ResourceHandler):
 		if self.is_valid_tradable_resource(resources):
 			ResourceProduced.broadcast(self, caller, resources)
 
+	def _post_to_job_board(self):
+		"""Tells the collectors of the settlement that the inventory has changed."""
+		if self.settlement is not None and self.settlement.job_board is not None:
+			self.settlement.job_board.post(self)
+
 	def is_valid_tradable_resource(self, resources):
 		""" Checks if the produced resource tradable (can be carried by collectors).
 		"""
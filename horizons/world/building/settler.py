@@ -91,7 +91,7 @@ class Settler(BuildableRect, BuildingResourceHandler, BasicBuilding):
 		super(Settler, self).save(db)
 		db("INSERT INTO settler(rowid, inhabitants, last_tax_payed) VALUES (?, ?, ?)",
 		   self.worldid, self.inhabitants, self.last_tax_payed)
-		remaining_ticks = Scheduler().get_remaining_ticks(self, self._tick)
+		remaining_ticks = self.settlement.settler_economy.get_remaining_ticks(self)
 		db("INSERT INTO remaining_ticks_of_month(rowid, ticks) VALUES (?, ?)",
 		   self.worldid, remaining_ticks)
 
@@ -148,6 +148,7 @@ class Settler(BuildableRect, BuildingResourceHandler, BasicBuilding):
 
 	def remove(self):
 		SettlerInhabitantsChanged.broadcast(self, -self.inhabitants)
+		self.settlement.settler_economy.remove(self)
 
 		UpgradePermissionsChanged.unsubscribe(self._on_change_upgrade_permissions, sender=self.settlement)
 		super(Settler, self).remove()
@@ -218,10 +219,11 @@ class Settler(BuildableRect, BuildingResourceHandler, BasicBuilding):
 		"""Start regular tick calls"""
 		interval = self.session.timer.get_ticks(GAME.INGAME_TICK_INTERVAL)
 		run_in = remaining_ticks if remaining_ticks is not None else interval
-		Scheduler().add_new_object(self._tick, self, run_in=run_in, loops=-1, loop_interval=interval)
+		self.settlement.settler_economy.add(self, run_in)
 
-	def _tick(self):
-		"""Here we collect the functions, that are called regularly (every "month")."""
+	def tick(self):
+		"""Here we collect the functions, that are called regularly (every "month").
+		Called by the SettlerEconomy of the settlement."""
 		self.pay_tax()
 		self.inhabitant_check()
 		self.level_check()
@@ -412,13 +414,10 @@ class Settler(BuildableRect, BuildingResourceHandler, BasicBuilding):
 		except AttributeError: # an attribute hasn't been set up
 			return super(Settler, self).__str__()
 
-	#@decorators.cachedmethod TODO: replace this with a version that doesn't leak
 	def __get_data(self, key):
 		"""Returns constant settler-related data from the db.
-		The values are cached by python, so the underlying data must not change."""
-		return int(
-		  self.session.db("SELECT value FROM balance_values WHERE name = ?", key)[0][0]
-		  )
+		The values are cached by the db accessor, so the underlying data must not change."""
+		return int(self.session.db.get_balance_value(key))
 
 
 
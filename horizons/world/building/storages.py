@@ -41,7 +41,7 @@ class StorageBuilding(StorageResourceHandler,
 
 	def initialize(self):
 		super(StorageBuilding, self).initialize()
-		self.get_component(StorageComponent).inventory.add_change_listener(self._changed)
+		self.get_component(StorageComponent).inventory.add_change_listener(self._changed, once_per_tick=True)
 		# add limit, it will be saved so don't set on load()
 		inv = self.get_component(StorageComponent).inventory
 		inv.adjust_limit(self.session.db.get_storage_building_capacity(self.id))
@@ -55,7 +55,7 @@ class StorageBuilding(StorageResourceHandler,
 	def load(self, db, worldid):
 		super(StorageBuilding, self).load(db, worldid)
 		# limit will be save/loaded by the storage, don't do anything here
-		self.get_component(StorageComponent).inventory.add_change_listener(self._changed)
+		self.get_component(StorageComponent).inventory.add_change_listener(self._changed, once_per_tick=True)
 
 	def get_utilization_history_length(self):
 		collecting_comp = self.get_component(CollectingComponent)
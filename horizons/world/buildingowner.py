@@ -20,6 +20,7 @@
 # ###################################################
 
 from horizons.util.shapes import Point, RadiusRect
+from horizons.util.spatialindex import SpatialIndex
 from horizons.world.providerhandler import ProviderHandler
 
 
@@ -36,6 +37,7 @@ class BuildingOwner(object):
 		super(BuildingOwner, self).__init__(*args, **kwargs)
 		self.provider_buildings = ProviderHandler()
 		self.buildings = []
+		self.building_index = SpatialIndex() # centers of self.buildings
 
 	def add_building(self, building, player, load=False):
 		"""Adds a building to the island at the position x, y with player as the owner.
@@ -47,6 +49,7 @@ class BuildingOwner(object):
 			tile.blocked = True # Set tile blocked
 			tile.object = building # Set tile's object to the building
 		self.buildings.append(building)
+		self.building_index.add(building, building.position.center.to_tuple())
 		building.init()
 		return building
 
@@ -61,6 +64,7 @@ class BuildingOwner(object):
 
 		# Remove this building from the buildings list
 		self.buildings.remove(building)
+		self.building_index.remove(building)
 		assert building not in self.buildings
 
 	def get_settlements(self, rect, player=None):
@@ -148,3 +152,4 @@ class BuildingOwner(object):
 				self.buildings[-1].remove()
 		self.provider_buildings = None
 		self.buildings = None
+		self.building_index = None
@@ -71,12 +71,13 @@ class Island(BuildingOwner, WorldObject):
 	"""
 	log = logging.getLogger("world.island")
 
-	def __init__(self, db, island_id, session, preview=False):
+	def __init__(self, db, island_id, session, preview=False, preprocessor=None):
 		"""
 		@param db: db instance with island table
 		@param island_id: id of island in that table
 		@param session: reference to Session instance
 		@param preview: flag, map preview mode
+		@param preprocessor: MapPreprocessor of the map, provides the tiles and the terrain cache
 		"""
 		super(Island, self).__init__(worldid=island_id)
 
@@ -84,7 +85,7 @@ class Island(BuildingOwner, WorldObject):
 
 		self.terrain_cache = None
 		self.available_land_cache = None
-		self.__init(db, island_id, preview)
+		self.__init(db, island_id, preview, preprocessor)
 
 		if not preview:
 			# Create building indexers.
@@ -101,7 +102,8 @@ class Island(BuildingOwner, WorldObject):
 			# Caches and buildings are not required for map preview.
 			return
 
-		self.terrain_cache = TerrainBuildabilityCache(self)
+		terrain_cache_data = preprocessor.get_terrain_cache_data(island_id) if preprocessor else None
+		self.terrain_cache = TerrainBuildabilityCache(self, terrain_cache_data)
 		flat_land_set = self.terrain_cache.cache[TerrainRequirement.LAND][(1, 1)]
 		self.available_flat_land = len(flat_land_set)
 		available_coords_set = set(self.terrain_cache.land_or_coast)
@@ -121,15 +123,22 @@ class Island(BuildingOwner, WorldObject):
 		for (building_worldid, building_typeid) in buildings:
 			load_building(self.session, db, building_typeid, building_worldid)
 
-	def __init(self, db, island_id, preview):
+	def __init(self, db, island_id, preview, preprocessor):
 		"""
 		Load the actual island from a file
 		@param preview: flag, map preview mode
+		@param preprocessor: MapPreprocessor or None
 		"""
 		p_x, p_y, width, height = db("SELECT MIN(x), MIN(y), (1 + MAX(x) - MIN(x)), (1 + MAX(y) - MIN(y)) FROM ground WHERE island_id = ?", island_id - 1001)[0]
 
+		if preprocessor is not None:
+			ground_rows = preprocessor.get_ground_rows(island_id)
+		else:
+			ground_rows = db("SELECT x, y, ground_id, action_id, rotation FROM ground WHERE island_id = ?",
+			                 island_id - 1001)
+
 		self.ground_map = {}
-		for (x, y, ground_id, action_id, rotation) in db("SELECT x, y, ground_id, action_id, rotation FROM ground WHERE island_id = ?", island_id - 1001): # Load grounds
+		for (x, y, ground_id, action_id, rotation) in ground_rows: # Load grounds
 			if not preview: # actual game, need actual tiles
 				ground = Entities.grounds[str('{:d}-{}'.format(ground_id, action_id))](self.session, x, y)
 				ground.act(rotation)
@@ -267,6 +276,9 @@ class Island(BuildingOwner, WorldObject):
 			building.settlement = settlement
 			building.owner = settlement.owner
 			settlement.add_building(building)
+			if hasattr(building, 'provided_resources'): # e.g. trees
+				self.provider_buildings.owner_changed(building)
+				settlement.job_board.add_building(building)
 
 		if not settlement_coords_changed:
 			return
@@ -310,6 +322,9 @@ class Island(BuildingOwner, WorldObject):
 			building = tile.object
 			if building is not None:
 				settlement.remove_building(building)
+				if hasattr(building, 'provided_resources'):
+					settlement.job_board.remove_building(building)
+					self.provider_buildings.owner_changed(building)
 				building.owner = None
 				building.settlement = None
 			if coords in land_or_coast:
@@ -0,0 +1,195 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from collections import OrderedDict, namedtuple
+
+from horizons.constants import COLLECTORS
+from horizons.scheduler import Scheduler
+from horizons.util.worldobject import WorldObject
+
+
+# idle_since: tick since which the collector hasn't found a job
+# resources: frozenset of the resources the collector waits for
+# targets: list of the buildings it could collect from
+WaitingCollector = namedtuple('WaitingCollector', ['idle_since', 'resources', 'targets', 'home'])
+
+
+class JobBoard(object):
+	"""Tells idle collectors of a settlement when there might be a job for them.
+
+	Collectors that can't find a job wait at the board instead of searching again every few
+	ticks. The board remembers the buildings each of them could collect from, and buildings
+	post to the board when their inventory changes or a collector cancels its job there, which
+	makes the resources it would have picked up available again. A few ticks later, the board
+	wakes up the waiting collectors that could now pick up one of their resources at a posted
+	building, and the ones whose home building has space for a resource they don't wait for
+	yet. Woken collectors search for the best job themselves, the ones that have been idle for
+	the longest time first. This is the same on every client and doesn't let collectors starve that compete
+	for a resource.
+
+	The waiting collectors and the posts are saved, so a loaded game continues exactly like
+	one that has kept running.
+	"""
+
+	def __init__(self, settlement):
+		self.settlement = settlement
+		self._collectors = {} # {collector: WaitingCollector}
+		self._collectors_by_target = {} # {building: set of collectors that could collect there}
+		self._collectors_by_home = {} # {home building: set of its waiting collectors}
+		self._posted_buildings = OrderedDict() # buildings that have posted since the last dispatch
+
+	def add_waiting_collector(self, collector, resources, idle_since, targets=None):
+		"""Registers a collector that waits for a job.
+		@param collector: BuildingCollector, that is woken up with notify_job_available()
+		@param resources: the resources there is space for at the home building of the collector
+		@param idle_since: tick since which the collector hasn't found a job
+		@param targets: the buildings it could collect from, only when loading
+		"""
+		self.remove_waiting_collector(collector)
+		resources = frozenset(resources)
+		if targets is None:
+			targets = collector.get_possible_job_targets(resources) if resources else []
+		self._collectors[collector] = WaitingCollector(idle_since, resources, targets,
+		                                              collector.home_building)
+		for building in targets:
+			self._collectors_by_target.setdefault(building, set()).add(collector)
+		self._collectors_by_home.setdefault(collector.home_building, set()).add(collector)
+
+	def remove_waiting_collector(self, collector):
+		"""Removes the collector if it is waiting."""
+		waiting = self._collectors.pop(collector, None)
+		if waiting is not None:
+			for building in waiting.targets:
+				self._discard(self._collectors_by_target, building, collector)
+			self._discard(self._collectors_by_home, waiting.home, collector)
+
+	def is_waiting(self, collector):
+		return collector in self._collectors
+
+	def add_building(self, building):
+		"""Makes the waiting collectors aware of a new building they could collect from."""
+		for collector, waiting in self._collectors.items():
+			if not waiting.resources.isdisjoint(building.provided_resources) and \
+			   collector.is_possible_job_target(building):
+				waiting.targets.append(building)
+				self._collectors_by_target.setdefault(building, set()).add(collector)
+
+	def remove_building(self, building):
+		"""Forgets a building that is removed."""
+		self._posted_buildings.pop(building, None)
+		for collector in self._collectors_by_target.pop(building, ()):
+			self._collectors[collector].targets.remove(building)
+
+	def post(self, building):
+		"""Called when the inventory of the building has changed or a collector has cancelled
+		its job there. All collectors that might find a job because of that are woken up with
+		the next dispatch.
+		@param building: BuildingResourceHandler, which may be a job target or a home building
+		"""
+		if building in self._posted_buildings or \
+		   (building not in self._collectors_by_target and building not in self._collectors_by_home):
+			return
+		if not self._posted_buildings:
+			Scheduler().add_new_object(self._dispatch, self, run_in=COLLECTORS.JOB_BOARD_DISPATCH_TICKS)
+		self._posted_buildings[building] = None
+
+	def _dispatch(self):
+		woken = set()
+		for building in self._posted_buildings:
+			self._add_woken_collectors(building, woken)
+		self._posted_buildings.clear()
+
+		for collector in sorted(woken, key=lambda c: (self._collectors[c].idle_since, c.worldid)):
+			self.remove_waiting_collector(collector)
+			collector.notify_job_available()
+
+	def _add_woken_collectors(self, building, woken):
+		"""Adds the waiting collectors, that might find a job because of the building, to woken."""
+		available = {} # {res: whether it can be picked up}, computed on demand
+		for collector in self._collectors_by_target.get(building, ()):
+			for res in self._collectors[collector].resources:
+				if res not in available:
+					available[res] = building.get_available_pickup_amount(res, None) > 0
+				if available[res]:
+					woken.add(collector)
+					break
+
+		needed_resources = None # the same for all collectors of the building
+		for collector in self._collectors_by_home.get(building, ()):
+			if collector in woken:
+				continue
+			if needed_resources is None:
+				needed_resources = collector.get_collectable_res()
+			resources = self._collectors[collector].resources
+			if any(res not in resources and collector.get_home_inventory_free_space(res) > 0
+			       for res in needed_resources):
+				woken.add(collector)
+
+	def save(self, db):
+		if self._posted_buildings:
+			remaining_ticks = Scheduler().get_remaining_ticks(self, self._dispatch)
+			for building in self._posted_buildings:
+				db("INSERT INTO job_board_post(settlement, building, remaining_ticks) VALUES(?, ?, ?)",
+				   self.settlement.worldid, building.worldid, remaining_ticks)
+
+	def load(self, db):
+		"""Restores the posts, the buildings of the settlement must have been loaded."""
+		posts = db("SELECT building, remaining_ticks FROM job_board_post "
+		           "WHERE settlement = ? ORDER BY rowid", self.settlement.worldid)
+		for building_id, remaining_ticks in posts:
+			self._posted_buildings[WorldObject.get_object_by_id(building_id)] = None
+		if posts:
+			Scheduler().add_new_object(self._dispatch, self, run_in=posts[0][1])
+
+	def save_collector(self, db, collector):
+		"""Saves the resources and targets of a waiting collector, see load_collector."""
+		waiting = self._collectors[collector]
+		for res in sorted(waiting.resources):
+			db("INSERT INTO collector_job_board_resource(collector, resource) VALUES(?, ?)",
+			   collector.worldid, res)
+		for building in waiting.targets:
+			db("INSERT INTO collector_job_board_target(collector, building) VALUES(?, ?)",
+			   collector.worldid, building.worldid)
+
+	@classmethod
+	def load_collector(cls, db, worldid):
+		"""Returns the resources and the worldids of the targets of a waiting collector."""
+		resources = [res for (res, ) in
+		             db("SELECT resource FROM collector_job_board_resource WHERE collector = ?", worldid)]
+		targets = [building for (building, ) in
+		           db("SELECT building FROM collector_job_board_target "
+		              "WHERE collector = ? ORDER BY rowid", worldid)]
+		return resources, targets
+
+	@staticmethod
+	def _discard(collectors_by_building, building, collector):
+		collectors = collectors_by_building[building]
+		collectors.discard(collector)
+		if not collectors:
+			del collectors_by_building[building]
+
+	def end(self):
+		Scheduler().rem_all_classinst_calls(self)
+		self.settlement = None
+		self._posted_buildings.clear()
+		self._collectors.clear()
+		self._collectors_by_target.clear()
+		self._collectors_by_home.clear()
@@ -0,0 +1,149 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""
+Computes the static data of the map that only depends on the ground tiles: the terrain
+buildability caches of the islands and the water bodies.
+
+This is pure data, so on big maps it is done in worker processes while the main process
+creates the tiles of the islands. The workers are started with the spawn method when the
+game starts (see MapPreprocessor.start_workers), so they don't inherit the threads or the
+state of the engine. They only import horizons.util.mapanalysis, which has the functions
+that do the work. The results don't depend on whether and how the work is split, the
+values are only collected in the order the world needs them.
+"""
+
+import logging
+import multiprocessing
+from collections import defaultdict
+from functools import partial
+
+from horizons.entities import Entities
+from horizons.util.mapanalysis import get_buildable_coords, get_water_bodies
+from horizons.world.buildability.terraincache import TerrainBuildabilityCache
+
+
+class MapPreprocessor(object):
+	"""
+	Reads the ground table and starts the computations when it is created, the results are
+	then fetched with get_ground_rows, get_terrain_cache_data, get_water_bodies and
+	get_shallow_water_bodies.
+	"""
+	log = logging.getLogger("world.mappreprocessor")
+
+	# smaller maps are processed in the main process when the results are needed,
+	# sending the tiles to the workers would take longer than what can be done in parallel
+	MIN_PARALLEL_TILES = 30000
+
+	# the work is split into one job per island and two for the water, more workers rarely help
+	MAX_PROCESSES = 4
+
+	_pool = None # shared by all maps, see start_workers
+
+	@classmethod
+	def start_workers(cls):
+		"""Starts the worker processes if there is more than one cpu.
+		Call this once at startup, before the engine is initialized."""
+		if cls._pool is not None:
+			return
+		processes = min(multiprocessing.cpu_count() - 1, cls.MAX_PROCESSES)
+		if processes < 1:
+			return
+		# spawn, so the workers are new processes instead of copies of the game
+		cls._pool = multiprocessing.get_context('spawn').Pool(processes=processes)
+		cls.log.debug("Started %s map preprocessing processes", processes)
+
+	@classmethod
+	def stop_workers(cls):
+		if cls._pool is not None:
+			cls._pool.terminate()
+			cls._pool.join()
+			cls._pool = None
+
+	def __init__(self, db, map_padding):
+		"""
+		@param db: db with the ground table of the map
+		@param map_padding: number of water tiles around the islands
+		"""
+		self._ground_rows = defaultdict(list) # {island worldid: [(x, y, ground id, action id, rotation)]}
+		island_tiles = defaultdict(dict) # {island worldid: {(x, y): classes of the tile}}
+		ground_classes = {} # {(ground id, action id): classes}
+		rows = db("SELECT island_id + 1001, x, y, ground_id, action_id, rotation FROM ground")
+		for (island_id, x, y, ground_id, action_id, rotation) in rows:
+			self._ground_rows[island_id].append((x, y, ground_id, action_id, rotation))
+			try:
+				classes = ground_classes[(ground_id, action_id)]
+			except KeyError:
+				classes = tuple(Entities.grounds['{:d}-{}'.format(ground_id, action_id)].classes)
+				ground_classes[(ground_id, action_id)] = classes
+			island_tiles[island_id][(x, y)] = classes
+
+		# same as World.load_raw_map
+		min_x, min_y, max_x, max_y = 0, 0, 0, 0
+		for tiles in island_tiles.values():
+			min_x = min(min_x, min(x for (x, y) in tiles))
+			min_y = min(min_y, min(y for (x, y) in tiles))
+			max_x = max(max_x, max(x for (x, y) in tiles))
+			max_y = max(max_y, max(y for (x, y) in tiles))
+		bounds = (min_x - map_padding, min_y - map_padding, max_x + map_padding, max_y + map_padding)
+
+		island_coords = set()
+		land_coords = set() # tiles that fishers can't go through, see World.water_and_coastline
+		for tiles in island_tiles.values():
+			island_coords.update(tiles)
+			land_coords.update(coords for coords, classes in tiles.items()
+			                   if 'coastline' not in classes and 'constructible' in classes)
+
+		self._results = {}
+		num_tiles = (bounds[2] - bounds[0]) * (bounds[3] - bounds[1])
+		pool = self._pool if num_tiles >= self.MIN_PARALLEL_TILES else None
+		# the jobs that are needed first are started first
+		for island_id, tiles in sorted(island_tiles.items()):
+			self._start(pool, ('terrain', island_id), get_buildable_coords, list(tiles.items()),
+			            TerrainBuildabilityCache.sizes)
+		self._start(pool, 'water', get_water_bodies, bounds, island_coords)
+		self._start(pool, 'shallow_water', get_water_bodies, bounds, land_coords)
+
+	def _start(self, pool, key, function, *args):
+		if pool is not None:
+			self._results[key] = pool.apply_async(function, args).get
+		else:
+			self._results[key] = partial(function, *args)
+
+	def _get(self, key):
+		return self._results.pop(key)()
+
+	def get_ground_rows(self, island_id):
+		"""@return: [(x, y, ground id, action id, rotation)] of the tiles of the island"""
+		return self._ground_rows.pop(island_id)
+
+	def get_terrain_cache_data(self, island_id):
+		"""@return: data for the TerrainBuildabilityCache of the island"""
+		return self._get(('terrain', island_id))
+
+	def get_water_bodies(self):
+		"""@return: {(x, y): water body number} of World.water, see mapanalysis.get_water_bodies"""
+		return self._get('water')
+
+	def get_shallow_water_bodies(self):
+		"""@return: {(x, y): water body number} of World.water_and_coastline,
+		see mapanalysis.get_water_bodies"""
+		return self._get('shallow_water')
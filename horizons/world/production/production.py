@@ -68,6 +68,7 @@ class Production(ChangeListener):
 		# this has grown to be a bit weird compared to other init/loads
 		# __init__ is always called before load, therefore load just overwrites some of the values here
 		self._state_history = deque()
+		self._state_ticks = defaultdict(int) # {state index: ticks}, see _init_state_ticks
 		self.prod_id = prod_id
 		self.prod_data = prod_data
 		self.__start_finished = start_finished
@@ -143,6 +144,7 @@ class Production(ChangeListener):
 			self._add_listeners()
 
 		self._state_history = db.get_production_state_history(worldid, self.prod_id)
+		self._init_state_ticks()
 
 	def remove(self):
 		self._remove_listeners()
@@ -253,27 +255,9 @@ class Production(ChangeListener):
 		Returns the part of time 0 <= x <= 1 the production has been in a state during the last history_length ticks.
 		"""
 		self._clean_state_history()
-		result = defaultdict(int)
-		current_tick = Scheduler().cur_tick
-		pause_state = PRODUCTION.STATES.paused.index
-		first_relevant_tick = self._get_first_relevant_tick(ignore_pause)
-		num_entries = len(self._state_history)
-
-		for i in range(num_entries):
-			if ignore_pause and self._state_history[i][1] == pause_state:
-				continue
-			tick = self._state_history[i][0]
-			if tick >= current_tick:
-				break
-
-			next_tick = min(self._state_history[i + 1][0], current_tick) if i + 1 < num_entries else current_tick
-			if next_tick <= first_relevant_tick:
-				continue
-			relevant_ticks = next_tick - tick
-			if tick < first_relevant_tick:
-				# the beginning is not relevant
-				relevant_ticks -= first_relevant_tick - tick
-			result[self._state_history[i][1]] += relevant_ticks
+		result = self._get_state_ticks_since(self._get_first_relevant_tick(ignore_pause))
+		if ignore_pause:
+			result.pop(PRODUCTION.STATES.paused.index, None)
 
 		total_length = sum(result.values())
 		if total_length == 0:
@@ -298,6 +282,46 @@ class Production(ChangeListener):
 		"""Returns the callback used during the process of producing (state: producing)"""
 		return self._finished_producing
 
+	def _init_state_ticks(self):
+		"""Sums up how long the production has been in each state in the state history.
+		Only the time between the entries is counted, the last state is still going on."""
+		self._state_ticks = defaultdict(int)
+		entries = list(self._state_history)
+		for (tick, state), (next_tick, _) in zip(entries, entries[1:]):
+			self._state_ticks[state] += next_tick - tick
+
+	def _get_state_ticks_since(self, first_relevant_tick):
+		"""Returns {state index: ticks} of the time in each state since first_relevant_tick."""
+		current_tick = Scheduler().cur_tick
+		result = defaultdict(int, self._state_ticks)
+		if not self._state_history:
+			return result
+		last_tick, last_state = self._state_history[-1]
+		result[last_state] += current_tick - last_tick
+
+		# subtract the beginning of the history that is not relevant, usually just a part of
+		# the first entry, since the history is cleaned up regularly
+		num_entries = len(self._state_history)
+		for i in range(num_entries):
+			tick, state = self._state_history[i]
+			if tick >= first_relevant_tick:
+				break
+			next_tick = self._state_history[i + 1][0] if i + 1 < num_entries else current_tick
+			result[state] -= min(next_tick, first_relevant_tick) - tick
+		return result
+
+	def _get_paused_ticks_since_entry(self, index):
+		"""Returns how long the production has been paused since the start of a state history entry."""
+		pause_state = PRODUCTION.STATES.paused.index
+		paused_ticks = self._state_ticks[pause_state]
+		last_tick, last_state = self._state_history[-1]
+		if last_state == pause_state:
+			paused_ticks += Scheduler().cur_tick - last_tick
+		for i in range(index):
+			if self._state_history[i][1] == pause_state:
+				paused_ticks -= self._state_history[i + 1][0] - self._state_history[i][0]
+		return paused_ticks
+
 	def _get_first_relevant_tick(self, ignore_pause):
 		"""
 		Returns the first tick that is relevant for production utilization calculation
@@ -308,26 +332,35 @@ class Production(ChangeListener):
 		state_hist_len = min(PRODUCTION.STATISTICAL_WINDOW, current_tick - self._creation_tick)
 
 		first_relevant_tick = current_tick - state_hist_len
-		if not ignore_pause:
+		if not ignore_pause or not self._state_history:
 			return first_relevant_tick
 
-		# ignore paused time
-		pause_state = PRODUCTION.STATES.paused.index
-		for i in range(len(self._state_history) - 1, -1, -1):
-			if self._state_history[i][1] != pause_state:
-				continue
-			tick = self._state_history[i][0]
-			next_tick = self._state_history[i + 1][0] if i + 1 < len(self._state_history) else current_tick
-			if next_tick <= first_relevant_tick:
-				break
-			first_relevant_tick -= next_tick - tick
-		return max(self._creation_tick, first_relevant_tick)
+		# extend the time span by the paused time in it. The history is cleaned up,
+		# so only the first entry can reach back further than the relevant ticks.
+		paused_ticks = self._get_paused_ticks_since_entry(0)
+		first_tick, first_state = self._state_history[0]
+		if first_state == PRODUCTION.STATES.paused.index:
+			first_end_tick = self._state_history[1][0] if len(self._state_history) > 1 else current_tick
+			# the pause at the beginning doesn't count if there are enough ticks after it
+			if current_tick - first_end_tick - (paused_ticks - (first_end_tick - first_tick)) >= state_hist_len:
+				return max(self._creation_tick, first_end_tick)
+		return max(self._creation_tick, first_relevant_tick - paused_ticks)
 
 	def _clean_state_history(self):
 		""" remove the part of the state history that is too old to matter """
-		first_relevant_tick = self._get_first_relevant_tick(True)
-		while len(self._state_history) > 1 and self._state_history[1][0] < first_relevant_tick:
-			self._state_history.popleft()
+		current_tick = Scheduler().cur_tick
+		state_hist_len = min(PRODUCTION.STATISTICAL_WINDOW, current_tick - self._creation_tick)
+		pause_state = PRODUCTION.STATES.paused.index
+		# the second entry is too old if there are enough ticks that aren't paused after it
+		while len(self._state_history) > 1:
+			tick, state = self._state_history[1]
+			unpaused_ticks = current_tick - tick - self._get_paused_ticks_since_entry(1)
+			if state != pause_state:
+				unpaused_ticks -= 1 # relevant is the tick after the entry
+			if tick >= self._creation_tick and unpaused_ticks < state_hist_len:
+				break
+			first_tick, first_state = self._state_history.popleft()
+			self._state_ticks[first_state] -= tick - first_tick
 
 	def _changed(self):
 		super(Production, self)._changed()
@@ -339,7 +372,13 @@ class Production(ChangeListener):
 
 		if self._state_history and self._state_history[-1][0] == current_tick:
 			self._state_history.pop() # make sure no two events are on the same tick
+			if self._state_history:
+				last_tick, last_state = self._state_history[-1]
+				self._state_ticks[last_state] -= current_tick - last_tick
 		if not self._state_history or self._state_history[-1][1] != state:
+			if self._state_history:
+				last_tick, last_state = self._state_history[-1]
+				self._state_ticks[last_state] += current_tick - last_tick
 			self._state_history.append((current_tick, state))
 
 		self._clean_state_history()
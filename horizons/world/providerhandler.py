@@ -33,14 +33,21 @@ class ProviderHandler(list):
 	def __init__(self):
 		super(ProviderHandler, self).__init__()
 		self.provider_by_resources = defaultdict(list)
+		self.version = 0 # changes whenever providers are added, removed or change owner, for caches
 
 	def append(self, provider):
 		# NOTE: appended elements need to be removed, else there will be a memory leak
 		for res in provider.provided_resources:
 			self.provider_by_resources[res].append(provider)
 		super(ProviderHandler, self).append(provider)
+		self.version += 1
 
 	def remove(self, provider):
 		for res in provider.provided_resources:
 			self.provider_by_resources[res].remove(provider)
 		super(ProviderHandler, self).remove(provider)
+		self.version += 1
+
+	def owner_changed(self, provider):
+		"""Has to be called when the owner of a provider changes, collectors only use their own."""
+		self.version += 1
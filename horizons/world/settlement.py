@@ -30,11 +30,14 @@ from horizons.constants import BUILDINGS, TIER
 from horizons.messaging import SettlementInventoryUpdated, UpgradePermissionsChanged
 from horizons.scheduler import Scheduler
 from horizons.util.changelistener import ChangeListener
+from horizons.util.checkuphash import CheckupHash
 from horizons.util.inventorychecker import InventoryChecker
 from horizons.util.worldobject import WorldObject
 from horizons.world.buildability.settlementcache import SettlementBuildabilityCache
+from horizons.world.jobboard import JobBoard
 from horizons.world.production.producer import GroundUnitProducer, Producer, ShipProducer
 from horizons.world.resourcehandler import ResourceHandler
+from horizons.world.settlereconomy import SettlerEconomy
 
 
 class Settlement(ComponentHolder, WorldObject, ChangeListener, ResourceHandler):
@@ -68,12 +71,15 @@ class Settlement(ComponentHolder, WorldObject, ChangeListener, ResourceHandler):
 		self.session = session
 		self.owner = owner
 		self.buildings = []
+		self.buildings_checkup_hash = CheckupHash() # of self.buildings, see World.get_checkup_hash
 		self.ground_map = {} # this is the same as in island.py. it uses hard references to the tiles too
 		self.produced_res = defaultdict(int) # dictionary of all resources, produced at this settlement
 		self.buildings_by_id = defaultdict(list)
 		self.warehouse = None # this is set later in the same tick by the warehouse itself or load() here
 		self.upgrade_permissions = upgrade_permissions
 		self.tax_settings = tax_settings
+		self.settler_economy = SettlerEconomy(self)
+		self.job_board = JobBoard(self)
 		Scheduler().add_new_object(self.__init_inventory_checker, self)
 
 	def init_buildability_cache(self, terrain_cache):
@@ -159,6 +165,8 @@ class Settlement(ComponentHolder, WorldObject, ChangeListener, ResourceHandler):
 		data = json.dumps(list(self.ground_map.keys()))
 		db("INSERT INTO settlement_tiles(rowid, data) VALUES(?, ?)", self.worldid, data)
 
+		self.job_board.save(db)
+
 	@classmethod
 	def load(cls, db, worldid, session, island):
 		self = cls.__new__(cls)
@@ -188,6 +196,7 @@ class Settlement(ComponentHolder, WorldObject, ChangeListener, ResourceHandler):
 			building = load_building(session, db, building_type, building_id)
 			if building_type == BUILDINGS.WAREHOUSE:
 				self.warehouse = building
+		self.job_board.load(db)
 
 		for res, amount in db("SELECT res, amount FROM settlement_produced_res WHERE settlement = ?", worldid):
 			self.produced_res[res] = amount
@@ -212,6 +221,7 @@ class Settlement(ComponentHolder, WorldObject, ChangeListener, ResourceHandler):
 		@see Island.add_building
 		"""
 		self.buildings.append(building)
+		self.buildings_checkup_hash.add((building.worldid, building.id))
 		if building.id in self.buildings_by_id:
 			self.buildings_by_id[building.id].append(building)
 		else:
@@ -232,6 +242,7 @@ class Settlement(ComponentHolder, WorldObject, ChangeListener, ResourceHandler):
 			self.log.debug("Building %s can not be removed from settlement", building.id)
 			return
 		self.buildings.remove(building)
+		self.buildings_checkup_hash.remove((building.worldid, building.id))
 		self.buildings_by_id[building.id].remove(building)
 		component = building.get_component(Producer)
 		if component and component.produces_resource:
@@ -258,6 +269,10 @@ class Settlement(ComponentHolder, WorldObject, ChangeListener, ResourceHandler):
 		self.__inventory_checker = InventoryChecker(SettlementInventoryUpdated, storage, 4)
 
 	def end(self):
+		self.settler_economy.end()
+		self.settler_economy = None
+		self.job_board.end()
+		self.job_board = None
 		self.buildability_cache = None
 		self.session = None
 		self.owner = None
@@ -0,0 +1,97 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from horizons.scheduler import Scheduler
+from horizons.util.python.callback import Callback
+
+
+class SettlerEconomy(object):
+	"""Runs the monthly ticks (taxes, inhabitants, level changes) of the settlers of a settlement.
+
+	Settlers whose ticks would be next to each other in the schedule share one scheduler call,
+	so there is usually only one call for all settlers that are due at the same tick. Every
+	settler is still ticked at exactly the same position in the schedule as with a call of its
+	own. Settlers that are due at different ticks can't share a call without changing the
+	results of the game.
+
+	Every settler still pays its taxes on its own, since productions that use gold listen to
+	the inventory of the owner and have to see the same amounts as before.
+
+	When the scheduler is profiled, the tick of every settler is recorded as a 'Settler.tick'
+	call of its settler (see SchedulerProfiler.run_part), like it was before the ticks have
+	been batched. The SettlerEconomy._tick entries only contain the time spent on the batching.
+	"""
+
+	def __init__(self, settlement):
+		self.settlement = settlement
+		self._batches = {} # {tick: (CallbackObject, [settler, ...])} of the last call of a tick
+		self._batches_by_settler = {} # {settler: (tick, list of settlers of its call)}
+
+	def add(self, settler, run_in):
+		"""Ticks the settler every month, starting in run_in ticks."""
+		self._add(settler, Scheduler().cur_tick + run_in)
+
+	def _add(self, settler, tick):
+		batch = self._batches.get(tick)
+		if batch is None or not Scheduler().is_last_call(batch[0]):
+			settlers = []
+			callback_obj = Scheduler().add_new_object(Callback(self._tick, settlers), self,
+			                                          run_in=tick - Scheduler().cur_tick)
+			batch = self._batches[tick] = (callback_obj, settlers)
+		batch[1].append(settler)
+		self._batches_by_settler[settler] = (tick, batch[1])
+
+	def remove(self, settler):
+		batch = self._batches_by_settler.pop(settler, None)
+		if batch is not None:
+			batch[1].remove(settler)
+
+	def get_remaining_ticks(self, settler):
+		"""Returns in how many ticks the settler is ticked the next time."""
+		return self._batches_by_settler[settler][0] - Scheduler().cur_tick
+
+	def _tick(self, settlers):
+		cur_tick = Scheduler().cur_tick
+		self._batches.pop(cur_tick, None)
+		next_tick = cur_tick + Scheduler().get_ticks_of_month()
+		profiler = Scheduler().profiler
+		for settler in settlers[:]: # settlers can be removed by the ticks of others
+			if self._batches_by_settler.get(settler, (None, None))[1] is not settlers:
+				continue
+			if profiler is None:
+				settler.tick()
+			else:
+				profiler.run_part(settler.tick, settler)
+			if self._batches_by_settler.get(settler, (None, None))[1] is settlers:
+				self._add(settler, next_tick)
+
+	def get_num_calls(self):
+		"""Returns the number of scheduler calls for the settlers, see get_num_settlers."""
+		return len(set(id(settlers) for tick, settlers in self._batches_by_settler.values()))
+
+	def get_num_settlers(self):
+		return len(self._batches_by_settler)
+
+	def end(self):
+		Scheduler().rem_all_classinst_calls(self)
+		self.settlement = None
+		self._batches = None
+		self._batches_by_settler = None
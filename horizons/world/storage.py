@@ -44,6 +44,7 @@ import sys
 from collections import defaultdict
 
 from horizons.util.changelistener import ChangeListener
+from horizons.util.checkuphash import CheckupHash
 
 
 class GenericStorage(ChangeListener):
@@ -55,6 +56,7 @@ class GenericStorage(ChangeListener):
 	def __init__(self):
 		super(GenericStorage, self).__init__()
 		self._storage = defaultdict(int)
+		self.checkup_hash = CheckupHash() # of the contents, see World.get_checkup_hash
 
 	def save(self, db, ownerid):
 		for slot in self._storage.items():
@@ -74,20 +76,34 @@ class GenericStorage(ChangeListener):
 		@param amount: int amount that is to be changed. Can be negative to remove resources.
 		@return: int - amount that did not fit or was not available, depending on context.
 		"""
-		self._storage[res] += amount # defaultdict
+		old_amount = self._storage[res] # defaultdict
+		self._storage[res] = old_amount + amount
+		self._update_checkup_hash(res, old_amount)
 		self._changed()
 		return 0
 
+	def _update_checkup_hash(self, res, old_amount):
+		"""Has to be called after the amount of res has been changed.
+		Empty slots aren't part of the hash, they may or may not exist."""
+		new_amount = self._storage.get(res, 0)
+		if old_amount:
+			self.checkup_hash.remove((res, old_amount))
+		if new_amount:
+			self.checkup_hash.add((res, new_amount))
+
 	def reset(self, res):
 		"""Resets a resource slot to zero, removing all its contents."""
 		if res in self._storage:
+			old_amount = self._storage[res]
 			self._storage[res] = 0
+			self._update_checkup_hash(res, old_amount)
 			self._changed()
 
 	def reset_all(self):
 		"""Removes every resource from this inventory"""
 		for res in self._storage:
 			self._storage[res] = 0
+		self.checkup_hash = CheckupHash()
 		self._changed()
 
 	def get_limit(self, res=None):
@@ -210,6 +226,7 @@ class GlobalLimitStorage(GenericStorage):
 		for res, amount in self._storage.items():
 			if amount > self.limit:
 				self._storage[res] = self.limit
+				self._update_checkup_hash(res, amount)
 		self._changed()
 
 	def get_limit(self, res=None):
@@ -102,10 +102,18 @@ class AnimalCollector(BuildingCollector):
 	def get_buildings_in_range(self, reslist=None):
 		return self.get_animals_in_range(reslist)
 
+	def get_job_board(self):
+		# animals don't post to job boards
+		return None
+
+	def get_provider_handler(self):
+		# the animals of the home building aren't providers
+		return None
+
 	def get_animals_in_range(self, reslist=None):
 		return self.home_building.animals
 
-	def check_possible_job_target_for(self, target, res):
+	def check_possible_job_target_for(self, target, res, reserved_amounts=None):
 		# An animal can only be collected by one collector.
 		# Since a collector only retrieves one type of res, and
 		# an animal might produce more than one, two collectors
@@ -121,7 +129,7 @@ class AnimalCollector(BuildingCollector):
 		if target.has_collectors():
 			return None
 		else:
-			return super(AnimalCollector, self).check_possible_job_target_for(target, res)
+			return super(AnimalCollector, self).check_possible_job_target_for(target, res, reserved_amounts)
 
 	def stop_animal(self):
 		"""Tell animal to stop at the next occasion"""
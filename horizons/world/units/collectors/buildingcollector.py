@@ -61,6 +61,8 @@ class BuildingCollector(Collector):
 		# save whether it's possible for this instance to access a target
 		# @chachedmethod is not applicable since it stores hard refs in the arguments
 		self._target_possible_cache = weakref.WeakKeyDictionary()
+		# where get_job could collect when it didn't find a job, for waiting at the job board
+		self._job_targets = None
 
 	def save(self, db):
 		super(BuildingCollector, self).save(db)
@@ -151,33 +153,86 @@ class BuildingCollector(Collector):
 		collectable_res = self.get_collectable_res()
 		if not collectable_res:
 			return None
+		collectable_res_set = set(collectable_res)
 
+		reserved_amounts = self.get_colleague_reserved_amounts()
 		jobs = JobList(self, self.job_ordering)
-		# iterate all building that provide one of the resources
-		for building in self.get_buildings_in_range(reslist=collectable_res):
-			# check if we can pickup here on principle
-			target_possible = self._target_possible_cache.get(building, None)
-			if target_possible is None: # not in cache, we have to check
-				target_possible = self.check_possible_job_target(building)
-				self._target_possible_cache[building] = target_possible
-
-			if target_possible:
-				# check for res here
-				reslist = ( self.check_possible_job_target_for(building, res) for res in collectable_res )
-				reslist = [i for i in reslist if i]
-
-				if reslist: # we can do something here
-					jobs.append( Job(building, reslist) )
-
-		# TODO: find out why order of  self.get_buildings_in_range(..) and therefore order of jobs differs from client to client
-		# TODO: find out why WildAnimal.get_job(..) doesn't have this problem
-		# for MP-Games the jobs must have the same ordering to ensure get_best_possible_job(..) returns the same result
-		jobs.sort(key=lambda job: job.object.worldid)
-
-		return self.get_best_possible_job(jobs)
+		targets = []
+		# the providers are ordered by worldid, so jobs with the same rank are always
+		# in the same order and get_best_possible_job returns the same on all clients
+		for building in self.get_possible_providers():
+			provided_resources = building.provided_resources
+			if collectable_res_set.isdisjoint(provided_resources):
+				continue
+			targets.append(building)
+			# check for res here
+			reslist = ( self.check_possible_job_target_for(building, res, reserved_amounts)
+			            for res in collectable_res if res in provided_resources )
+			reslist = [i for i in reslist if i]
+
+			if reslist: # we can do something here
+				jobs.append( Job(building, reslist) )
+
+		job = self.get_best_possible_job(jobs)
+		if job is None:
+			self._job_targets = targets
+			self._job_targets_unreachable = bool(jobs)
+		return job
+
+	def get_possible_providers(self):
+		"""Returns the buildings in range that we could collect from, ordered by worldid.
+		The list is cached at the home building for all collectors of our class until
+		providers are added or removed. Don't alter it."""
+		provider_handler = self.get_provider_handler()
+		if provider_handler is None: # can't tell when the buildings in range change
+			return sorted((building for building in self.get_buildings_in_range() if self._is_target_possible(building)),
+			              key=lambda building: building.worldid)
+
+		provider_cache = self.home_building.get_component(CollectingComponent).provider_cache
+		key = (provider_handler.version, self.home_building.radius)
+		cached = provider_cache.get(self.__class__)
+		if cached is None or cached[0] != key:
+			providers = [building for building in self.get_buildings_in_range() if self._is_target_possible(building)]
+			providers.sort(key=lambda building: building.worldid)
+			cached = provider_cache[self.__class__] = (key, providers)
+		return cached[1]
+
+	def get_provider_handler(self):
+		"""Returns the ProviderHandler that get_buildings_in_range looks at, or None if it
+		doesn't use one."""
+		return self.home_building.island.provider_buildings
+
+	def _is_target_possible(self, building):
+		"""Cached version of check_possible_job_target"""
+		target_possible = self._target_possible_cache.get(building, None)
+		if target_possible is None: # not in cache, we have to check
+			target_possible = self.check_possible_job_target(building)
+			self._target_possible_cache[building] = target_possible
+		return target_possible
+
+	def get_job_board(self):
+		if self.home_building is None or self.home_building.settlement is None:
+			return None
+		return self.home_building.settlement.job_board
+
+	def get_possible_job_targets(self, resources):
+		"""Returns the buildings where get_job could find a job for one of the resources."""
+		if self._job_targets is not None:
+			# get_job has just found them, they are only used once
+			targets, self._job_targets = self._job_targets, None
+			return targets
+		return [building for building in self.get_possible_providers()
+		        if not resources.isdisjoint(building.provided_resources)]
+
+	def is_possible_job_target(self, building):
+		"""Returns whether get_job considers the building, not looking at its resources."""
+		return building.owner == self.owner and \
+		       building.position.distance(self.home_building.position) <= self.home_building.radius and \
+		       self._is_target_possible(building)
 
 	def search_job(self):
 		self._clean_job_history_log()
+		self._job_targets = None
 		super(BuildingCollector, self).search_job()
 
 
@@ -363,6 +418,10 @@ class FisherShipCollector(BuildingCollector):
 
 		return smallest_fisher
 
+	def get_job_board(self):
+		# fish deposits don't belong to a settlement
+		return None
+
 	def get_buildings_in_range(self, reslist=None):
 		"""Returns all buildings in range .
 		Overwrite in subclasses that need ranges around the pickup.
@@ -370,6 +429,9 @@ class FisherShipCollector(BuildingCollector):
 		reach = RadiusRect(self.home_building.position, self.home_building.radius)
 		return self.session.world.get_providers_in_range(reach, reslist=reslist)
 
+	def get_provider_handler(self):
+		return self.session.world.provider_buildings
+
 
 class DisasterRecoveryCollector(StorageCollector):
 	"""Collects disasters such as fire or pestilence."""
@@ -23,7 +23,7 @@
 
 import logging
 import operator
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 
 from horizons.component.ambientsoundcomponent import AmbientSoundComponent
 from horizons.component.restrictedpickup import RestrictedPickup
@@ -35,6 +35,7 @@ from horizons.util.pathfinding import PathBlockedError
 from horizons.util.python import decorators
 from horizons.util.python.callback import Callback
 from horizons.util.worldobject import WorldObject
+from horizons.world.jobboard import JobBoard
 from horizons.world.units.unit import Unit
 
 
@@ -44,7 +45,7 @@ class Collector(Unit):
 	Timeline:
 	 * search_job
 	 * * get_job
-	 * * handle_no_possible_job
+	 * * handle_no_possible_job (wait at the job board or retry later)
 	 * * begin_current_job
 	 * * * setup_new_job
 	 * * * move to target
@@ -96,10 +97,14 @@ class Collector(Unit):
 			self.hide()
 
 		self.job = None # here we store the current job as Job object
+		self._job_board = None # the JobBoard we are waiting at
+		self._idle_since = None # tick since which we haven't found a job, if we wait at a job board
+		self._job_targets_unreachable = False # whether get_job found jobs, but no path to them
 
 	def remove(self):
 		"""Removes the instance. Useful when the home building is destroyed"""
 		self.log.debug("%s: remove called", self)
+		self._leave_job_board()
 		self.cancel(continue_action=lambda : 42)
 		# remove from target collector list
 		self._abort_collector_job()
@@ -116,7 +121,12 @@ class Collector(Unit):
 			# when loading a game fails and the world is destructed again, the
 			# worldid may not yet have been resolved to an actual in-game object
 			return
-		self.job.object.remove_incoming_collector(self)
+		target = self.job.object
+		target.remove_incoming_collector(self)
+		# the resources we would have picked up are available for others again
+		settlement = getattr(target, 'settlement', None) # animals have no settlement
+		if settlement is not None and settlement.job_board is not None:
+			settlement.job_board.post(target)
 
 	# SAVE/LOAD
 
@@ -140,6 +150,11 @@ class Collector(Unit):
 		db("INSERT INTO collector(rowid, state, remaining_ticks, start_hidden) VALUES(?, ?, ?, ?)",
 		   self.worldid, self.state.index, remaining_ticks, self.start_hidden)
 
+		db("INSERT INTO collector_job_board(rowid, idle_since, waiting) VALUES(?, ?, ?)",
+		   self.worldid, self._idle_since, self._job_board is not None)
+		if self._job_board is not None:
+			self._job_board.save_collector(db, self)
+
 		# save the job
 		if self.job is not None:
 			obj_id = -1 if self.job.object is None else self.job.object.worldid
@@ -168,6 +183,14 @@ class Collector(Unit):
 			# which might not have been loaded
 			self.job = Job(obj, reslist)
 
+		# (idle since, resources, target worldids) at the job board, resources is None if not waiting
+		job_board_state = None # savegames from before job boards don't contain it
+		job_board_db = db("SELECT idle_since, waiting FROM collector_job_board WHERE rowid = ?", worldid)
+		if job_board_db:
+			idle_since, waiting = job_board_db[0]
+			resources, targets = JobBoard.load_collector(db, worldid) if waiting else (None, [])
+			job_board_state = (idle_since, resources, targets)
+
 		def fix_job_object():
 			# resolve worldid to object later
 			if self.job:
@@ -180,18 +203,28 @@ class Collector(Unit):
 		Scheduler().add_new_object(
 		  Callback.ChainedCallbacks(
 		    fix_job_object,
-		    Callback(self.apply_state, self.state, remaining_ticks)),
+		    Callback(self.apply_state, self.state, remaining_ticks, job_board_state)),
 		    self, run_in=0
 		)
 
-	def apply_state(self, state, remaining_ticks=None):
+	def apply_state(self, state, remaining_ticks=None, job_board_state=None):
 		"""Takes actions to set collector to a state. Useful after loading.
 		@param state: EnumValue from states
 		@param remaining_ticks: ticks after which current state is finished
+		@param job_board_state: (idle since, resources, target worldids) as saved, see load
 		"""
+		if job_board_state is not None:
+			self._idle_since = job_board_state[0]
 		if state == self.states.idle:
 			# we do nothing, so schedule a new search for a job
 			Scheduler().add_new_object(self.search_job, self, remaining_ticks)
+			job_board = self.get_job_board()
+			if job_board is not None and job_board_state is None: # savegame from before job boards
+				self._wait_at_job_board(job_board)
+			elif job_board is not None and job_board_state[1] is not None:
+				self._job_board = job_board
+				targets = [WorldObject.get_object_by_id(target) for target in job_board_state[2]]
+				job_board.add_waiting_collector(self, job_board_state[1], self._idle_since, targets)
 		elif state == self.states.moving_to_target:
 			# we are on the way to target, so save the job
 			self.setup_new_job()
@@ -227,21 +260,56 @@ class Collector(Unit):
 		"""Returns the next job or None"""
 		raise NotImplementedError
 
+	def get_job_board(self):
+		"""Returns the JobBoard that announces new jobs to this collector,
+		or None if the collector has to search for jobs regularly."""
+		return None
+
 
 	# BEHAVIOR
 	def search_job(self):
 		"""Search for a job, only called if the collector does not have a job.
 		If no job is found, a new search will be scheduled in a few ticks."""
+		self._leave_job_board()
+		self._job_targets_unreachable = False
 		self.job = self.get_job()
 		if self.job is None:
 			self.handle_no_possible_job()
 		else:
+			self._idle_since = None
 			self.begin_current_job()
 
 	def handle_no_possible_job(self):
-		"""Called when we can't find a job. default is to wait and try again in a few secs"""
-		self.log.debug("%s: found no possible job, retry in %s ticks", self, COLLECTORS.DEFAULT_WAIT_TICKS)
-		Scheduler().add_new_object(self.search_job, self, COLLECTORS.DEFAULT_WAIT_TICKS)
+		"""Called when we can't find a job. default is to wait and try again in a few secs.
+		Collectors with a job board wait there until it announces a new job instead, and only
+		try again after a long time (e.g. a new road might have made a target reachable)."""
+		job_board = self.get_job_board()
+		if job_board is None:
+			wait_ticks = COLLECTORS.DEFAULT_WAIT_TICKS
+		else:
+			wait_ticks = COLLECTORS.JOB_BOARD_WAIT_TICKS
+			if not self._job_targets_unreachable: # else new resources there wouldn't help
+				self._wait_at_job_board(job_board)
+		self.log.debug("%s: found no possible job, retry in %s ticks", self, wait_ticks)
+		Scheduler().add_new_object(self.search_job, self, wait_ticks)
+
+	def _wait_at_job_board(self, job_board):
+		if self._idle_since is None:
+			self._idle_since = Scheduler().cur_tick
+		self._job_board = job_board
+		job_board.add_waiting_collector(self, self.get_job_board_resources(), self._idle_since)
+
+	def _leave_job_board(self):
+		if self._job_board is not None:
+			self._job_board.remove_waiting_collector(self)
+			self._job_board = None
+
+	def notify_job_available(self):
+		"""Called by the job board, when there might be a job for us now.
+		We have already been removed from the board."""
+		self._job_board = None
+		Scheduler().rem_call(self, self.search_job)
+		self.search_job()
 
 	def setup_new_job(self):
 		"""Executes the necessary actions to begin a new job"""
@@ -263,11 +331,12 @@ class Collector(Unit):
 
 		return True
 
-	def check_possible_job_target_for(self, target, res):
+	def check_possible_job_target_for(self, target, res, reserved_amounts=None):
 		"""Checks out if we could get res from target.
 		Does _not_ check for anything else (e.g. if we are able to walk there).
 		@param target: possible target. buildings are supported, support for more can be added.
 		@param res: resource id
+		@param reserved_amounts: optional result of get_colleague_reserved_amounts(), if it is already known
 		@return: instance of Job or None, if we can't collect anything
 		"""
 		res_amount = target.get_available_pickup_amount(res, self)
@@ -275,20 +344,8 @@ class Collector(Unit):
 			#self.log.debug("nojob: no pickup amount")
 			return None
 
-		# check if other collectors get this resource, because our inventory could
-		# get full if they arrive.
-		total_registered_amount_consumer = sum(
-		  entry.amount for
-		  collector in self.get_colleague_collectors() if
-		  collector.job is not None for
-		  entry in collector.job.reslist if
-		  entry.res == res )
-
-		inventory = self.get_home_inventory()
-
 		# check if there are resources left to pickup
-		home_inventory_free_space = inventory.get_free_space_for(res) \
-		                            - total_registered_amount_consumer
+		home_inventory_free_space = self.get_home_inventory_free_space(res, reserved_amounts)
 		if home_inventory_free_space <= 0:
 			#self.log.debug("nojob: no home inventory space")
 			return None
@@ -306,6 +363,30 @@ class Collector(Unit):
 		# create a new data line.
 		return Job.ResListEntry(res, possible_res_amount, target_inventory_full)
 
+	def get_home_inventory_free_space(self, res, reserved_amounts=None):
+		"""Returns how much of res fits into the home inventory, after the resources
+		our colleagues are getting have arrived.
+		@param reserved_amounts: optional result of get_colleague_reserved_amounts(), if it is already known"""
+		if reserved_amounts is None:
+			reserved_amounts = self.get_colleague_reserved_amounts()
+		return self.get_home_inventory().get_free_space_for(res) - reserved_amounts[res]
+
+	def get_colleague_reserved_amounts(self):
+		"""Returns how much of each resource the other collectors of our home are getting,
+		because our inventory could get full if they arrive.
+		@return: defaultdict {res: amount}"""
+		reserved_amounts = defaultdict(int)
+		for collector in self.get_colleague_collectors():
+			if collector.job is not None:
+				for entry in collector.job.reslist:
+					reserved_amounts[entry.res] += entry.amount
+		return reserved_amounts
+
+	def get_job_board_resources(self):
+		"""Returns the collectable resources that still fit into the home inventory.
+		These are the resources we wait for at the job board."""
+		return [res for res in self.get_collectable_res() if self.get_home_inventory_free_space(res) > 0]
+
 	def get_best_possible_job(self, jobs):
 		"""Return best possible job from jobs.
 		"Best" means that the job is highest when the job list was sorted.
@@ -99,6 +99,10 @@ class MovingObject(ComponentHolder, ConcreteObject):
 		"""Returns whether unit is currently moving"""
 		return self.__is_moving
 
+	def _get_spatial_index(self):
+		"""Returns the SpatialIndex that keeps track of the position of this unit, if any"""
+		return None
+
 	def stop(self, callback=None):
 		"""Stops a unit with currently no possibility to continue the movement.
 		The unit actually stops moving when current move (to the next coord) is finished.
@@ -176,6 +180,9 @@ class MovingObject(ComponentHolder, ConcreteObject):
 			#self.log.debug("%s move tick from %s to %s", self, self.last_position, self._next_target)
 			self.last_position = self.position
 			self.position = self._next_target
+			spatial_index = self._get_spatial_index()
+			if spatial_index is not None:
+				spatial_index.move(self, self.position.to_tuple())
 			self._changed()
 
 		# try to get next step, handle a blocked path
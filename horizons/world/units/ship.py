@@ -70,6 +70,8 @@ class Ship(Unit):
 	def __init(self):
 		# register ship in world
 		self.session.world.ships.append(self)
+		self.session.world.ship_index.add(self, self.position.to_tuple())
+		self.session.world.ships_checkup_hash.add(self._get_checkup_hash_entry())
 		if self.in_ship_map:
 			self.session.world.ship_map[self.position.to_tuple()] = weakref.ref(self)
 
@@ -78,6 +80,8 @@ class Ship(Unit):
 
 	def remove(self):
 		self.session.world.ships.remove(self)
+		self.session.world.ship_index.remove(self)
+		self.session.world.ships_checkup_hash.remove(self._get_checkup_hash_entry())
 		self.session.view.discard_change_listener(self.draw_health)
 		if self.in_ship_map:
 			if self.position.to_tuple() in self.session.world.ship_map:
@@ -95,8 +99,15 @@ class Ship(Unit):
 	def create_route(self):
 		self.route = TradeRoute(self)
 
+	def _get_spatial_index(self):
+		return self.session.world.ship_index
+
+	def _get_checkup_hash_entry(self):
+		return (self.worldid, self.owner.worldid) + self.position.to_tuple()
+
 	def _move_tick(self, resume=False):
 		"""Keeps track of the ship's position in the global ship_map"""
+		old_checkup_hash_entry = self._get_checkup_hash_entry()
 
 		# TODO: Originally, only self.in_ship_map should suffice here,
 		# but KeyError is raised during combat.
@@ -116,6 +127,9 @@ class Ship(Unit):
 					self.session.world.ship_map[self.position.to_tuple()] = weakref.ref(self)
 				raise
 
+		self.session.world.ships_checkup_hash.replace(old_checkup_hash_entry,
+		                                              self._get_checkup_hash_entry())
+
 		if self.in_ship_map:
 			# save current and next position for ship, since it will be between them
 			self.session.world.ship_map[self.position.to_tuple()] = weakref.ref(self)
@@ -32,7 +32,7 @@ import horizons.world	# needs to be imported before session
 from horizons.extscheduler import ExtScheduler
 from horizons.scheduler import Scheduler
 from horizons.spsession import SPSession
-from horizons.util.dbreader import DbReader
+from horizons.util.dbreader import BatchedDbWriter, DbReader
 from horizons.util.difficultysettings import DifficultySettings
 from horizons.util.savegameaccessor import SavegameAccessor
 from horizons.util.startgameoptions import StartGameOptions
@@ -79,10 +79,13 @@ def _dbreader_convert_dummy_objects():
 			return func(self, command, *args)
 		return wrapper
 
-	original = DbReader.__call__
-	DbReader.__call__ = deco(DbReader.__call__)
+	# BatchedDbWriter only calls DbReader.__call__ for commands that aren't buffered
+	originals = [(cls, cls.__dict__['__call__']) for cls in (DbReader, BatchedDbWriter)]
+	for cls, original in originals:
+		cls.__call__ = deco(original)
 	yield
-	DbReader.__call__ = original
+	for cls, original in originals:
+		cls.__call__ = original
 
 
 class SPTestSession(SPSession):
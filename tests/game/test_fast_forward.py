@@ -0,0 +1,72 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import json
+import os
+import tempfile
+
+import mock
+
+import horizons.globals
+from horizons.extscheduler import ExtScheduler
+from horizons.fastforwardsession import FastForwardSession
+from horizons.scheduler import Scheduler
+from horizons.util.color import Color
+from horizons.util.difficultysettings import DifficultySettings
+from horizons.util.startgameoptions import StartGameOptions
+from tests.dummy import Dummy
+from tests.game import _dbreader_convert_dummy_objects, create_map, game_test, load_session
+
+
+@game_test(manual_session=True)
+def test_fast_forward_saves_after_game_minutes():
+	fd, savegame = tempfile.mkstemp(suffix='.sqlite')
+	os.close(fd)
+	stats_file = os.path.splitext(savegame)[0] + '.json'
+
+	ExtScheduler.create_instance(mock.Mock())
+	with mock.patch('horizons.session.View', Dummy):
+		session = FastForwardSession(horizons.globals.db, game_minutes=0.5, savegame=savegame)
+	players = [{'id': 1, 'name': 'foobar', 'color': Color.get(1), 'local': True, 'ai': False,
+	            'difficulty': DifficultySettings.DEFAULT_LEVEL}]
+	options = StartGameOptions.create_game_test(create_map(), players)
+	options.is_map = True
+
+	with mock.patch('horizons.main.quit') as quit, \
+	     mock.patch('horizons.session.SavegameManager._write_screenshot'), \
+	     _dbreader_convert_dummy_objects():
+		session.load(options)
+		# every frame runs as many ticks as fit into the frame time
+		while not quit.called:
+			session.timer.check_tick()
+
+	ticks = session.timer.get_ticks(30)
+	assert Scheduler().cur_tick == Scheduler.FIRST_TICK_ID + ticks - 1
+	with open(stats_file) as f:
+		stats = json.load(f)
+	assert stats['ticks'] == ticks
+	assert stats['saved']
+	session.end()
+
+	session = load_session(savegame)
+	session.run(seconds=1)
+	session.end()
+	os.remove(stats_file)
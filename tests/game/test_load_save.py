@@ -23,17 +23,24 @@ import bz2
 import os
 import tempfile
 
+import mock
+
 from horizons.command.building import Build
 from horizons.command.production import ToggleActive
 from horizons.command.unit import CreateUnit
 from horizons.component.collectingcomponent import CollectingComponent
 from horizons.component.storagecomponent import StorageComponent
 from horizons.constants import BUILDINGS, GAME, PRODUCTION, RES, TIER, UNITS
+from horizons.util import savegamecompression
+from horizons.util.dbreader import DbReader
+from horizons.util.savegameaccessor import SavegameAccessor
 from horizons.util.shapes import Point
 from horizons.util.worldobject import WorldObject
 from horizons.world.production.producer import Producer
 from horizons.world.units.collectors import Collector
-from tests.game import TEST_FIXTURES_DIR, game_test, load_session, new_session, saveload, settle
+from tests.game import (
+	TEST_FIXTURES_DIR, _dbreader_convert_dummy_objects, game_test, load_session, new_session, saveload,
+	settle)
 
 
 @game_test(manual_session=True)
@@ -258,3 +265,108 @@ def test_settler_level_save_load(s, p):
 
 		# should have leveled up
 		assert settler.level == level + 1
+
+
+@game_test(manual_session=True)
+def test_checkup_hash_after_load():
+	"""The incrementally maintained checkup hash is the same after loading"""
+	session, player = new_session()
+	settlement, island = settle(session)
+	Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(player)
+	ship = CreateUnit(player.worldid, UNITS.PLAYER_SHIP, 10, 10)(player)
+	ship.move(Point(20, 15))
+	session.run(seconds=5)
+
+	def get_hash(session):
+		checkup_hash = session.world.get_checkup_hash()
+		del checkup_hash['rngvalue']
+		return checkup_hash
+
+	expected = get_hash(session)
+	session = saveload(session)
+	assert get_hash(session) == expected
+
+	session.end()
+
+
+def _get_savegame_content(path):
+	"""Returns {table: rows including the rowid} of a savegame, without the timestamp."""
+	db = DbReader(path)
+	content = {}
+	for (table, ) in db("SELECT name FROM sqlite_master WHERE type = 'table'"):
+		content[table] = db('SELECT rowid, * FROM "{}" ORDER BY rowid'.format(table))
+	db.close()
+	content['metadata'] = [row for row in content['metadata'] if row[1] != 'timestamp']
+	return content
+
+
+@game_test(manual_session=True)
+def test_background_save():
+	"""Saving in the background writes the same savegame as saving directly."""
+	session, player = new_session()
+	settlement, island = settle(session)
+	Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(player)
+	session.run(seconds=1)
+
+	fd, sync_savegame = tempfile.mkstemp()
+	os.close(fd)
+	fd, background_savegame = tempfile.mkstemp()
+	os.close(fd)
+	assert session.save(savegamename=sync_savegame)
+	session.savecounter -= 1
+
+	callback = mock.Mock()
+	with mock.patch('horizons.session.SavegameManager._write_screenshot'), \
+	     _dbreader_convert_dummy_objects():
+		assert session._do_save_in_background(background_savegame, callback)
+		# only one save at a time
+		assert not session._do_save_in_background(background_savegame + '2')
+	session.wait_for_background_save()
+	callback.assert_called_once_with(True)
+
+	assert _get_savegame_content(background_savegame) == _get_savegame_content(sync_savegame)
+	session.end()
+	os.remove(sync_savegame)
+
+	session = load_session(background_savegame)
+	session.run(seconds=1)
+	session.end()
+
+
+@game_test(manual_session=True)
+def test_savegame_accessor_loads_tables_on_demand():
+	session, player = new_session()
+	settlement, island = settle(session)
+	lj = Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(player)
+	fd, savegame = tempfile.mkstemp()
+	os.close(fd)
+	assert session.save(savegamename=savegame)
+	session.end()
+
+	db = SavegameAccessor(savegame, False)
+	assert db.load_report == []
+	assert db.get_building_row(lj.worldid)[:2] == (30, 30)
+	db.get_production_lines_by_owner(lj.worldid)
+	db.get_production_state_history(lj.worldid, 0)
+	assert [loader for loader, seconds, memory in db.load_report] == ['_load_building', '_load_production']
+	assert db("SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'collector_job_collector'")
+	db.close()
+	os.remove(savegame)
+
+
+@game_test(manual_session=True)
+def test_compressed_savegame():
+	session, player = new_session()
+	settlement, island = settle(session)
+	lj = Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(player)
+	fd, savegame = tempfile.mkstemp()
+	os.close(fd)
+	with mock.patch.object(GAME, 'SAVEGAME_COMPRESSION_LEVEL', 1):
+		assert session.save(savegamename=savegame)
+	session.end()
+
+	assert savegamecompression.is_compressed(savegame)
+	session = load_session(savegame)
+	assert WorldObject.get_object_by_id(lj.worldid).position.origin.to_tuple() == (30, 30)
+	session.run(seconds=1)
+	session.end()
@@ -19,7 +19,8 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
-from horizons.command.building import Build
+from horizons.command.building import Build, Tear
+from horizons.component.collectingcomponent import CollectingComponent
 from horizons.component.storagecomponent import StorageComponent
 from horizons.constants import BUILDINGS, PRODUCTION, PRODUCTIONLINES, RES
 from horizons.world.production.producer import Producer
@@ -101,3 +102,20 @@ def test_basic_wood_production(session, player):
 	# Empty inventory, wait again
 	storage.inventory.alter(RES.BOARDS, -storage.inventory.get_limit(RES.BOARDS))
 	assert producer._get_current_state() == PRODUCTION.STATES.waiting_for_res
+
+
+@game_test()
+def test_collector_providers_follow_buildings(session, player):
+	"""The cached providers of a collector change when buildings are built or torn."""
+	settlement, island = settle(session)
+
+	lj = Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(player)
+	collector = lj.get_component(CollectingComponent).get_local_collectors()[0]
+	assert collector.get_possible_providers() == []
+
+	tree1 = Build(BUILDINGS.TREE, 33, 30, island, settlement=settlement)(player)
+	tree2 = Build(BUILDINGS.TREE, 27, 30, island, settlement=settlement)(player)
+	assert collector.get_possible_providers() == [tree1, tree2]
+
+	Tear(tree1)(player)
+	assert collector.get_possible_providers() == [tree2]
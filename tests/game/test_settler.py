@@ -19,10 +19,13 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
-from horizons.command.building import Build
+import mock
+
+from horizons.command.building import Build, Tear
 from horizons.command.uioptions import SetSettlementUpgradePermissions
 from horizons.component.storagecomponent import StorageComponent
 from horizons.constants import BUILDINGS, GAME, RES, TIER
+from horizons.scheduler import Scheduler
 from tests.game import game_test, settle
 
 
@@ -93,3 +96,27 @@ def test_deny_upgrade_permissions_special(s, p):
 	# Make sure forbidding upgrades works
 	SetSettlementUpgradePermissions(settlement, TIER.SAILORS, False).execute(s)
 	assert settler.level == TIER.SAILORS
+
+
+@game_test()
+def test_settler_economy(s, p):
+	"""
+	The settler economy ticks the settlers every month, they pay their taxes to the owner.
+	"""
+	settlement, island = settle(s)
+	economy = settlement.settler_economy
+	settlers = [Build(BUILDINGS.RESIDENTIAL, x, 22, island, settlement=settlement)(p) for x in (22, 25, 28)]
+	Tear(settlers.pop(1))(p)
+	assert all(economy.get_remaining_ticks(settler) == Scheduler().get_ticks_of_month() for settler in settlers)
+
+	inventory = p.get_component(StorageComponent).inventory
+	for i in range(2):
+		with mock.patch.object(inventory, 'alter', wraps=inventory.alter) as alter:
+			s.run(seconds=GAME.INGAME_TICK_INTERVAL)
+
+		taxes = sum(settler.last_tax_payed for settler in settlers)
+		assert taxes > 0
+		payments = [call[0][1] for call in alter.call_args_list if call[0][0] == RES.GOLD and call[0][1] > 0]
+		# every settler pays on its own, like without the economy
+		assert sorted(payments) == sorted(settler.last_tax_payed for settler in settlers)
+		assert len(Scheduler().get_classinst_calls(economy)) <= len(settlers)
@@ -19,11 +19,15 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import random
+from collections import deque
 from unittest import TestCase
 
 from mock import Mock
 
 from horizons.scheduler import Scheduler
+from horizons.util.dbreader import DbReader
+from horizons.util.python.callback import Callback
 
 
 class TestScheduler(TestCase):
@@ -218,3 +222,289 @@ class TestScheduler(TestCase):
 		self.assertEqual(2, self.scheduler.get_remaining_ticks(instance, self.callback))
 		self.scheduler.tick(Scheduler.FIRST_TICK_ID+2)
 		self.assertEqual(1, self.scheduler.get_remaining_ticks(instance, self.callback))
+
+	def test_remove_then_readd_object(self):
+		self.scheduler.before_ticking()
+		instance = Mock()
+		self.scheduler.add_new_object(self.callback, instance, run_in=2)
+		callback_obj = next(iter(self.scheduler.get_classinst_calls(instance)))
+		self.assertEqual(1, self.scheduler.rem_object(callback_obj))
+		self.scheduler.add_object(callback_obj)
+
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.assertFalse(self.callback.called)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID+1)
+		self.callback.assert_called_once_with()
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID+2)
+		self.callback.assert_called_once_with()
+
+	def test_is_last_call(self):
+		self.scheduler.before_ticking()
+		instance = Mock()
+		callback_obj = self.scheduler.add_new_object(self.callback, instance, run_in=2)
+		self.assertTrue(self.scheduler.is_last_call(callback_obj))
+		other_callback_obj = self.scheduler.add_new_object(Mock(), instance, run_in=1)
+		self.assertTrue(self.scheduler.is_last_call(callback_obj))
+
+		self.scheduler.add_new_object(Mock(), instance, run_in=2)
+		self.assertFalse(self.scheduler.is_last_call(callback_obj))
+		self.assertTrue(self.scheduler.is_last_call(other_callback_obj))
+		self.scheduler.rem_object(other_callback_obj)
+		self.assertFalse(self.scheduler.is_last_call(other_callback_obj))
+
+
+class _ListScheduler(object):
+	"""The list based scheduler that was used before the schedule was indexed.
+	Only serves as reference for the call order of the current one."""
+
+	class Call(object):
+		def __init__(self, callback, class_instance, run_in, loops, loop_interval, finish_callback):
+			self.callback = callback
+			self.class_instance = class_instance
+			self.run_in = run_in
+			self.loops = loops
+			self.loop_interval = loop_interval if loop_interval is not None else run_in
+			self.finish_callback = finish_callback
+
+	def __init__(self):
+		self.schedule = {}
+		self.additional_cur_tick_schedule = []
+		self.calls_by_instance = {}
+		self.cur_tick = Scheduler.FIRST_TICK_ID - 1
+
+	def tick(self, tick_id):
+		self.cur_tick = tick_id
+		if self.cur_tick in self.schedule:
+			cur_schedule = self.schedule[self.cur_tick]
+			while cur_schedule:
+				callback = cur_schedule.popleft()
+				if hasattr(callback, "invalid"):
+					continue
+				callback.callback()
+				if callback.loops != 0:
+					self.add_object(callback, readd=True)
+				elif callback.class_instance in self.calls_by_instance:
+					if callback.finish_callback is not None:
+						callback.finish_callback()
+					try:
+						self.calls_by_instance[callback.class_instance].remove(callback)
+					except ValueError:
+						pass
+			del self.schedule[self.cur_tick]
+		self.before_ticking()
+
+	def before_ticking(self):
+		for callback in self.additional_cur_tick_schedule:
+			callback.callback()
+		self.additional_cur_tick_schedule = []
+
+	def add_object(self, callback_obj, readd=False):
+		if callback_obj.loops > 0:
+			callback_obj.loops -= 1
+		if callback_obj.run_in == 0:
+			self.additional_cur_tick_schedule.append(callback_obj)
+		else:
+			interval = callback_obj.loop_interval if readd else callback_obj.run_in
+			tick_key = self.cur_tick + interval
+			self.schedule.setdefault(tick_key, deque()).append(callback_obj)
+			if not readd:
+				self.calls_by_instance.setdefault(callback_obj.class_instance, []).append(callback_obj)
+
+	def add_new_object(self, callback, class_instance, run_in=1, loops=1, loop_interval=None, finish_callback=None):
+		self.add_object(self.Call(callback, class_instance, run_in, loops, loop_interval, finish_callback))
+
+	def rem_object(self, callback_obj):
+		for key in self.schedule:
+			while callback_obj in self.schedule[key]:
+				self.schedule[key].remove(callback_obj)
+				self.calls_by_instance[callback_obj.class_instance].remove(callback_obj)
+		if not self.calls_by_instance[callback_obj.class_instance]:
+			del self.calls_by_instance[callback_obj.class_instance]
+
+	def rem_all_classinst_calls(self, class_instance):
+		if class_instance in self.calls_by_instance:
+			for callback_obj in self.calls_by_instance[class_instance]:
+				callback_obj.invalid = True
+			del self.calls_by_instance[class_instance]
+		self.additional_cur_tick_schedule = [cb for cb in self.additional_cur_tick_schedule
+		                                     if cb.class_instance is not class_instance]
+
+	def rem_call(self, instance, callback):
+		removed_calls = 0
+		for key in self.schedule:
+			callback_objects = self.schedule[key]
+			for i in range(len(callback_objects) - 1, -1, -1):
+				if (callback_objects[i].class_instance is instance
+				    and callback_objects[i].callback == callback
+				    and not hasattr(callback_objects[i], "invalid")):
+					del callback_objects[i]
+					removed_calls += 1
+		if removed_calls > 0 and instance in self.calls_by_instance:
+			calls = self.calls_by_instance[instance]
+			calls[:] = [obj for obj in calls if obj.callback != callback]
+			if not calls:
+				del self.calls_by_instance[instance]
+		self.additional_cur_tick_schedule = [cb for cb in self.additional_cur_tick_schedule
+		                                     if cb.class_instance is not instance or cb.callback != callback]
+
+	def get_classinst_calls(self, instance):
+		calls = []
+		for callback_obj in self.calls_by_instance.get(instance, []):
+			if callback_obj not in calls:
+				calls.append(callback_obj)
+		return calls
+
+
+class TestSchedulerCallOrder(TestCase):
+	"""Replays a random but reproducible workload of adding and removing calls on the scheduler
+	and on the list based reference implementation and compares the order of executed calls."""
+
+	INSTANCES = 6
+	ACTIONS = 3
+	TICKS = 400
+
+	def _record(self, scheduler, seed):
+		rng = random.Random(seed)
+		log = []
+		instances = [object() for i in range(self.INSTANCES)]
+
+		def make_action(inst_idx, action_idx):
+			def action():
+				log.append((scheduler.cur_tick, inst_idx, action_idx))
+				for i in range(rng.randint(0, 2)):
+					random_operation()
+			return action
+		actions = [[make_action(i, a) for a in range(self.ACTIONS)] for i in range(self.INSTANCES)]
+
+		def finished(inst_idx):
+			return lambda: log.append((scheduler.cur_tick, inst_idx, 'finished'))
+
+		def random_operation():
+			inst_idx = rng.randrange(self.INSTANCES)
+			instance = instances[inst_idx]
+			op = rng.random()
+			if op < 0.6:
+				loops = rng.choice([1, 1, 2, 3, -1])
+				run_in = rng.randint(0 if loops == 1 else 1, 6)
+				scheduler.add_new_object(actions[inst_idx][rng.randrange(self.ACTIONS)], instance,
+				                         run_in=run_in, loops=loops,
+				                         loop_interval=rng.choice([None, rng.randint(1, 4)]),
+				                         finish_callback=rng.choice([None, finished(inst_idx)]))
+			elif op < 0.75:
+				scheduler.rem_call(instance, actions[inst_idx][rng.randrange(self.ACTIONS)])
+			elif op < 0.9:
+				calls = scheduler.get_classinst_calls(instance)
+				if calls:
+					# like ScenarioEventHandler.sleep
+					callback_obj = list(calls)[rng.randrange(len(calls))]
+					scheduler.rem_object(callback_obj)
+					if rng.random() < 0.5 and callback_obj.loops != 0:
+						callback_obj.run_in += rng.randint(1, 3)
+						scheduler.add_object(callback_obj)
+			else:
+				scheduler.rem_all_classinst_calls(instance)
+
+		for i in range(30):
+			random_operation()
+		scheduler.before_ticking()
+		for tick in range(Scheduler.FIRST_TICK_ID, Scheduler.FIRST_TICK_ID + self.TICKS):
+			scheduler.tick(tick)
+			if rng.random() < 0.3:
+				random_operation()
+		return log
+
+	def test_same_call_order_as_list_scheduler(self):
+		for seed in range(20):
+			Scheduler.create_instance(Mock())
+			try:
+				indexed_log = self._record(Scheduler(), seed)
+			finally:
+				Scheduler.destroy_instance()
+			reference_log = self._record(_ListScheduler(), seed)
+
+			self.assertTrue(len(reference_log) > self.TICKS / 4)
+			self.assertEqual(reference_log, indexed_log, "different call order for seed {}".format(seed))
+
+
+class _Producer(object):
+	def produce(self):
+		pass
+
+
+class TestSchedulerProfiling(TestCase):
+
+	def setUp(self):
+		Scheduler.create_instance(Mock())
+		self.scheduler = Scheduler()
+		self.scheduler.before_ticking()
+
+	def tearDown(self):
+		Scheduler.destroy_instance()
+
+	def _run_ticks(self, ticks):
+		for i in range(ticks):
+			self.scheduler.tick(self.scheduler.cur_tick + 1)
+
+	def test_disabled_by_default(self):
+		self.assertIsNone(self.scheduler.profiler)
+
+	def test_count_calls_per_callback_and_type(self):
+		producer = _Producer()
+		self.scheduler.enable_profiling(100)
+		self.scheduler.add_new_object(Callback(producer.produce), producer, run_in=1, loops=-1)
+		self.scheduler.add_new_object(lambda: None, None, run_in=2, loops=3)
+		self._run_ticks(10)
+
+		callbacks = dict((name, calls) for name, seconds, calls, queries in self.scheduler.profiler.get_top(kind='callback'))
+		self.assertEqual(callbacks['_Producer.produce'], 10)
+		self.assertEqual(callbacks['TestSchedulerProfiling.test_count_calls_per_callback_and_type.<locals>.<lambda>'], 3)
+		types = dict((name, calls) for name, seconds, calls, queries in self.scheduler.profiler.get_top(kind='type'))
+		self.assertEqual(types, {'_Producer': 10, 'NoneType': 3})
+
+	def test_rolling_window(self):
+		producer = _Producer()
+		self.scheduler.enable_profiling(5)
+		self.scheduler.add_new_object(producer.produce, producer, run_in=1, loops=-1)
+		self.scheduler.add_new_object(lambda: None, producer, run_in=1, loops=2)
+		self._run_ticks(20)
+
+		self.assertEqual([(name, calls) for name, seconds, calls, queries in self.scheduler.profiler.get_top(kind='callback')],
+		                 [('_Producer.produce', 5)])
+		self.assertEqual(len(self.scheduler.profiler.get_top(1, kind='type')), 1)
+
+	def test_count_sql_queries(self):
+		db = DbReader(':memory:')
+		self.scheduler.enable_profiling(5)
+		self.scheduler.add_new_object(lambda: db("SELECT 1"), None, run_in=1, loops=-1)
+		self._run_ticks(10)
+		db.close()
+
+		self.assertEqual([(calls, queries) for name, seconds, calls, queries in self.scheduler.profiler.get_top()],
+		                 [(5, 5)])
+		self.assertEqual(self.scheduler.profiler.get_queries_per_tick(), 1.0)
+
+	def test_parts_are_recorded_for_their_instances(self):
+		db = DbReader(':memory:')
+		producers = [_Producer(), _Producer()]
+		producers[0].produce = lambda: db("SELECT 1")
+
+		def produce_all():
+			for producer in producers:
+				self.scheduler.profiler.run_part(producer.produce, producer)
+
+		self.scheduler.enable_profiling(5)
+		self.scheduler.add_new_object(produce_all, None, run_in=1, loops=-1)
+		self._run_ticks(10)
+		db.close()
+
+		callbacks = dict((name, (calls, queries)) for name, seconds, calls, queries
+		                 in self.scheduler.profiler.get_top(kind='callback'))
+		self.assertEqual(callbacks, {
+			'TestSchedulerProfiling.test_parts_are_recorded_for_their_instances.<locals>.produce_all': (5, 0),
+			'TestSchedulerProfiling.test_parts_are_recorded_for_their_instances.<locals>.<lambda>': (5, 5),
+			'_Producer.produce': (5, 0),
+		})
+		types = dict((name, calls) for name, seconds, calls, queries
+		             in self.scheduler.profiler.get_top(kind='type'))
+		self.assertEqual(types, {'_Producer': 10, 'NoneType': 5})
+		self.assertEqual(self.scheduler.profiler.get_queries_per_tick(), 1.0)
@@ -171,3 +171,28 @@ class TestTimer(TestCase):
 		self.timer.add_test(self.test)
 		self.timer.check_tick()
 		self.assertFalse(self.callback.called)
+
+	def test_fast_forward_ticks_until_frame_time_passed(self):
+		def advance_clock(tick_id):
+			self.clock.return_value += self.TIME_TICK / 10
+		self.callback.side_effect = advance_clock
+		self.timer.fast_forward = True
+		self.timer.check_tick()
+		ticks = int(round(Timer.FAST_FORWARD_FRAME_TIME / (self.TIME_TICK / 10)))
+		self.assertEqual(ticks, self.callback.call_count)
+		self.assertEqual(self.TICK_START + ticks, self.timer.tick_next_id)
+
+	def test_fast_forward_stopped_by_callback(self):
+		def stop_fast_forward(tick_id):
+			self.timer.fast_forward = False
+		self.callback.side_effect = stop_fast_forward
+		self.timer.fast_forward = True
+		self.timer.check_tick()
+		self.callback.assert_called_once_with(TestTimer.TICK_START)
+
+		# continues in normal speed
+		self.callback.side_effect = None
+		self.callback.reset_mock()
+		self.clock.return_value = self.TIME_START + self.TIME_TICK
+		self.timer.check_tick()
+		self.callback.assert_called_once_with(TestTimer.TICK_START + 1)
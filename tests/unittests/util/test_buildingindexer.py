@@ -0,0 +1,94 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+import unittest
+
+from horizons.util.buildingindexer import BuildingIndexer
+from horizons.util.shapes import Rect
+
+
+class Dummy(object):
+	def __init__(self, x, y, width, height):
+		self.position = Rect.init_from_topleft_and_size(x, y, width, height)
+
+
+class TestBuildingIndexer(unittest.TestCase):
+	"""The indexer has to return the same as sorting all buildings in range of a tile,
+	which is what it did before the tiles were updated incrementally."""
+
+	radius = 4
+	coords_list = [(x, y) for x in range(30) for y in range(20)]
+
+	def _get_expected(self, buildings, coords):
+		x, y = coords
+		elements = []
+		for building in buildings:
+			if coords not in building.position.get_radius_coordinates(self.radius, include_self=True):
+				continue
+			pos = building.position
+			x_diff = max(pos.left - x, x - pos.right, 0)
+			y_diff = max(pos.top - y, y - pos.bottom, 0)
+			elements.append((x_diff * x_diff + y_diff * y_diff, pos.top, pos.bottom, pos.left, pos.right,
+			                 building))
+		elements.sort(key=lambda element: element[:5])
+		return [element[5] for element in elements]
+
+	def _assert_same_as_sorting(self, indexer, buildings, rng):
+		for coords in rng.sample(self.coords_list, 40) + [(-10, -10)]:
+			expected = self._get_expected(buildings, coords)
+			if coords in self.coords_list:
+				self.assertEqual(len(expected), indexer.get_num_buildings_in_range(coords))
+			self.assertEqual(expected, list(indexer.get_buildings_in_range(coords)))
+
+	def test_changes(self):
+		rng = random.Random(3)
+		# buildings must not overlap, place them on a grid with gaps
+		free_places = [(x, y) for x in range(-2, 32, 3) for y in range(-2, 22, 3)]
+		indexer = BuildingIndexer(self.radius, self.coords_list, random.Random(1))
+		buildings = []
+		for i in range(60):
+			for j in range(rng.randint(1, 8)):
+				if rng.random() < 0.6 or not buildings:
+					if not free_places:
+						continue
+					place = free_places.pop(rng.randrange(len(free_places)))
+					building = Dummy(place[0], place[1], rng.randint(1, 2), rng.randint(1, 2))
+					buildings.append(building)
+					indexer.add(building)
+				else:
+					building = buildings.pop(rng.randrange(len(buildings)))
+					free_places.append((building.position.left, building.position.top))
+					indexer.remove(building)
+			self._assert_same_as_sorting(indexer, buildings, rng)
+
+	def test_initial_buildings_and_rng_usage(self):
+		rng = random.Random(4)
+		buildings = [Dummy(x, y, 1, 1) for x in range(0, 30, 2) for y in range(0, 20, 2) if rng.random() < 0.5]
+		indexer = BuildingIndexer(self.radius, self.coords_list, random.Random(9), buildings=buildings)
+		self._assert_same_as_sorting(indexer, buildings, rng)
+
+		expected_rng = random.Random(9)
+		for coords in self.coords_list:
+			expected = self._get_expected(buildings, coords)
+			building = indexer.get_random_building_in_range(coords)
+			self.assertEqual(expected_rng.choice(expected) if expected else None, building)
+		self.assertIsNone(indexer.get_random_building_in_range((-10, -10)))
@@ -0,0 +1,113 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from unittest import TestCase
+
+from mock import Mock
+
+from horizons.scheduler import Scheduler
+from horizons.util.changelistener import ChangeListener, OncePerTickListeners
+
+
+class Listener(object):
+	def __init__(self):
+		self.calls = 0
+
+	def changed(self):
+		self.calls += 1
+
+
+class TestOncePerTickListeners(TestCase):
+
+	def setUp(self):
+		Scheduler.create_instance(Mock())
+		Scheduler().before_ticking()
+		self.sources = [ChangeListener(), ChangeListener()]
+		self.listener = Listener()
+
+	def tearDown(self):
+		Scheduler.destroy_instance()
+		OncePerTickListeners.reset()
+
+	def _run_tick(self, function):
+		Scheduler().add_new_object(function, self, run_in=1)
+		Scheduler().tick(Scheduler().cur_tick + 1)
+
+	def test_called_once_at_the_end_of_the_tick(self):
+		for source in self.sources:
+			source.add_change_listener(self.listener.changed, once_per_tick=True)
+		def change():
+			calls = self.listener.calls
+			for i in range(3):
+				for source in self.sources:
+					source._changed()
+			self.assertEqual(self.listener.calls, calls)
+		self._run_tick(change)
+		self.assertEqual(self.listener.calls, 1)
+
+		self._run_tick(change)
+		self.assertEqual(self.listener.calls, 2)
+
+	def test_changes_while_calling_listeners(self):
+		source = self.sources[0]
+		source.add_change_listener(lambda: self.sources[1]._changed(), once_per_tick=True)
+		self.sources[1].add_change_listener(self.listener.changed, once_per_tick=True)
+		self._run_tick(source._changed)
+		self.assertEqual(self.listener.calls, 1)
+
+	def test_removed_listener(self):
+		source = self.sources[0]
+		source.add_change_listener(self.listener.changed, once_per_tick=True)
+		self.assertTrue(source.has_change_listener(self.listener.changed))
+		def change():
+			source._changed()
+			source.remove_change_listener(self.listener.changed)
+		self._run_tick(change)
+		self.assertEqual(self.listener.calls, 0)
+		self.assertFalse(source.has_change_listener(self.listener.changed))
+
+	def test_immediate_outside_of_ticks(self):
+		source = self.sources[0]
+		source.add_change_listener(self.listener.changed, once_per_tick=True)
+		source._changed()
+		source._changed()
+		self.assertEqual(self.listener.calls, 2)
+
+		Scheduler.destroy_instance()
+		source._changed()
+		self.assertEqual(self.listener.calls, 3)
+		Scheduler.create_instance(Mock())
+
+	def test_normal_listeners_are_called_immediately(self):
+		source = self.sources[0]
+		source.add_change_listener(self.listener.changed)
+		def change():
+			source._changed()
+			source._changed()
+			self.assertEqual(self.listener.calls, 2)
+		self._run_tick(change)
+
+	def test_dead_listener(self):
+		source = self.sources[0]
+		source.add_change_listener(self.listener.changed, once_per_tick=True)
+		self.listener = None # never hashed while it was alive
+		self._run_tick(source._changed)
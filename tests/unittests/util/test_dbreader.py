@@ -0,0 +1,141 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import unittest
+import weakref
+
+from mock import patch
+
+from horizons.util.dbreader import BatchedDbWriter, DbReader
+from horizons.util.uhdbaccessor import UhDbAccessor
+
+
+class DbReaderTest(unittest.TestCase):
+
+	def setUp(self):
+		super().setUp()
+		with patch.object(DbReader, 'CACHED_QUERY_SIZE', 2):
+			self.db = DbReader(':memory:')
+		self.db("CREATE TABLE foo (id INT, name TEXT)")
+		self.db("INSERT INTO foo VALUES (1, 'one'), (2, 'two'), (3, 'three')")
+
+	def tearDown(self):
+		self.db.close()
+		super().tearDown()
+
+	def _count_queries(self, *queries):
+		start = DbReader.query_count
+		results = [self.db.cached_query("SELECT name FROM foo WHERE id = ?", id) for id in queries]
+		return results, DbReader.query_count - start
+
+	def test_cached_query(self):
+		self.assertEqual(self._count_queries(1, 1, 2, 1), ([[('one', )], [('one', )], [('two', )], [('one', )]], 2))
+
+	def test_cached_query_is_bounded(self):
+		self._count_queries(1, 2, 3)
+		# 1 is the least recently used result and has been dropped
+		self.assertEqual(self._count_queries(3, 2, 1)[1], 1)
+
+	def test_clear_cache(self):
+		self._count_queries(1)
+		self.db.clear_cache()
+		self.assertEqual(self._count_queries(1)[1], 1)
+
+	def test_no_reference_cycle(self):
+		db = DbReader(':memory:')
+		db.cached_query("SELECT 1")
+		db.close()
+		ref = weakref.ref(db)
+		del db
+		# freed by reference counting, without the cycle collector
+		self.assertIsNone(ref())
+
+
+class UhDbAccessorTest(unittest.TestCase):
+
+	def setUp(self):
+		super().setUp()
+		self.db = UhDbAccessor(':memory:')
+		self.db.execute_script("""
+			CREATE TABLE tier (level INT, name TEXT, tax_income INT, inhabitants_max INT);
+			INSERT INTO tier VALUES (0, 'Sailors', 3, 2), (1, 'Pioneers', 6, 3);
+			CREATE TABLE balance_values (name TEXT, value REAL);
+			INSERT INTO balance_values VALUES ('happiness_inhabitants_decrease_limit', 30.0);
+			CREATE TABLE resource (id INT, name TEXT, value REAL, tradeable BOOL, shown_in_inventory BOOL);
+			INSERT INTO resource VALUES (1, 'coins', 0, 0, 0), (2, 'lumber', 1.5, 1, 1);
+		""")
+
+	def tearDown(self):
+		self.db.close()
+		super().tearDown()
+
+	def test_tables_are_read_once(self):
+		self.db.get_settler_tax_income(0)
+		self.db.get_res_value(1)
+		self.db.get_lower_happiness_limit()
+		start = DbReader.query_count
+		self.assertEqual(self.db.get_settler_tax_income(1), 6)
+		self.assertEqual(self.db.get_settler_name(1), 'Pioneers')
+		self.assertEqual(self.db.get_tier_inhabitants_max(1), 3)
+		self.assertEqual(self.db.get_tier_inhabitants_min(1), 2)
+		self.assertEqual(self.db.get_tier_inhabitants_min(0), 0)
+		self.assertEqual(self.db.get_res_value(2), 1.5)
+		self.assertEqual(self.db.get_res_inventory_display(1), 0)
+		self.assertEqual(self.db.get_lower_happiness_limit(), 30.0)
+		self.assertEqual(DbReader.query_count, start)
+
+	def test_unknown_key(self):
+		self.assertRaises(IndexError, self.db.get_settler_tax_income, 5)
+
+
+class BatchedDbWriterTest(unittest.TestCase):
+
+	def setUp(self):
+		super().setUp()
+		self.db = BatchedDbWriter(':memory:')
+		self.db("CREATE TABLE foo (id INT, name TEXT)")
+		self.db("CREATE TABLE bar (id INT)")
+
+	def tearDown(self):
+		self.db.close()
+		super().tearDown()
+
+	def test_inserts_are_batched(self):
+		start = DbReader.query_count
+		self.db("BEGIN")
+		for i in range(10):
+			self.db("INSERT INTO foo(id, name) VALUES(?, ?)", i, str(i))
+			self.db('INSERT INTO "bar" VALUES(?)', i)
+		self.db("COMMIT")
+		# BEGIN, two batches and COMMIT
+		self.assertEqual(DbReader.query_count - start, 4)
+		self.assertEqual(self.db.rows, 20)
+		self.assertEqual(self.db("SELECT id FROM bar"), [(i, ) for i in range(10)])
+
+	def test_insertion_order_is_kept(self):
+		self.db("INSERT INTO foo(id, name) VALUES(?, ?)", 1, 'a')
+		self.db("INSERT INTO foo(name, id) VALUES(?, ?)", 'b', 2)
+		self.db("INSERT INTO foo(id, name) VALUES(?, ?)", 3, 'c')
+		self.assertEqual(self.db("SELECT rowid, id, name FROM foo"), [(1, 1, 'a'), (2, 2, 'b'), (3, 3, 'c')])
+
+	def test_select_sees_buffered_rows(self):
+		self.db("INSERT INTO foo VALUES(?, ?)", 1, 'a')
+		self.assertEqual(self.db("SELECT name FROM foo WHERE id = ?", 1), [('a', )])
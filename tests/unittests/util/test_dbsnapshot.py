@@ -0,0 +1,101 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from horizons.util import dbsnapshot
+
+
+class DbSnapshotTest(unittest.TestCase):
+
+	def setUp(self):
+		super().setUp()
+		self.tmp_dir = tempfile.mkdtemp()
+		self.pattern = os.path.join(self.tmp_dir, 'db-{digest}.sqlite')
+		self.sql_files = [os.path.join(self.tmp_dir, 'a.sql'), os.path.join(self.tmp_dir, 'b.sql')]
+		self._write(0, "CREATE TABLE foo (id INT, name TEXT);")
+		self._write(1, "INSERT INTO foo VALUES (1, 'one'); CREATE INDEX foo_id ON foo(id);")
+
+	def tearDown(self):
+		shutil.rmtree(self.tmp_dir)
+		super().tearDown()
+
+	def _write(self, index, sql):
+		with open(self.sql_files[index], 'w') as f:
+			f.write(sql)
+
+	def _load(self, path):
+		connection = sqlite3.connect(':memory:')
+		dbsnapshot.copy_into(path, connection)
+		return connection
+
+	def test_copy(self):
+		connection = self._load(dbsnapshot.get_snapshot(self.sql_files, self.pattern))
+		self.assertEqual(connection.execute("SELECT * FROM foo").fetchall(), [(1, 'one')])
+		self.assertEqual(connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall(),
+		                 [('foo_id', )])
+
+	def test_copy_tables_without_backup_api(self):
+		path = dbsnapshot.get_snapshot(self.sql_files, self.pattern)
+		connection = sqlite3.connect(':memory:')
+		source = sqlite3.connect(path)
+		dbsnapshot._copy_tables(source, path, connection)
+		source.close()
+		self.assertEqual(list(connection.iterdump()), list(self._load(path).iterdump()))
+
+	def test_reuse_snapshot(self):
+		path = dbsnapshot.get_snapshot(self.sql_files, self.pattern)
+		mtime = os.stat(path).st_mtime_ns
+		self.assertEqual(dbsnapshot.get_snapshot(self.sql_files, self.pattern), path)
+		self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+
+	def test_rebuild_when_sql_changes(self):
+		old_path = dbsnapshot.get_snapshot(self.sql_files, self.pattern)
+		self._write(1, "INSERT INTO foo VALUES (2, 'two');")
+		path = dbsnapshot.get_snapshot(self.sql_files, self.pattern)
+
+		self.assertNotEqual(path, old_path)
+		self.assertFalse(os.path.exists(old_path))
+		connection = self._load(path)
+		self.assertEqual(connection.execute("SELECT * FROM foo").fetchall(), [(2, 'two')])
+
+	def test_special_characters_in_path(self):
+		tmp_dir = os.path.join(self.tmp_dir, 'uh #1 ?x=%20')
+		os.mkdir(tmp_dir)
+		path = dbsnapshot.get_snapshot(self.sql_files, os.path.join(tmp_dir, 'db-{digest}.sqlite'))
+		connection = self._load(path)
+		self.assertEqual(connection.execute("SELECT * FROM foo").fetchall(), [(1, 'one')])
+		self.assertEqual(sorted(os.listdir(self.tmp_dir)), ['a.sql', 'b.sql', 'uh #1 ?x=%20'])
+
+	def test_missing_tables(self):
+		path = dbsnapshot.get_snapshot(self.sql_files, self.pattern)
+		dbsnapshot.copy_into(path, sqlite3.connect(':memory:'), tables=['foo'])
+		with self.assertRaises(sqlite3.DatabaseError):
+			dbsnapshot.copy_into(path, sqlite3.connect(':memory:'), tables=['foo', 'bar'])
+
+		empty_path = os.path.join(self.tmp_dir, 'empty.sqlite')
+		sqlite3.connect(empty_path).close()
+		with self.assertRaises(sqlite3.DatabaseError):
+			dbsnapshot.copy_into(empty_path, sqlite3.connect(':memory:'))
@@ -0,0 +1,180 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+import unittest
+
+from mock import Mock
+
+from horizons.util.pathfinding.hierarchical import ClusterGraph, HierarchicalFindPath
+from horizons.util.pathfinding.pathcache import PathCache
+from horizons.util.pathfinding.pathfinding import FindPath, GridFindPath, PathGrid
+from horizons.util.shapes import Circle, Point, Rect
+
+
+class TestGridFindPath(unittest.TestCase):
+	"""GridFindPath has to yield exactly the same paths as FindPath."""
+
+	WIDTH = 40
+	HEIGHT = 30
+
+	def _create_map(self, rng):
+		path_nodes = {}
+		for x in range(self.WIDTH):
+			for y in range(self.HEIGHT):
+				if rng.random() < 0.75:
+					path_nodes[(x, y)] = rng.choice([1.0, 1.0, 0.5, 2.0])
+		return path_nodes
+
+	def _random_shape(self, rng):
+		x = rng.randrange(self.WIDTH - 3)
+		y = rng.randrange(self.HEIGHT - 3)
+		shape = rng.randrange(3)
+		if shape == 0:
+			return Point(x, y)
+		elif shape == 1:
+			return Rect.init_from_topleft_and_size(x, y, rng.randint(1, 3), rng.randint(1, 3))
+		else:
+			return Circle(Point(x + 1, y + 1), 1)
+
+	def test_same_paths_as_find_path(self):
+		rng = random.Random(42)
+		for i in range(5):
+			path_nodes = self._create_map(rng)
+			grid = PathGrid(path_nodes, Rect.init_from_borders(0, 0, self.WIDTH - 1, self.HEIGHT - 1))
+			for j in range(60):
+				source = self._random_shape(rng)
+				destination = self._random_shape(rng)
+				blocked = set((rng.randrange(self.WIDTH), rng.randrange(self.HEIGHT)) for k in range(30))
+				diagonal = rng.random() < 0.5
+				make_target_walkable = rng.random() < 0.5
+
+				expected = FindPath()(source, destination, path_nodes, blocked,
+				                      diagonal, make_target_walkable)
+				path = GridFindPath(grid)(source, destination, path_nodes, blocked,
+				                          diagonal, make_target_walkable)
+				self.assertEqual(expected, path)
+
+	def test_source_outside_of_grid(self):
+		path_nodes = dict.fromkeys([(x, 0) for x in range(5)], 1.0)
+		grid = PathGrid(path_nodes, Rect.init_from_borders(0, 0, 4, 0))
+		path = GridFindPath(grid)(Point(-1, 0), Point(4, 0), path_nodes)
+		self.assertEqual([(-1, 0), (0, 0), (1, 0), (2, 0), (3, 0), (4, 0)], path)
+		self.assertEqual(path, FindPath()(Point(-1, 0), Point(4, 0), path_nodes))
+
+	def test_no_path(self):
+		path_nodes = dict.fromkeys([(0, 0), (2, 0)], 1.0)
+		grid = PathGrid(path_nodes, Rect.init_from_borders(0, 0, 2, 0))
+		self.assertIsNone(GridFindPath(grid)(Point(0, 0), Point(2, 0), path_nodes))
+
+
+class TestHierarchicalFindPath(unittest.TestCase):
+	"""HierarchicalFindPath has to find valid paths whenever FindPath finds one."""
+
+	WIDTH = 90
+	HEIGHT = 70
+	CLUSTER_SIZE = 8
+
+	def _create_map(self, rng):
+		path_nodes = dict.fromkeys([(x, y) for x in range(self.WIDTH) for y in range(self.HEIGHT)], 1.0)
+		for i in range(25):
+			x = rng.randrange(self.WIDTH)
+			y = rng.randrange(self.HEIGHT)
+			for coords in Rect.init_from_topleft_and_size(x, y, rng.randint(2, 15), rng.randint(2, 15)).tuple_iter():
+				path_nodes.pop(coords, None)
+		return path_nodes
+
+	def _create_graph(self, path_nodes):
+		grid = PathGrid(path_nodes, Rect.init_from_borders(0, 0, self.WIDTH - 1, self.HEIGHT - 1))
+		return ClusterGraph(grid, self.CLUSTER_SIZE)
+
+	def _assert_valid_path(self, path, source, destination, path_nodes, blocked):
+		self.assertIn(path[0], source.get_coordinates())
+		self.assertIn(path[-1], destination.get_coordinates())
+		self.assertEqual(len(path), len(set(path)))
+		for prev, coords in zip(path, path[1:]):
+			self.assertEqual(1, max(abs(prev[0] - coords[0]), abs(prev[1] - coords[1])))
+			self.assertIn(coords, path_nodes)
+			self.assertNotIn(coords, blocked)
+
+	def test_finds_valid_paths(self):
+		rng = random.Random(23)
+		for i in range(3):
+			path_nodes = self._create_map(rng)
+			find_path = HierarchicalFindPath(self._create_graph(path_nodes))
+			water = sorted(path_nodes)
+			for j in range(40):
+				source = Point(*rng.choice(water))
+				destination = Circle(Point(*rng.choice(water)), rng.randint(0, 2))
+				blocked = set(rng.choice(water) for k in range(30)) - set([source.to_tuple()])
+
+				expected = FindPath()(source, destination, path_nodes, blocked, True, False)
+				path = find_path(source, destination, path_nodes, blocked, True, False)
+				if expected is None:
+					self.assertIsNone(path)
+					continue
+				self._assert_valid_path(path, source, destination, path_nodes, blocked)
+				self.assertLessEqual(len(path), 2 * len(expected))
+
+	def test_append_section_cuts_loops(self):
+		path, indices = [], {}
+		HierarchicalFindPath._append_section(path, indices, [(0, 0), (1, 0), (2, 0), (2, 1)])
+		HierarchicalFindPath._append_section(path, indices, [(2, 1), (1, 1), (1, 0), (1, -1)])
+		self.assertEqual(path, [(0, 0), (1, 0), (1, -1)])
+		self.assertEqual(indices, {(0, 0): 0, (1, 0): 1, (1, -1): 2})
+
+
+class TestPathCache(unittest.TestCase):
+
+	def setUp(self):
+		self.path_nodes = Mock(version=0)
+		self.cache = PathCache(self.path_nodes, size=2)
+		self.find_path = Mock(side_effect=lambda source, destination: [(0, 0), (1, 0)])
+
+	def test_hit(self):
+		path = self.cache.get_path(Point(0, 0), Point(1, 0), False, True, self.find_path)
+		path.append((2, 0)) # modifying the result must not change the cache
+		self.assertEqual([(0, 0), (1, 0)], self.cache.get_path(Point(0, 0), Point(1, 0), False, True, self.find_path))
+		self.assertEqual(1, self.find_path.call_count)
+		self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+	def test_miss_after_version_change(self):
+		self.cache.get_path(Point(0, 0), Point(1, 0), False, True, self.find_path)
+		self.path_nodes.version += 1
+		self.cache.get_path(Point(0, 0), Point(1, 0), False, True, self.find_path)
+		self.assertEqual(2, self.find_path.call_count)
+		self.assertEqual((0, 2), (self.cache.hits, self.cache.misses))
+
+	def test_lru_eviction(self):
+		self.cache.get_path(Point(0, 0), Point(1, 0), False, True, self.find_path)
+		self.cache.get_path(Point(0, 0), Point(2, 0), False, True, self.find_path)
+		self.cache.get_path(Point(0, 0), Point(1, 0), False, True, self.find_path)
+		self.cache.get_path(Point(0, 0), Point(3, 0), False, True, self.find_path) # evicts (2, 0)
+		self.cache.get_path(Point(0, 0), Point(1, 0), False, True, self.find_path)
+		self.assertEqual(3, self.find_path.call_count)
+		self.cache.get_path(Point(0, 0), Point(2, 0), False, True, self.find_path)
+		self.assertEqual(4, self.find_path.call_count)
+
+	def test_unsupported_shapes_are_not_cached(self):
+		self.cache.get_path(Point(0, 0), Circle(Point(3, 3), 1), False, True, self.find_path)
+		self.cache.get_path(Point(0, 0), Circle(Point(3, 3), 1), False, True, self.find_path)
+		self.assertEqual(2, self.find_path.call_count)
+		self.assertEqual(0, len(self.cache.paths))
@@ -0,0 +1,83 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from horizons.savegamemanager import SavegameManager
+from horizons.util import savegamecompression
+
+
+class SavegameCompressionTest(unittest.TestCase):
+
+	def setUp(self):
+		super().setUp()
+		self.tmp_dir = tempfile.mkdtemp()
+		self.savegame = os.path.join(self.tmp_dir, 'savegame.sqlite')
+		connection = sqlite3.connect(self.savegame)
+		connection.execute("CREATE TABLE metadata (name TEXT, value TEXT)")
+		connection.executemany("INSERT INTO metadata VALUES (?, ?)",
+		                       [('savecounter', '3'), ('padding', 'x' * 100000)])
+		connection.commit()
+		connection.close()
+		with open(self.savegame, 'rb') as f:
+			self.content = f.read()
+
+	def tearDown(self):
+		shutil.rmtree(self.tmp_dir)
+		super().tearDown()
+
+	def _read(self, path):
+		with open(path, 'rb') as f:
+			return f.read()
+
+	def test_roundtrip(self):
+		self.assertFalse(savegamecompression.is_compressed(self.savegame))
+		savegamecompression.compress_in_place(self.savegame)
+		self.assertTrue(savegamecompression.is_compressed(self.savegame))
+		self.assertLess(os.path.getsize(self.savegame), len(self.content) / 2)
+
+		copy = os.path.join(self.tmp_dir, 'copy.sqlite')
+		savegamecompression.copy_uncompressed(self.savegame, copy)
+		self.assertEqual(self._read(copy), self.content)
+
+	def test_truncated(self):
+		savegamecompression.compress_in_place(self.savegame)
+		with open(self.savegame, 'r+b') as f:
+			f.truncate(os.path.getsize(self.savegame) - 10)
+		self.assertRaises(ValueError, savegamecompression.decompress_file, self.savegame,
+		                  os.path.join(self.tmp_dir, 'copy.sqlite'))
+
+	def test_uncompressed(self):
+		with savegamecompression.uncompressed(self.savegame) as path:
+			self.assertEqual(path, self.savegame)
+
+		savegamecompression.compress_in_place(self.savegame)
+		with savegamecompression.uncompressed(self.savegame) as path:
+			self.assertEqual(self._read(path), self.content)
+		self.assertFalse(os.path.exists(path))
+
+	def test_metadata_of_compressed_savegame(self):
+		savegamecompression.compress_in_place(self.savegame)
+		self.assertEqual(SavegameManager.get_metadata(self.savegame)['savecounter'], 3)
@@ -0,0 +1,137 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from mock import Mock, patch
+
+from horizons.savegamemanager import SavegameManager
+from horizons.util.dbreader import DbReader
+from horizons.util.savegameindex import SavegameMetadataIndex
+
+
+class SavegameMetadataIndexTest(unittest.TestCase):
+
+	def setUp(self):
+		super().setUp()
+		self.tmp_dir = tempfile.mkdtemp()
+		self.index_file = os.path.join(self.tmp_dir, 'index.cache')
+		self.savegame = os.path.join(self.tmp_dir, 'savegame.sqlite')
+		self._write(b'first')
+
+	def tearDown(self):
+		shutil.rmtree(self.tmp_dir)
+		super().tearDown()
+
+	def _write(self, content, mtime=1000000000):
+		with open(self.savegame, 'wb') as f:
+			f.write(content)
+		os.utime(self.savegame, (mtime, mtime))
+
+	def test_unchanged_file_is_read_once(self):
+		index = SavegameMetadataIndex(self.index_file)
+		read = Mock(return_value={'savecounter': 1})
+		self.assertEqual(index.get(self.savegame, read), {'savecounter': 1})
+		self.assertEqual(index.get(self.savegame, read), {'savecounter': 1})
+		self.assertEqual(read.call_count, 1)
+
+	def test_changed_file_is_read_again(self):
+		index = SavegameMetadataIndex(self.index_file)
+		index.get(self.savegame, Mock(return_value=1))
+		self._write(b'second', mtime=1000000500)
+		self.assertEqual(index.get(self.savegame, Mock(return_value=2)), 2)
+
+	def test_persistence(self):
+		index = SavegameMetadataIndex(self.index_file)
+		index.get(self.savegame, Mock(return_value=1))
+		index.sync()
+
+		read = Mock()
+		self.assertEqual(SavegameMetadataIndex(self.index_file).get(self.savegame, read), 1)
+		self.assertFalse(read.called)
+
+	def test_sync_drops_deleted_files(self):
+		index = SavegameMetadataIndex(self.index_file)
+		index.get(self.savegame, Mock(return_value=1))
+		os.remove(self.savegame)
+		index.sync()
+		self.assertEqual(SavegameMetadataIndex(self.index_file)._entries, {})
+
+	def test_broken_index_file(self):
+		with open(self.index_file, 'wb') as f:
+			f.write(b'garbage')
+		index = SavegameMetadataIndex(self.index_file)
+		self.assertEqual(index.get(self.savegame, Mock(return_value=1)), 1)
+
+	def test_savegame_info(self):
+		os.remove(self.savegame)
+		connection = sqlite3.connect(self.savegame)
+		connection.executescript("""
+			CREATE TABLE metadata (name TEXT, value TEXT);
+			INSERT INTO metadata VALUES ('savecounter', '3'), ('map_name', 'development');
+			CREATE TABLE metadata_blob (name TEXT, value BLOB);
+			INSERT INTO metadata_blob VALUES ('screen', x'89504e47');
+			CREATE TABLE player (is_trader BOOL, is_pirate BOOL);
+			INSERT INTO player VALUES (0, 0), (0, 0), (1, 0), (0, 1);
+		""")
+		connection.close()
+
+		with patch.object(SavegameManager, 'metadata_index', SavegameMetadataIndex(self.index_file)):
+			info = SavegameManager.get_savegame_info(self.savegame)
+			self.assertEqual((info['savecounter'], info['map_name'], info['players'], info['has_screenshot']),
+			                 (3, 'development', 2, True))
+			self.assertNotIn('rng_state', info)
+			self.assertEqual(SavegameManager.get_screenshot(self.savegame), b'\x89PNG')
+
+	def _write_metadata(self, write_screenshot):
+		os.remove(self.savegame)
+		db = DbReader(self.savegame)
+		db.execute_script("""
+			CREATE TABLE metadata (name TEXT, value TEXT);
+			CREATE TABLE metadata_blob (name TEXT, value BLOB);
+			CREATE TABLE player (is_trader BOOL, is_pirate BOOL);
+			INSERT INTO metadata VALUES ('map_name', 'development');
+			INSERT INTO player VALUES (0, 0), (1, 0);
+		""")
+		with patch.object(SavegameManager, '_write_screenshot', write_screenshot):
+			info = SavegameManager.write_metadata(db, 4, 'rng')
+		db.close()
+		return info
+
+	def test_written_metadata_matches_read_metadata(self):
+		def write_screenshot(db):
+			db("INSERT INTO metadata_blob VALUES (?, ?)", "screen", sqlite3.Binary(b'\x89PNG'))
+		# the timestamp is stored as text and loses precision, the index must have the same value
+		with patch('time.time', return_value=1792358504.497077):
+			info = self._write_metadata(write_screenshot)
+
+		self.assertEqual(info, SavegameManager._read_savegame_info(self.savegame))
+		self.assertEqual((info['savecounter'], info['map_name'], info['players'], info['has_screenshot']),
+		                 (4, 'development', 1, True))
+
+	def test_written_metadata_without_screenshot(self):
+		info = self._write_metadata(lambda db: None)
+		self.assertEqual(info, SavegameManager._read_savegame_info(self.savegame))
+		self.assertFalse(info['has_screenshot'])
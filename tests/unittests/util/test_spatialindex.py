@@ -0,0 +1,75 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+import unittest
+
+from horizons.util.shapes import Circle, Point
+from horizons.util.spatialindex import SpatialIndex
+
+
+class Dummy(object):
+	def __init__(self, x, y):
+		self.position = Point(x, y)
+
+
+class TestSpatialIndex(unittest.TestCase):
+	"""The index has to return the same as filtering the list of all objects."""
+
+	def _assert_same_as_list(self, index, objects, rng):
+		for i in range(20):
+			center = Point(rng.randint(-10, 110), rng.randint(-10, 110))
+			radius = rng.choice([0, 1, 2.5, 7, 20, 500])
+			circle = Circle(center, radius)
+			expected = [obj for obj in objects if circle.contains(obj.position)]
+			self.assertEqual(expected, index.get_in_circle(center, radius))
+
+	def test_queries(self):
+		rng = random.Random(7)
+		index = SpatialIndex()
+		objects = []
+		for i in range(300):
+			action = rng.random()
+			if action < 0.4 or not objects:
+				obj = Dummy(rng.randint(0, 100), rng.randint(0, 100))
+				objects.append(obj)
+				index.add(obj, obj.position.to_tuple())
+			elif action < 0.8:
+				obj = rng.choice(objects)
+				obj.position = Point(obj.position.x + rng.randint(-1, 1), obj.position.y + rng.randint(-1, 1))
+				index.move(obj, obj.position.to_tuple())
+			else:
+				obj = rng.choice(objects)
+				objects.remove(obj)
+				index.remove(obj)
+			self.assertEqual(len(objects), len(index))
+			self._assert_same_as_list(index, objects, rng)
+
+	def test_remove_last_object_of_cell(self):
+		index = SpatialIndex(cell_size=4)
+		obj = Dummy(1, 1)
+		index.add(obj, (1, 1))
+		index.move(obj, (9, 9))
+		self.assertEqual([], index.get_in_circle(Point(1, 1), 2))
+		self.assertEqual([obj], index.get_in_circle(Point(9, 9), 0))
+		index.remove(obj)
+		self.assertNotIn(obj, index)
+		self.assertEqual({}, index._cells)
@@ -0,0 +1,88 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import tempfile
+import unittest
+
+from mock import patch
+
+from horizons.constants import RES
+from horizons.util.yamlcache import YamlCache
+from horizons.util.yamlcachestorage import YamlCacheStorage
+
+
+class YamlCacheTest(unittest.TestCase):
+
+	def setUp(self):
+		super().setUp()
+		fd, self.yaml_file = tempfile.mkstemp(suffix='.yaml')
+		os.close(fd)
+		fd, self.cache_file = tempfile.mkstemp()
+		os.close(fd)
+		self._write('id: 1\nres: RES.GOLD\n')
+
+		self.patchers = [
+			patch.object(YamlCache, 'cache', YamlCacheStorage(self.cache_file)),
+			patch.object(YamlCache, 'files_parsed', 0),
+			patch.object(YamlCache, 'files_from_cache', 0),
+			patch('horizons.extscheduler.ExtScheduler'),
+		]
+		for patcher in self.patchers:
+			patcher.start()
+
+	def tearDown(self):
+		for patcher in self.patchers:
+			patcher.stop()
+		os.unlink(self.yaml_file)
+		os.unlink(self.cache_file)
+		super().tearDown()
+
+	def _write(self, content, mtime=1000000000):
+		with open(self.yaml_file, 'w') as f:
+			f.write(content)
+		os.utime(self.yaml_file, (mtime, mtime))
+
+	def test_unchanged_file_is_not_read(self):
+		self.assertEqual(YamlCache.get_file(self.yaml_file, game_data=True), {'id': 1, 'res': RES.GOLD})
+		with patch('horizons.util.yamlcache.open', create=True) as open_mock:
+			self.assertEqual(YamlCache.get_file(self.yaml_file, game_data=True), {'id': 1, 'res': RES.GOLD})
+			self.assertFalse(open_mock.called)
+		self.assertEqual((YamlCache.files_parsed, YamlCache.files_from_cache), (1, 1))
+
+	def test_touched_file_is_not_parsed(self):
+		YamlCache.get_file(self.yaml_file)
+		self._write('id: 1\nres: RES.GOLD\n', mtime=1000000500)
+		self.assertEqual(YamlCache.get_file(self.yaml_file), {'id': 1, 'res': 'RES.GOLD'})
+		self.assertEqual((YamlCache.files_parsed, YamlCache.files_from_cache), (1, 1))
+
+	def test_changed_file_is_parsed(self):
+		YamlCache.get_file(self.yaml_file)
+		self._write('id: 2\n', mtime=1000000500)
+		self.assertEqual(YamlCache.get_file(self.yaml_file), {'id': 2})
+		self.assertEqual((YamlCache.files_parsed, YamlCache.files_from_cache), (2, 0))
+
+	def test_hit_after_reopening_cache(self):
+		YamlCache.get_file(self.yaml_file)
+		YamlCache.cache.sync()
+		YamlCache.cache = YamlCacheStorage.open(self.cache_file)
+		self.assertEqual(YamlCache.get_file(self.yaml_file), {'id': 1, 'res': 'RES.GOLD'})
+		self.assertEqual((YamlCache.files_parsed, YamlCache.files_from_cache), (1, 1))
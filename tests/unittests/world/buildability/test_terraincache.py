@@ -0,0 +1,75 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+from unittest import TestCase
+
+from mock import Mock
+
+from horizons.world.buildability.terraincache import TerrainBuildabilityCache, TerrainRequirement
+
+
+class TestTerrainBuildabilityCache(TestCase):
+
+	def _create_island(self, seed, offset):
+		"""Returns a mock island with random land and coast tiles around a land core."""
+		rng = random.Random(seed)
+		ground_map = {}
+		for x in range(30):
+			for y in range(25):
+				if 5 <= x < 25 and 5 <= y < 20:
+					classes = ('constructible', )
+				else:
+					classes = rng.choice([(), ('coastline', ), ('constructible', )])
+				if classes:
+					ground_map[(x + offset[0], y + offset[1])] = Mock(classes=classes)
+		return Mock(ground_map=ground_map)
+
+	def _get_rects(self, island, width, height):
+		"""Returns {origin: [classes of the tiles]} of all rects on the island."""
+		rects = {}
+		for (x, y) in island.ground_map:
+			tiles = [island.ground_map.get((x + dx, y + dy)) for dx in range(width) for dy in range(height)]
+			if None not in tiles:
+				rects[(x, y)] = [tile.classes for tile in tiles]
+		return rects
+
+	def test_same_as_checking_every_rect(self):
+		for seed, offset in [(1, (0, 0)), (2, (40, 7)), (3, (3, 100))]:
+			island = self._create_island(seed, offset)
+			cache = TerrainBuildabilityCache(island)
+
+			sizes = set(TerrainBuildabilityCache.sizes)
+			sizes.update((height, width) for (width, height) in TerrainBuildabilityCache.sizes)
+			for width, height in sizes:
+				expected = set(coords for coords, classes in self._get_rects(island, width, height).items()
+				               if all('constructible' in tile_classes for tile_classes in classes))
+				self.assertEqual(expected, cache.cache[TerrainRequirement.LAND][(width, height)])
+
+			for width, height in [(2, 2), (3, 3)]:
+				expected = set(coords for coords, classes in self._get_rects(island, width, height).items()
+				               if ('constructible', ) in classes and ('coastline', ) in classes)
+				self.assertEqual(expected, cache.cache[TerrainRequirement.LAND_AND_COAST][(width, height)])
+
+	def test_empty_island(self):
+		cache = TerrainBuildabilityCache(Mock(ground_map={}))
+		self.assertEqual(set(), cache.cache[TerrainRequirement.LAND][(3, 3)])
+		self.assertEqual(set(), cache.cache[TerrainRequirement.LAND_AND_COAST][(2, 2)])
@@ -0,0 +1,111 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import random
+from collections import defaultdict
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from horizons.constants import PRODUCTION
+from horizons.scheduler import Scheduler
+from horizons.world.production.production import Production
+
+
+class TestProductionStateHistory(TestCase):
+
+	WINDOW = 50
+
+	def setUp(self):
+		Scheduler.create_instance(Mock())
+		Scheduler().cur_tick = 100
+		self.production = Production(Mock(), Mock(), 1, {'time': 10}, load=True)
+		self.states = [] # state of each tick since the creation of the production
+		patcher = patch.object(PRODUCTION, 'STATISTICAL_WINDOW', self.WINDOW)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def tearDown(self):
+		Scheduler.destroy_instance()
+
+	def _set_state(self, state):
+		self.production._state = state
+		self.production._changed()
+
+	def _run_tick(self):
+		self.states.append(self.production._state.index)
+		Scheduler().cur_tick += 1
+
+	def _get_expected_times(self, ignore_pause):
+		"""Counts the states of the latest ticks, skipping paused ones if ignore_pause."""
+		ticks = defaultdict(int)
+		needed_ticks = self.WINDOW
+		for state in reversed(self.states):
+			if ignore_pause and state == PRODUCTION.STATES.paused.index:
+				continue
+			if needed_ticks == 0:
+				break
+			ticks[state] += 1
+			needed_ticks -= 1
+		total = sum(ticks.values())
+		return {state: amount / float(total) for state, amount in ticks.items()}
+
+	def _assert_times(self, ignore_pause):
+		result = self.production.get_state_history_times(ignore_pause)
+		result = {state: part for state, part in result.items() if part}
+		expected = self._get_expected_times(ignore_pause)
+		self.assertEqual(sorted(result), sorted(expected))
+		for state in expected:
+			self.assertAlmostEqual(result[state], expected[state])
+
+	def test_random_states(self):
+		rng = random.Random(3)
+		states = list(PRODUCTION.STATES)[1:]
+		self._set_state(PRODUCTION.STATES.waiting_for_res)
+		for i in range(2000):
+			if rng.random() < 0.1:
+				# long pauses now and then
+				self._set_state(PRODUCTION.STATES.paused if rng.random() < 0.3 else rng.choice(states))
+			self._run_tick()
+			self._assert_times(ignore_pause=False)
+			self._assert_times(ignore_pause=True)
+			self.assertEqual(sum(self.production._state_ticks.values()),
+			                 self.production._state_history[-1][0] - self.production._state_history[0][0])
+		# old entries have been removed
+		self.assertGreater(self.production._state_history[0][0], Scheduler().cur_tick - 10 * self.WINDOW)
+
+	def test_changes_on_the_same_tick(self):
+		self._set_state(PRODUCTION.STATES.producing)
+		self._run_tick()
+		self._set_state(PRODUCTION.STATES.paused)
+		self._set_state(PRODUCTION.STATES.waiting_for_res)
+		self._set_state(PRODUCTION.STATES.producing)
+		self._run_tick()
+		self._assert_times(ignore_pause=True)
+		self.assertEqual(len(self.production._state_history), 1)
+
+	def test_only_paused(self):
+		self._set_state(PRODUCTION.STATES.paused)
+		for i in range(3 * self.WINDOW):
+			self._run_tick()
+		self.assertEqual(dict(self.production.get_state_history_times(True)), {})
+		self.assertEqual(self.production.get_state_history_times(False)[PRODUCTION.STATES.paused.index], 1.0)
@@ -0,0 +1,186 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from horizons.constants import COLLECTORS
+from horizons.scheduler import Scheduler
+from horizons.util.dbreader import DbReader
+from horizons.util.uhdbaccessor import read_savegame_template
+from horizons.world.jobboard import JobBoard
+from horizons.world.units.collectors.collector import Collector
+
+
+class TestJobBoard(TestCase):
+
+	def setUp(self):
+		Scheduler.create_instance(Mock())
+		Scheduler().before_ticking()
+		Scheduler().tick(Scheduler.FIRST_TICK_ID)
+		self.board = JobBoard(Mock())
+		self.home = Mock(name='home')
+		self.woken = []
+
+	def tearDown(self):
+		self.board.end()
+		Scheduler.destroy_instance()
+
+	def _create_building(self, stored, worldid=None):
+		"""Returns a building that provides the resources in the dict stored."""
+		building = Mock(provided_resources=set(stored), worldid=worldid)
+		building.get_available_pickup_amount.side_effect = lambda res, collector: stored.get(res, 0)
+		return building
+
+	def _create_collector(self, worldid, targets, free_space=None):
+		collector = Mock(worldid=worldid, home_building=self.home)
+		collector.get_possible_job_targets.return_value = list(targets)
+		collector.is_possible_job_target.return_value = True
+		collector.get_collectable_res.return_value = [1, 2]
+		collector.get_home_inventory_free_space.side_effect = lambda res: (free_space or {}).get(res, 0)
+		collector.notify_job_available.side_effect = lambda: self.woken.append(collector)
+		return collector
+
+	def _run(self, ticks=COLLECTORS.JOB_BOARD_DISPATCH_TICKS):
+		for _ in range(ticks):
+			Scheduler().tick(Scheduler().cur_tick + 1)
+
+	def test_wake_up_when_target_has_resources(self):
+		stored = {1: 0}
+		building = self._create_building(stored)
+		collector = self._create_collector(1, [building])
+		self.board.add_waiting_collector(collector, [1], 0)
+
+		self.board.post(building)
+		self._run()
+		self.assertEqual(self.woken, [])
+		self.assertTrue(self.board.is_waiting(collector))
+
+		stored[1] = 2
+		self.board.post(building)
+		self._run(COLLECTORS.JOB_BOARD_DISPATCH_TICKS - 1)
+		self.assertEqual(self.woken, [])
+		self._run(1)
+		self.assertEqual(self.woken, [collector])
+		self.assertFalse(self.board.is_waiting(collector))
+
+	def test_ignore_other_resources(self):
+		building = self._create_building({1: 0, 2: 5})
+		collector = self._create_collector(1, [building])
+		self.board.add_waiting_collector(collector, [1], 0)
+		self.board.post(building)
+		self._run()
+		self.assertEqual(self.woken, [])
+
+	def test_wake_up_longest_idle_first(self):
+		building = self._create_building({1: 1})
+		collectors = [self._create_collector(worldid, [building]) for worldid in (4, 2, 3)]
+		self.board.add_waiting_collector(collectors[0], [1], 10)
+		self.board.add_waiting_collector(collectors[1], [1], 20)
+		self.board.add_waiting_collector(collectors[2], [1], 10)
+		self.board.post(building)
+		self._run()
+		self.assertEqual(self.woken, [collectors[2], collectors[0], collectors[1]])
+
+	def test_wake_up_when_home_has_space(self):
+		free_space = {1: 0}
+		collector = self._create_collector(1, [], free_space)
+		self.board.add_waiting_collector(collector, [], 0)
+		self.board.post(self.home)
+		self._run()
+		self.assertEqual(self.woken, [])
+
+		free_space[1] = 3
+		self.board.post(self.home)
+		self._run()
+		self.assertEqual(self.woken, [collector])
+
+	def test_new_and_removed_buildings(self):
+		collector = self._create_collector(1, [])
+		self.board.add_waiting_collector(collector, [1], 0)
+		building = self._create_building({1: 1})
+		self.board.add_building(building)
+		self.board.remove_building(building)
+		self.board.post(building)
+		self._run()
+		self.assertEqual(self.woken, [])
+
+		self.board.add_building(building)
+		self.board.post(building)
+		self._run()
+		self.assertEqual(self.woken, [collector])
+
+	def test_removed_collector(self):
+		building = self._create_building({1: 1})
+		collector = self._create_collector(1, [building])
+		self.board.add_waiting_collector(collector, [1], 0)
+		self.board.post(building)
+		self.board.remove_waiting_collector(collector)
+		self._run()
+		self.assertEqual(self.woken, [])
+
+	def test_wake_up_when_job_is_cancelled(self):
+		incoming = {} # {collector: amount it will pick up}
+		building = Mock(provided_resources={1}, settlement=Mock(job_board=self.board))
+		building.get_available_pickup_amount.side_effect = \
+			lambda res, collector: 2 - sum(incoming.values())
+		building.remove_incoming_collector.side_effect = incoming.pop
+		collector = self._create_collector(1, [building])
+		self.board.add_waiting_collector(collector, [1], 0)
+
+		other = Mock(job=Mock(object=building))
+		other._abort_collector_job.side_effect = lambda: Collector._abort_collector_job(other)
+		incoming[other] = 2
+		self.board.post(building)
+		self._run()
+		self.assertEqual(self.woken, [])
+
+		Collector.cancel(other, continue_action=Mock())
+		self._run()
+		self.assertEqual(self.woken, [collector])
+
+	def test_save_and_load(self):
+		buildings = [self._create_building({1: 1}, worldid) for worldid in (10, 11)]
+		collector = self._create_collector(1, [buildings[1]])
+		self.board.add_waiting_collector(collector, [2, 1], 5)
+		self.board.post(buildings[1])
+		self._run(1)
+
+		db = DbReader(':memory:')
+		read_savegame_template(db)
+		self.board.settlement.worldid = 3
+		self.board.save(db)
+		self.board.save_collector(db, collector)
+		self.assertEqual(JobBoard.load_collector(db, 1), ([1, 2], [11]))
+
+		settlement = self.board.settlement
+		self.board.end()
+		self.board = board = JobBoard(settlement)
+		objects = dict((building.worldid, building) for building in buildings)
+		with patch('horizons.util.worldobject.WorldObject.get_object_by_id', side_effect=objects.get):
+			board.load(db)
+		board.add_waiting_collector(collector, [1, 2], 5, [buildings[1]])
+		self._run(COLLECTORS.JOB_BOARD_DISPATCH_TICKS - 2)
+		self.assertEqual(self.woken, [])
+		self._run(1)
+		self.assertEqual(self.woken, [collector])
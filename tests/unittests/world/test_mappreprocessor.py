@@ -0,0 +1,106 @@
+# ###################################################
+# Copyright (C) 2008-2017 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import unittest
+
+from mock import Mock, patch
+
+from horizons.entities import Entities
+from horizons.world.buildability.terraincache import TerrainRequirement
+from horizons.util.mapanalysis import get_water_bodies
+from horizons.world.mappreprocessor import MapPreprocessor
+
+
+class TestMapPreprocessor(unittest.TestCase):
+
+	def _create_preprocessor(self):
+		"""Two islands: a ring of land around a lake with coast on the outside and a
+		single coast tile."""
+		rows = []
+		for x in range(6):
+			for y in range(6):
+				if x in (0, 5) or y in (0, 5):
+					rows.append((1001, x, y, 2, 'straight', 0))
+				elif not (2 <= x <= 3 and 2 <= y <= 3):
+					rows.append((1001, x, y, 1, 'straight', 0))
+		rows.append((1002, 10, 3, 2, 'straight', 90))
+		grounds = {
+			'1-straight': Mock(classes=['ground[1]', 'constructible']),
+			'2-straight': Mock(classes=['ground[2]', 'constructible', 'coastline']),
+		}
+		with patch.object(Entities, 'grounds', grounds, create=True):
+			return MapPreprocessor(Mock(return_value=rows), 2)
+
+	def _get_results(self, preprocessor):
+		return (
+			preprocessor.get_terrain_cache_data(1001),
+			preprocessor.get_terrain_cache_data(1002),
+			preprocessor.get_water_bodies(),
+			preprocessor.get_shallow_water_bodies(),
+		)
+
+	def test_results(self):
+		terrain_1001, terrain_1002, water, shallow_water = self._get_results(self._create_preprocessor())
+
+		land_or_coast, land, land_and_coast = terrain_1001
+		self.assertEqual(32, len(land_or_coast))
+		self.assertEqual(set(), land[(3, 3)])
+		self.assertEqual(16, len(land[(2, 2)]))
+		self.assertNotIn((1, 1), land[(2, 2)])
+		self.assertEqual(set([(10, 3)]), terrain_1002[0])
+
+		# water around the islands and the lake, the coast tiles are water for fishers too
+		self.assertEqual(set([0, 1]), set(water.values()))
+		self.assertEqual(water[(-2, -2)], water[(10, 4)])
+		self.assertNotEqual(water[(-2, -2)], water[(2, 2)])
+		self.assertNotIn((0, 0), water)
+		self.assertEqual(set([0, 1]), set(shallow_water.values()))
+		self.assertEqual(shallow_water[(0, 0)], shallow_water[(10, 3)])
+		self.assertNotIn((1, 1), shallow_water)
+
+	def test_ground_rows(self):
+		preprocessor = self._create_preprocessor()
+		self.assertEqual([(10, 3, 2, 'straight', 90)], preprocessor.get_ground_rows(1002))
+		self.assertEqual((0, 0, 2, 'straight', 0), preprocessor.get_ground_rows(1001)[0])
+
+	def test_same_results_in_worker_processes(self):
+		expected = self._get_results(self._create_preprocessor())
+		with patch.object(MapPreprocessor, 'MIN_PARALLEL_TILES', 0), \
+		     patch('multiprocessing.cpu_count', return_value=3):
+			MapPreprocessor.start_workers()
+		try:
+			self.assertIsNotNone(MapPreprocessor._pool)
+			with patch.object(MapPreprocessor, 'MIN_PARALLEL_TILES', 0):
+				preprocessor = self._create_preprocessor()
+			self.assertEqual(expected, self._get_results(preprocessor))
+		finally:
+			MapPreprocessor.stop_workers()
+		self.assertIsNone(MapPreprocessor._pool)
+
+	def test_water_body_numbers(self):
+		# the numbers only depend on the position of the bodies
+		land = set((2, y) for y in range(4))
+		water_bodies = get_water_bodies((0, 0, 4, 4), land)
+		self.assertEqual({(0, 0): 0, (0, 1): 0, (1, 0): 0, (1, 1): 0, (3, 0): 1, (3, 1): 1},
+		                 {coords: n for coords, n in water_bodies.items() if coords[1] < 2})
+		# diagonal neighbors are connected
+		land.remove((2, 3))
+		self.assertEqual(set([0]), set(get_water_bodies((0, 0, 4, 4), land).values()))
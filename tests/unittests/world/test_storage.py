@@ -19,9 +19,11 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import random
 import sys
 from unittest import TestCase
 
+from horizons.util.checkuphash import CheckupHash
 from horizons.world.storage import (
 	GenericStorage, GlobalLimitStorage, PositiveSizedNumSlotStorage, PositiveSizedSlotStorage,
 	PositiveStorage, PositiveTotalStorage, SizedSpecializedStorage, SpecializedStorage, TotalStorage)
@@ -73,6 +75,47 @@ class TestGenericStorage(TestCase):
 		self.assertEqual(s[2], 0)
 
 
+class TestCheckupHash(TestCase):
+	"""The incrementally maintained hash has to equal the hash of the contents."""
+
+	def _assert_hash_of_contents(self, s):
+		expected = CheckupHash()
+		for res, amount in s.itercontents():
+			if amount:
+				expected.add((res, amount))
+		self.assertEqual(expected.value, s.checkup_hash.value)
+
+	def test_alter(self):
+		rng = random.Random(3)
+		for s in (GenericStorage(), PositiveSizedNumSlotStorage(30, 2), PositiveTotalStorage(50)):
+			for i in range(200):
+				s.alter(rng.randint(1, 4), rng.randint(-20, 20))
+				self._assert_hash_of_contents(s)
+
+	def test_reset_and_adjust_limit(self):
+		s = PositiveSizedSlotStorage(10)
+		s.alter(1, 5)
+		s.alter(2, 8)
+		s.adjust_limit(-4)
+		self._assert_hash_of_contents(s)
+		s.reset(2)
+		self._assert_hash_of_contents(s)
+		s.reset_all()
+		self.assertEqual(0, s.checkup_hash.value)
+
+	def test_order_independent(self):
+		s1 = GenericStorage()
+		s1.alter(1, 5)
+		s1.alter(2, 3)
+		s2 = GenericStorage()
+		s2.alter(2, 3)
+		s2.alter(1, 2)
+		s2.alter(1, 3)
+		self.assertEqual(s1.checkup_hash.value, s2.checkup_hash.value)
+		s2.alter(1, 1)
+		self.assertNotEqual(s1.checkup_hash.value, s2.checkup_hash.value)
+
+
 class TestSpecializedStorages(TestCase):
 
 	def test_specialized(self):